@@ -0,0 +1,3 @@
+"""
+Benchmarks for pdf417gen, run with `python -m benchmarks`.
+"""
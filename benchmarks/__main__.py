@@ -0,0 +1,312 @@
+"""
+Benchmark runner.
+
+Usage:
+    python -m benchmarks run [-k PATTERN] [--quick] [-o results.json] [--compare baseline.json]
+    python -m benchmarks compare baseline.json results.json [--threshold PERCENT]
+    python -m benchmarks list [-k PATTERN]
+    python -m benchmarks density [-k PATTERN] [-o density.json] [--compare baseline.json]
+    python -m benchmarks memory [-k PATTERN] [-o memory.json] [--compare baseline.json]
+    python -m benchmarks threads [-k PATTERN] [-t THREADS] [--quick] [-o threads.json]
+"""
+
+import os
+import sys
+
+from argparse import ArgumentParser, Namespace
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import corpus, memory, runner, suite, threads
+
+
+def get_parser() -> ArgumentParser:
+    parser = ArgumentParser(prog="python -m benchmarks", description="Runs pdf417gen benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks")
+    add_filter_argument(run_parser)
+    run_parser.add_argument("-o", "--output", type=str,
+                            help="Save results to a JSON file.")
+    run_parser.add_argument("--quick", action="store_true",
+                            help="Take fewer and shorter samples, for a quick check.")
+    run_parser.add_argument("--compare", type=str, metavar="BASELINE",
+                            help="Compare results to a baseline JSON file.")
+    add_threshold_argument(run_parser)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results to a baseline")
+    compare_parser.add_argument("baseline", type=str, help="Baseline results JSON file.")
+    compare_parser.add_argument("current", type=str, help="Current results JSON file.")
+    add_threshold_argument(compare_parser)
+
+    list_parser = subparsers.add_parser("list", help="List benchmarks")
+    add_filter_argument(list_parser)
+
+    density_parser = subparsers.add_parser("density", help="Measure density of the corpus")
+    add_filter_argument(density_parser)
+    density_parser.add_argument("-o", "--output", type=str,
+                                help="Save results to a JSON file.")
+    density_parser.add_argument("-c", "--columns", type=int, default=6,
+                                help="Number of columns (default: %(default)s).")
+    density_parser.add_argument("-l", "--security-level", type=int, default=2,
+                                help="Error correction level (default: %(default)s).")
+    density_parser.add_argument("--compare", type=str, metavar="BASELINE",
+                                help="Compare code word counts to a baseline JSON file.")
+    add_threshold_argument(density_parser, default=0.0)
+
+    memory_parser = subparsers.add_parser("memory", help="Run memory benchmarks")
+    add_filter_argument(memory_parser)
+    memory_parser.add_argument("-o", "--output", type=str,
+                               help="Save results to a JSON file.")
+    memory_parser.add_argument("--compare", type=str, metavar="BASELINE",
+                               help="Compare memory use to a baseline JSON file.")
+    add_threshold_argument(memory_parser)
+
+    threads_parser = subparsers.add_parser("threads", help="Measure scaling with threads")
+    add_filter_argument(threads_parser)
+    threads_parser.add_argument("-t", "--threads", type=int, action="append", default=[],
+                                help="Number of threads to measure, can be given multiple "
+                                     "times (default: %s)." % ", ".join(
+                                         str(t) for t in threads.THREAD_COUNTS))
+    threads_parser.add_argument("-o", "--output", type=str,
+                                help="Save results to a JSON file.")
+    threads_parser.add_argument("--quick", action="store_true",
+                                help="Make fewer calls, for a quick check.")
+
+    return parser
+
+
+def add_filter_argument(parser: ArgumentParser):
+    parser.add_argument("-k", dest="patterns", action="append", default=[], metavar="PATTERN",
+                        help="Only run benchmarks matching the glob pattern, e.g. 'encode/*'. "
+                             "Can be given multiple times.")
+
+
+def add_threshold_argument(parser: ArgumentParser, default: float = runner.DEFAULT_THRESHOLD):
+    parser.add_argument("--threshold", type=float, default=default,
+                        help="Fail if a benchmark is slower than the baseline by more than "
+                             "this many percent (default: %(default)s).")
+
+
+def print_result(name: str, result: Dict[str, Any]):
+    print("%-32s %12s +- %-12s (%d x %d loops)" % (
+        name,
+        runner.format_time(result["median"]),
+        runner.format_time(result["stdev"]),
+        result["samples"],
+        result["loops"],
+    ))
+
+
+def print_density(name: str, result: Dict[str, Any]):
+    print("%-24s %6d %6d %10.3f %5d %8d%s" % (
+        name,
+        result["bytes"],
+        result["code_words"],
+        result["code_words_per_byte"],
+        result["rows"],
+        result["area"],
+        "" if result["fits"] else "  (does not fit)",
+    ))
+
+
+def print_memory(name: str, result: Dict[str, Any]):
+    print("%-32s %10s %10s %10s %10s" % (
+        name,
+        format_bytes(result["peak_traced"]),
+        format_bytes(result["retained"]),
+        format_bytes(result["peak_rss"]),
+        format_bytes(result["rss_increase"]),
+    ))
+
+
+def print_threads(name: str, result: Dict[str, Any]):
+    for count, scaling in result["threads"].items():
+        print("%-32s %7s %12.1f %8.2fx %9.0f%%" % (
+            name,
+            count,
+            scaling["calls_per_second"],
+            scaling["speedup"],
+            scaling["efficiency"] * 100,
+        ))
+        name = ""
+
+
+def format_bytes(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    if abs(value) < 1024:
+        return "%d B" % value
+    if abs(value) < 1024 * 1024:
+        return "%.1f KiB" % (value / 1024)
+    return "%.1f MiB" % (value / 1024 / 1024)
+
+
+def format_count(value: Optional[float]) -> str:
+    return "-" if value is None else "%d" % value
+
+
+def print_comparison(
+    comparisons: List[runner.Comparison],
+    format_value: Callable[[Optional[float]], str] = runner.format_time,
+) -> bool:
+    """Prints the comparison, returns True if any benchmark regressed."""
+    print("%-32s %12s %12s %9s" % ("Benchmark", "Baseline", "Current", "Change"))
+
+    for c in comparisons:
+        change = "-" if c.change is None else "%+.1f%%" % c.change
+        status = "REGRESSED" if c.regressed else ""
+        print("%-32s %12s %12s %9s  %s" % (
+            c.name,
+            format_value(c.baseline),
+            format_value(c.current),
+            change,
+            status,
+        ))
+
+    regressed = [c for c in comparisons if c.regressed]
+    if regressed:
+        print("\n%d of %d benchmarks regressed" % (len(regressed), len(comparisons)))
+
+    return bool(regressed)
+
+
+def compare_to_baseline(
+    baseline: Dict[str, Any],
+    results: Dict[str, Any],
+    threshold: float,
+    metric: str = "median",
+    format_value: Callable[[Optional[float]], str] = runner.format_time,
+    min_difference: float = 0,
+) -> int:
+    """Prints the comparison of results to the baseline, returns the exit code."""
+    # Only compare benchmarks which were run
+    baseline["benchmarks"] = {
+        name: result for name, result in baseline["benchmarks"].items()
+        if name in results["benchmarks"]
+    }
+
+    comparisons = runner.compare(baseline, results, threshold, metric, min_difference)
+    return 1 if print_comparison(comparisons, format_value) else 0
+
+
+def main(argv: List[str]) -> int:
+    args = get_parser().parse_args(argv)
+
+    if args.command == "list":
+        for benchmark in runner.select(suite.benchmarks(), args.patterns):
+            print(benchmark.name)
+        return 0
+
+    if args.command == "compare":
+        baseline = runner.load_results(args.baseline)
+        current = runner.load_results(args.current)
+        return 1 if print_comparison(runner.compare(baseline, current, args.threshold)) else 0
+
+    if args.command == "density":
+        return density(args)
+
+    if args.command == "memory":
+        return run_memory(args)
+
+    if args.command == "threads":
+        return run_threads(args)
+
+    benchmarks = runner.select(suite.benchmarks(), args.patterns)
+    if not benchmarks:
+        print("No benchmarks match given patterns", file=sys.stderr)
+        return 1
+
+    # Load the baseline first to fail early if it is invalid
+    baseline = runner.load_results(args.compare) if args.compare else None
+    settings = runner.QUICK_SETTINGS if args.quick else runner.Settings()
+    results = runner.run(benchmarks, settings, progress=print_result)
+
+    if args.output:
+        runner.save_results(results, args.output)
+        print("Results written to %s" % args.output)
+
+    if baseline:
+        print()
+        return compare_to_baseline(baseline, results, args.threshold)
+
+    return 0
+
+
+def density(args: Namespace) -> int:
+    items = [item for item in corpus.CORPUS if runner.matches(item.name, args.patterns)]
+    if not items:
+        print("No corpus items match given patterns", file=sys.stderr)
+        return 1
+
+    baseline = runner.load_results(args.compare) if args.compare else None
+    results = corpus.measure_corpus(items, args.columns, args.security_level)
+
+    print("%-24s %6s %6s %10s %5s %8s" % (
+        "Payload", "Bytes", "Words", "Words/byte", "Rows", "Area"))
+    for name, result in results["benchmarks"].items():
+        print_density(name, result)
+
+    if args.output:
+        runner.save_results(results, args.output)
+        print("Results written to %s" % args.output)
+
+    if baseline:
+        print()
+        return compare_to_baseline(baseline, results, args.threshold, "code_words", format_count)
+
+    return 0
+
+
+def run_memory(args: Namespace) -> int:
+    benchmarks = [b for b in memory.benchmarks() if runner.matches(b.name, args.patterns)]
+    if not benchmarks:
+        print("No benchmarks match given patterns", file=sys.stderr)
+        return 1
+
+    baseline = runner.load_results(args.compare) if args.compare else None
+
+    print("%-32s %10s %10s %10s %10s" % (
+        "Benchmark", "Peak", "Retained", "Peak RSS", "RSS incr."))
+    results = memory.run(benchmarks, progress=print_memory)
+
+    if args.output:
+        runner.save_results(results, args.output)
+        print("Results written to %s" % args.output)
+
+    exit_code = 0
+    if baseline:
+        for metric, min_difference in memory.COMPARED_METRICS.items():
+            print("\nComparing %s" % metric)
+            code = compare_to_baseline(dict(baseline), results, args.threshold, metric,
+                                       format_bytes, min_difference)
+            exit_code = max(exit_code, code)
+
+    return exit_code
+
+
+def run_threads(args: Namespace) -> int:
+    benchmarks = runner.select(threads.benchmarks(), args.patterns)
+    if not benchmarks:
+        print("No benchmarks match given patterns", file=sys.stderr)
+        return 1
+
+    thread_counts = sorted(set(args.threads)) or threads.THREAD_COUNTS
+    call_time = threads.QUICK_CALL_TIME if args.quick else threads.CALL_TIME
+
+    gil = threads.gil_enabled()
+    print("CPU cores: %s, GIL: %s\n" % (
+        os.cpu_count(), "unknown" if gil is None else "enabled" if gil else "disabled"))
+
+    print("%-32s %7s %12s %9s %10s" % (
+        "Benchmark", "Threads", "Calls/s", "Speedup", "Efficiency"))
+    results = threads.run(benchmarks, thread_counts, call_time, progress=print_threads)
+
+    if args.output:
+        runner.save_results(results, args.output)
+        print("Results written to %s" % args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
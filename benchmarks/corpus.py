@@ -0,0 +1,138 @@
+"""
+Corpus of realistic payloads, and density measurements.
+
+Density is measured as the number of code words `compact()` produces for each
+payload, and the size of the resulting bar code for a fixed number of columns
+and security level. Unlike timings, these numbers are deterministic, so any
+increase means the compaction got worse for that kind of payload.
+
+All personal data in the corpus is fictional.
+"""
+
+import zlib
+from typing import Any, Dict, List, NamedTuple
+
+from pdf417gen.compaction import compact, count_chunks_by_mode, split_to_chunks
+from pdf417gen.encoding import plan_barcode
+from pdf417gen.layout import symbol_size
+from pdf417gen.util import to_bytes
+from benchmarks.runner import results_document
+
+# Row height in modules used to calculate the symbol area, same as the default
+# `ratio` of the renderers
+ROW_HEIGHT = 3
+
+ZEN = """
+Beautiful is better than ugly.
+Explicit is better than implicit.
+Simple is better than complex.
+Complex is better than complicated.
+Flat is better than nested.
+Sparse is better than dense.
+Readability counts.
+Special cases aren't special enough to break the rules.
+Although practicality beats purity.
+Errors should never pass silently.
+Unless explicitly silenced.
+In the face of ambiguity, refuse the temptation to guess.
+There should be one-- and preferably only one --obvious way to do it.
+Although that way may not be obvious at first unless you're Dutch.
+Now is better than never.
+Although never is often better than *right* now.
+If the implementation is hard to explain, it's a bad idea.
+If the implementation is easy to explain, it may be a good idea.
+Namespaces are one honking great idea -- let's do more of those!
+""".strip()
+
+# Driver license in the AAMVA DL/ID card design standard format
+AAMVA = (
+    "@\n\x1e\rANSI 636000100002DL00410278ZV03190008"
+    "DLDAQT64235789\nDCSSAMPLE\nDDEN\nDACMICHAEL\nDDFN\nDADJOHN\nDDGN\nDCUJR\n"
+    "DCAD\nDCBK\nDCDPH\nDBD06062019\nDBB06061986\nDBA12102024\nDBC1\nDAU068 in\n"
+    "DAYBRO\nDAG2300 WEST BROAD STREET\nDAIRICHMOND\nDAJVA\nDAK232690000  \n"
+    "DCF2424244747474786102204\nDCGUSA\nDCK123456789\nDDAF\nDDB06062018\n"
+    "DDC06062020\nDDD1\rZVZVA01\r"
+)
+
+# Single leg boarding pass in the IATA BCBP format, mandatory items only
+IATA_SINGLE = "M1DESMARAIS/LUC       EABC123 YULFRAAC 0834 326J001A0025 100"
+
+# Two leg boarding pass with conditional items and a security block
+IATA_MULTI = (
+    "M2DESMARAIS/LUC       EABC123 YULFRAAC 0834 326J001A0025 15D>5180OO0326BAC "
+    "2A0141234567890 1AC AC 1234567890123    20KYLX58ZDEF456 FRAGVALH 3664 327C012C0002 "
+    "12C2A0141234567890 1AC AC 1234567890123    2PC ^108GIWVC5EH7JNT684FVNJ91W2QA4DVN5J8K4F0L0GE"
+)
+
+# Shipping label in the ANSI MH10.8.3 format used by carriers
+SHIPPING = (
+    "[)>\x1e01\x1d02\x1d941100000\x1d840\x1d001\x1d1Z12345E0205271688\x1dUPSN\x1d12345E"
+    "\x1d089\x1d\x1d1/1\x1d10.1\x1dY\x1d\x1d\x1dNY\x1e07"
+    "JOHN SMITH\x1d123 MAIN STREET APT 4B\x1dNEW YORK\x1dNY\x1d10001\x1dUS\x1e\x04"
+)
+
+# Asset labels with sequential alphanumeric serial numbers
+SERIALS = "\n".join("SN-%010d" % (4170000000 + i) for i in range(40))
+
+# A run of sequential numeric serial numbers
+NUMERIC_SERIALS = "".join("%012d" % (100000000000 + i) for i in range(40))
+
+UTF8 = (
+    "Čistoća je pola zdravlja. Grüße aus München! Ζεύς. "
+    "日本語のテキストはバイト圧縮でエンコードされます。"
+    "Съешь же ещё этих мягких французских булок."
+)
+
+
+class CorpusItem(NamedTuple):
+    name: str
+    data: bytes
+
+    force_binary: bool = False
+    """Whether the data is encoded using `force_binary`, as for compressed data"""
+
+
+CORPUS = [
+    CorpusItem("aamva/dl", to_bytes(AAMVA)),
+    CorpusItem("iata/single", to_bytes(IATA_SINGLE)),
+    CorpusItem("iata/multi", to_bytes(IATA_MULTI)),
+    CorpusItem("shipping/mh10", to_bytes(SHIPPING)),
+    CorpusItem("serial/alphanumeric", to_bytes(SERIALS)),
+    CorpusItem("serial/numeric", to_bytes(NUMERIC_SERIALS)),
+    CorpusItem("text/zen", to_bytes(ZEN)),
+    CorpusItem("utf8/mixed", to_bytes(UTF8)),
+    CorpusItem("binary/zlib", zlib.compress(to_bytes(ZEN), 9), force_binary=True),
+]
+
+
+def measure_density(item: CorpusItem, columns: int = 6, security_level: int = 2) -> Dict[str, Any]:
+    """Returns code word counts and bar code size for a corpus item."""
+    code_words = len(list(compact(item.data, item.force_binary)))
+    by_mode = count_chunks_by_mode(split_to_chunks(item.data, item.force_binary))
+    plan = plan_barcode(code_words, columns, security_level)
+    width, rows = symbol_size(columns, plan.rows)
+
+    return {
+        "bytes": len(item.data),
+        "code_words": code_words,
+        "code_words_per_byte": code_words / len(item.data),
+        "text": by_mode["text"],
+        "numeric": by_mode["numeric"],
+        "byte": by_mode["byte"],
+        "padding": plan.padding_words,
+        "columns": columns,
+        "rows": rows,
+        "area": width * rows * ROW_HEIGHT,
+        "fits": plan.fits,
+    }
+
+
+def measure_corpus(
+    items: List[CorpusItem],
+    columns: int = 6,
+    security_level: int = 2,
+) -> Dict[str, Any]:
+    """Measures density of corpus items, the results can be compared like
+    timing results using the "code_words" metric."""
+    results = {item.name: measure_density(item, columns, security_level) for item in items}
+    return results_document("density", results, columns=columns, security_level=security_level)
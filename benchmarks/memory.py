@@ -0,0 +1,167 @@
+"""
+Memory benchmarks.
+
+Measurements taken for each benchmark:
+
+    peak_traced     peak memory allocated by Python during a single call,
+                    measured using `tracemalloc`
+    retained        memory allocated during the call which is still allocated
+                    after the result is released, e.g. by caches or leaks
+    peak_rss        peak resident set size of a fresh process which ran the
+                    benchmark once
+    rss_increase    how much the call raised the peak resident set size of that
+                    process, 0 if the call stayed under the peak reached during
+                    setup
+
+`tracemalloc` only sees memory allocated by Python. Pillow allocates image
+buffers itself, so memory used by `render_image`, including the intermediate
+images allocated when resizing and adding padding, is only visible in RSS.
+
+RSS is measured using /proc on Linux and the `resource` module elsewhere, it is
+not available on Windows, where RSS measurements are reported as None.
+"""
+
+import gc
+import multiprocessing
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from pdf417gen import encode_macro, render_image, render_svg
+from benchmarks import suite
+from benchmarks.runner import results_document
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Metrics compared against a baseline, and the smallest absolute difference in
+# bytes considered a change, to ignore noise caused by memory allocators
+COMPARED_METRICS = {
+    "peak_traced": 1024,
+    "rss_increase": 1024 * 1024,
+}
+
+
+class MemoryBenchmark(NamedTuple):
+    name: str
+
+    setup: Callable[[], Callable[[], Any]]
+    """Prepares the input data and returns the function to measure"""
+
+    input_size: int
+    """Size of the input data in bytes, used to report memory relative to it"""
+
+
+def setup_encode_macro_render(size: int) -> Callable[[], object]:
+    data = suite.payload("text", size)
+    renderer = partial(render_image, scale=3)
+    return partial(encode_macro, data, columns=suite.MACRO_COLUMNS, renderer=renderer)
+
+
+def benchmarks() -> Iterator[MemoryBenchmark]:
+    for mode in suite.MODES:
+        for size in suite.SIZES:
+            name = "encode/%s/%s" % (mode, suite.format_size(size))
+            yield MemoryBenchmark(name, partial(suite.setup_encode, mode, size), size)
+
+        for size in suite.MACRO_SIZES:
+            name = "encode_macro/%s/%s" % (mode, suite.format_size(size))
+            yield MemoryBenchmark(name, partial(suite.setup_encode_macro, mode, size), size)
+
+    for size in suite.MACRO_SIZES:
+        name = "encode_macro_render/text/%s" % suite.format_size(size)
+        yield MemoryBenchmark(name, partial(setup_encode_macro_render, size), size)
+
+    for scale in suite.IMAGE_SCALES:
+        name = "render_image/scale-%d" % scale
+        setup = partial(suite.setup_render, render_image, scale)
+        yield MemoryBenchmark(name, setup, suite.RENDER_SIZE)
+
+    for scale in suite.SVG_SCALES:
+        name = "render_svg/scale-%d" % scale
+        setup = partial(suite.setup_render, render_svg, scale)
+        yield MemoryBenchmark(name, setup, suite.RENDER_SIZE)
+
+
+def measure_traced(fn: Callable[[], Any]) -> Dict[str, int]:
+    """Measures memory allocated by Python during a call of `fn`."""
+    # Call once so that lazily initialized state is not counted
+    fn()
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        del result
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"peak_traced": peak, "retained": retained}
+
+
+def max_rss() -> Optional[int]:
+    """Returns the peak resident set size of this process in bytes."""
+    # On Linux, ru_maxrss of a new process starts at the peak of its parent, so
+    # read the peak of the process' own memory instead
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in kilobytes on Linux, in bytes on macOS
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def measure_rss(name: str) -> Dict[str, Optional[int]]:
+    """Runs the named benchmark once and measures the peak RSS. Should run in a
+    fresh process, since the peak RSS never decreases."""
+    benchmark = next(b for b in benchmarks() if b.name == name)
+    fn = benchmark.setup()
+
+    before = max_rss()
+    fn()
+    after = max_rss()
+
+    if before is None or after is None:
+        return {"peak_rss": None, "rss_increase": None}
+
+    return {"peak_rss": after, "rss_increase": after - before}
+
+
+def run(
+    benchmarks: List[MemoryBenchmark],
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Runs memory benchmarks and returns the results, see `runner.run`."""
+    # Measure RSS of each benchmark in a new process
+    context = multiprocessing.get_context("spawn")
+
+    results: Dict[str, Any] = {}
+    for benchmark in benchmarks:
+        result: Dict[str, Any] = measure_traced(benchmark.setup())
+        result["peak_traced_per_input_byte"] = result["peak_traced"] / benchmark.input_size
+        result["input_size"] = benchmark.input_size
+
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result.update(pool.submit(measure_rss, benchmark.name).result())
+
+        results[benchmark.name] = result
+        if progress:
+            progress(benchmark.name, result)
+
+    return results_document("memory", results)
@@ -0,0 +1,232 @@
+"""
+Runs benchmarks, and compares results against a baseline.
+
+Each benchmark is a function which is called repeatedly. Before measuring, it
+is run for a warmup period, and the number of calls per sample is calibrated so
+that each sample takes long enough to be measured accurately. Garbage collection
+is disabled while sampling, as in `timeit`.
+
+Results are saved as JSON, with timings per call in seconds.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+# Version of the results file format
+RESULTS_VERSION = 1
+
+# Default regression threshold for comparing results, in percent
+DEFAULT_THRESHOLD = 10.0
+
+
+class Benchmark(NamedTuple):
+    name: str
+    """Unique name, groups are separated by slashes, e.g. "encode/text/100B" """
+
+    setup: Callable[[], Callable[[], Any]]
+    """Prepares the input data and returns the function to measure"""
+
+
+class Settings(NamedTuple):
+    warmup: float = 0.2
+    """Minimum time to run the function before sampling, in seconds"""
+
+    samples: int = 10
+    """Number of samples to take"""
+
+    sample_time: float = 0.05
+    """Minimum duration of each sample, in seconds"""
+
+
+QUICK_SETTINGS = Settings(warmup=0.05, samples=3, sample_time=0.01)
+
+
+def measure(fn: Callable[[], Any], settings: Settings) -> Dict[str, Any]:
+    """Measures the time per call of `fn` and returns timing statistics."""
+    deadline = time.perf_counter() + settings.warmup
+    fn()
+    while time.perf_counter() < deadline:
+        fn()
+
+    loops = calibrate(fn, settings.sample_time)
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        timings = [sample(fn, loops) / loops for _ in range(settings.samples)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "min": min(timings),
+        "max": max(timings),
+        "loops": loops,
+        "samples": len(timings),
+    }
+
+
+def calibrate(fn: Callable[[], Any], sample_time: float) -> int:
+    """Returns the number of calls needed for a sample to last `sample_time`."""
+    loops = 1
+    while True:
+        elapsed = sample(fn, loops)
+        if elapsed >= sample_time:
+            return loops
+
+        # Estimate the number of loops from the last sample, at most 10x more
+        # at a time to avoid overshooting on noisy short samples
+        estimate = int(loops * sample_time / max(elapsed, 1e-9)) + 1
+        loops = min(estimate, loops * 10)
+
+
+def sample(fn: Callable[[], Any], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - start
+
+
+def matches(name: str, patterns: List[str]) -> bool:
+    """Whether the name matches any of the glob patterns, or no patterns are given."""
+    return not patterns or any(fnmatch(name, pattern) for pattern in patterns)
+
+
+def select(benchmarks: Iterable[Benchmark], patterns: List[str]) -> List[Benchmark]:
+    """Returns benchmarks whose names match any of the glob patterns, or all
+    benchmarks if no patterns are given."""
+    return [benchmark for benchmark in benchmarks if matches(benchmark.name, patterns)]
+
+
+def run(
+    benchmarks: Iterable[Benchmark],
+    settings: Settings = Settings(),
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Runs the benchmarks and returns the results.
+
+    Args:
+        benchmarks: Benchmarks to run
+        settings: Warmup and sampling settings
+        progress: Called with the name and result of each completed benchmark
+
+    Returns:
+        Results which can be saved as JSON and passed to `compare`
+    """
+    results: Dict[str, Any] = {}
+    for benchmark in benchmarks:
+        fn = benchmark.setup()
+        results[benchmark.name] = measure(fn, settings)
+        if progress:
+            progress(benchmark.name, results[benchmark.name])
+
+    return results_document("timing", results, settings=settings._asdict())
+
+
+def results_document(kind: str, benchmarks: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    """Wraps benchmark results with information about the environment.
+
+    Args:
+        kind: Kind of results, only results of the same kind can be compared
+        benchmarks: Results of each benchmark, by name
+        **extra: Additional fields describing how the results were produced
+    """
+    return {
+        "version": RESULTS_VERSION,
+        "kind": kind,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        **extra,
+        "benchmarks": benchmarks,
+    }
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        results = json.load(f)
+
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError("Unsupported results version in %s: %r" % (path, results.get("version")))
+
+    return results
+
+
+def save_results(results: Dict[str, Any], path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+
+    change: Optional[float]
+    """Relative change in percent, positive when slower or larger"""
+
+    regressed: bool
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = "median",
+    min_difference: float = 0,
+) -> List[Comparison]:
+    """Compares a metric of benchmarks present in either result, by default the
+    median time.
+
+    A benchmark regressed if its metric is more than `threshold` percent higher
+    than in the baseline, and higher by more than `min_difference`. Benchmarks
+    missing from one of the results, or with a missing metric, are reported
+    without a change and do not count as regressions.
+    """
+    if baseline["kind"] != current["kind"]:
+        raise ValueError("Cannot compare %s results to %s results" % (
+            current["kind"], baseline["kind"]))
+
+    base = baseline["benchmarks"]
+    curr = current["benchmarks"]
+
+    comparisons: List[Comparison] = []
+    for name in sorted(set(base) | set(curr)):
+        before = base[name].get(metric) if name in base else None
+        after = curr[name].get(metric) if name in curr else None
+
+        if before is None or after is None:
+            comparisons.append(Comparison(name, before, after, None, False))
+            continue
+
+        if before:
+            change = 100 * (after - before) / before
+        else:
+            change = 0.0 if after == before else float("inf")
+
+        regressed = change > threshold and after - before > min_difference
+        comparisons.append(Comparison(name, before, after, change, regressed))
+
+    return comparisons
+
+
+def format_time(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return "%.2f us" % (seconds * 1e6)
+    if seconds < 1:
+        return "%.2f ms" % (seconds * 1e3)
+    return "%.2f s" % seconds
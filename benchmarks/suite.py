@@ -0,0 +1,157 @@
+"""
+Benchmark definitions.
+
+Payloads are generated from a fixed seed so that results are comparable between
+runs. Payloads up to 1 KB are encoded into a single bar code, larger ones using
+Macro PDF417.
+"""
+
+import os
+import random
+import subprocess
+import sys
+from functools import partial
+from typing import Callable, Iterator, Union
+
+import pdf417gen
+from pdf417gen import auto_layout, encode, encode_macro, render_image, render_svg, vectorized
+from pdf417gen.compaction import compact
+from benchmarks.corpus import CORPUS, CorpusItem
+from benchmarks.runner import Benchmark
+
+SEED = 417
+
+SIZES = [10, 100, 1000]
+MACRO_SIZES = [10_000, 100_000]
+
+MODES = ["text", "numeric", "byte"]
+SECURITY_LEVELS = range(9)
+
+IMAGE_SCALES = [1, 3, 6]
+SVG_SCALES = [1, 3]
+
+# Columns used for Macro PDF417, enough to fit a segment of binary data
+MACRO_COLUMNS = 10
+
+# Size of the payload used to benchmark security levels, which still fits into
+# a bar code at level 8
+SECURITY_LEVEL_SIZE = 500
+
+# Size of the payload used to benchmark renderers
+RENDER_SIZE = 500
+
+# Statements run in a new interpreter to measure import time. The time includes
+# starting the interpreter, which is measured by "python".
+IMPORTS = {
+    "python": "pass",
+    "pdf417gen": "import pdf417gen",
+    "encode": "from pdf417gen import encode; encode('Hello, world!')",
+    "render_image": "from pdf417gen import encode, render_image; render_image(encode('Hello, world!'))",
+    "render_svg": "from pdf417gen import encode, render_svg; render_svg(encode('Hello, world!'))",
+    "console": "import pdf417gen.console",
+}
+
+TEXT_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 .,:-/"
+
+
+def payload(mode: str, size: int) -> Union[str, bytes]:
+    """Returns `size` bytes of data which compacts using the given mode."""
+    rnd = random.Random("%d-%s-%d" % (SEED, mode, size))
+
+    if mode == "text":
+        return "".join(rnd.choice(TEXT_ALPHABET) for _ in range(size))
+
+    if mode == "numeric":
+        return "".join(rnd.choice("0123456789") for _ in range(size))
+
+    if mode == "byte":
+        return bytes(rnd.getrandbits(8) for _ in range(size))
+
+    raise ValueError("Unknown mode: %r" % mode)
+
+
+def format_size(size: int) -> str:
+    if size >= 1000:
+        return "%dKB" % (size // 1000)
+    return "%dB" % size
+
+
+def setup_encode(
+    mode: str,
+    size: int,
+    security_level: int = 2,
+    backend: str = "python",
+) -> Callable[[], object]:
+    data = payload(mode, size)
+    force_binary = mode == "byte"
+
+    # Choose the smallest layout once, so only encoding is measured
+    plan = auto_layout(data, security_level=security_level, force_binary=force_binary)
+    return partial(encode, data, columns=plan.columns, security_level=security_level,
+                   force_binary=force_binary, backend=backend)
+
+
+def setup_encode_macro(mode: str, size: int) -> Callable[[], object]:
+    data = payload(mode, size)
+    return partial(encode_macro, data, columns=MACRO_COLUMNS, force_binary=mode == "byte")
+
+
+def setup_compact(item: CorpusItem) -> Callable[[], object]:
+    return lambda: list(compact(item.data, item.force_binary))
+
+
+def setup_render(
+    renderer: Callable[..., object],
+    scale: int,
+    **options: str,
+) -> Callable[[], object]:
+    codes = encode(payload("text", RENDER_SIZE), columns=10)
+    return partial(renderer, codes, scale=scale, **options)
+
+
+def setup_import(statement: str) -> Callable[[], object]:
+    # Make sure the interpreter imports this copy of pdf417gen
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(pdf417gen.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+
+    return partial(subprocess.run, [sys.executable, "-c", statement], env=env, check=True)
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    for mode in MODES:
+        for size in SIZES:
+            name = "encode/%s/%s" % (mode, format_size(size))
+            yield Benchmark(name, partial(setup_encode, mode, size))
+
+        for size in MACRO_SIZES:
+            name = "encode_macro/%s/%s" % (mode, format_size(size))
+            yield Benchmark(name, partial(setup_encode_macro, mode, size))
+
+    for item in CORPUS:
+        yield Benchmark("compact/%s" % item.name, partial(setup_compact, item))
+
+    for level in SECURITY_LEVELS:
+        name = "security_level/%d" % level
+        yield Benchmark(name, partial(setup_encode, "text", SECURITY_LEVEL_SIZE, level))
+
+    for scale in IMAGE_SCALES:
+        name = "render_image/scale-%d" % scale
+        yield Benchmark(name, partial(setup_render, render_image, scale))
+
+    # The NumPy backend is only benchmarked when NumPy is installed
+    if vectorized.available():
+        for size in SIZES:
+            name = "encode_numpy/text/%s" % format_size(size)
+            yield Benchmark(name, partial(setup_encode, "text", size, backend="numpy"))
+
+        for scale in IMAGE_SCALES:
+            name = "render_image_numpy/scale-%d" % scale
+            yield Benchmark(name, partial(setup_render, render_image, scale, backend="numpy"))
+
+    for scale in SVG_SCALES:
+        name = "render_svg/scale-%d" % scale
+        yield Benchmark(name, partial(setup_render, render_svg, scale))
+
+    for name, statement in IMPORTS.items():
+        yield Benchmark("import/%s" % name, partial(setup_import, statement))
@@ -0,0 +1,104 @@
+"""
+Thread scaling benchmarks.
+
+Measures the throughput of calling a benchmark from a thread pool, for an
+increasing number of threads, and reports the speedup over a single thread. The
+same number of calls is made for each thread count.
+
+On CPython with the GIL, only one thread runs Python code at a time, so the
+speedup stays close to 1 except while Pillow releases the GIL. On free-threaded
+CPython the speedup should grow with the number of threads, up to the number of
+CPU cores.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pdf417gen import render_image, render_svg
+from benchmarks import suite
+from benchmarks.runner import Benchmark, calibrate, results_document
+
+THREAD_COUNTS = [1, 2, 4, 8]
+
+# Minimum time to make all calls using a single thread, in seconds
+CALL_TIME = 0.5
+QUICK_CALL_TIME = 0.1
+
+# Number of times the calls are timed for each thread count, the fastest is used
+REPEAT = 3
+
+
+def benchmarks() -> Iterator[Benchmark]:
+    yield Benchmark("encode/text/1KB", partial(suite.setup_encode, "text", 1000))
+    yield Benchmark("encode/numeric/1KB", partial(suite.setup_encode, "numeric", 1000))
+    yield Benchmark("encode_macro/text/10KB", partial(suite.setup_encode_macro, "text", 10_000))
+    yield Benchmark("render_image/scale-3", partial(suite.setup_render, render_image, 3))
+    yield Benchmark("render_svg/scale-1", partial(suite.setup_render, render_svg, 1))
+
+
+def gil_enabled() -> Optional[bool]:
+    """Whether the GIL is enabled, None if unknown on Python < 3.13."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled() if is_gil_enabled else None
+
+
+def measure_threads(fn: Callable[[], Any], threads: int, calls: int) -> float:
+    """Returns the time to make `calls` calls of `fn` using a pool of threads."""
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        # Start all threads before timing
+        list(pool.map(time.sleep, [0.001] * threads))
+
+        start = time.perf_counter()
+        for future in [pool.submit(fn) for _ in range(calls)]:
+            future.result()
+        return time.perf_counter() - start
+
+
+def measure_scaling(
+    fn: Callable[[], Any],
+    thread_counts: List[int],
+    call_time: float = CALL_TIME,
+) -> Dict[str, Any]:
+    """Measures the throughput of `fn` for each number of threads."""
+    fn()
+    calls = max(calibrate(fn, call_time), max(thread_counts))
+
+    scaling: Dict[str, Dict[str, float]] = {}
+    for threads in thread_counts:
+        seconds = min(measure_threads(fn, threads, calls) for _ in range(REPEAT))
+        scaling[str(threads)] = {"seconds": seconds, "calls_per_second": calls / seconds}
+
+    # Speedup is relative to the lowest thread count, normally 1
+    base = scaling[str(min(thread_counts))]["seconds"]
+    for threads in thread_counts:
+        result = scaling[str(threads)]
+        result["speedup"] = base / result["seconds"]
+        result["efficiency"] = result["speedup"] * min(thread_counts) / threads
+
+    return {"calls": calls, "threads": scaling}
+
+
+def run(
+    benchmarks: List[Benchmark],
+    thread_counts: List[int] = THREAD_COUNTS,
+    call_time: float = CALL_TIME,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Runs thread scaling benchmarks and returns the results, see `runner.run`."""
+    results: Dict[str, Any] = {}
+    for benchmark in benchmarks:
+        results[benchmark.name] = measure_scaling(benchmark.setup(), thread_counts, call_time)
+        if progress:
+            progress(benchmark.name, results[benchmark.name])
+
+    return results_document(
+        "threads",
+        results,
+        thread_counts=thread_counts,
+        cpu_count=os.cpu_count(),
+        gil_enabled=gil_enabled(),
+    )
@@ -1,4 +1,72 @@
-from pdf417gen.encoding import encode, encode_macro
-from pdf417gen.rendering import render_image, render_svg
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-__all__ = ["encode", "encode_macro", "render_image", "render_svg"]
+if TYPE_CHECKING:
+    from pdf417gen.decoding import decode, decode_image
+    from pdf417gen.encoding import encode, encode_macro, estimate
+    from pdf417gen.layout import auto_layout
+    from pdf417gen.micro import encode_micro
+    from pdf417gen.rendering import render_image, render_svg
+
+# Modules which define the public functions. They are imported on first use, so
+# importing the package is cheap, and Pillow is only loaded when rendering.
+_EXPORTS = {
+    "auto_layout": "pdf417gen.layout",
+    "decode": "pdf417gen.decoding",
+    "decode_image": "pdf417gen.decoding",
+    "encode": "pdf417gen.encoding",
+    "encode_macro": "pdf417gen.encoding",
+    "encode_micro": "pdf417gen.micro",
+    "estimate": "pdf417gen.encoding",
+    "render_image": "pdf417gen.rendering",
+    "render_svg": "pdf417gen.rendering",
+}
+
+__all__ = [
+    "auto_layout", "decode", "decode_image", "encode", "encode_macro", "encode_micro",
+    "estimate", "preload", "render_image", "render_svg",
+]
+
+
+def preload(render: bool = True):
+    """Imports all modules and builds all lookup tables used when encoding.
+
+    Call in the parent process of a pre-fork server, e.g. in gunicorn's config
+    file, so that workers share the loaded modules and tables with the parent
+    instead of each building them on the first request. Calling `gc.freeze()`
+    after preloading keeps the garbage collector from touching the shared
+    objects, which would copy their memory pages into each worker.
+
+    Args:
+        render: Whether to also import Pillow and the renderers
+    """
+    from pdf417gen.error_correction import compute_error_correction_factors
+    from pdf417gen.micro import SIZES
+
+    for name, module in _EXPORTS.items():
+        if render or module != "pdf417gen.rendering":
+            __getattr__(name)
+
+    # Error correction factors for security levels 0-8 are stored in `data`,
+    # other counts used by MicroPDF417 are computed on first use
+    for size in SIZES:
+        compute_error_correction_factors(size.ec_words)
+
+    if render:
+        from PIL import Image, ImageColor, ImageOps  # noqa: F401
+        from xml.etree import ElementTree  # noqa: F401
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+
+    # Cache the value so __getattr__ is not called again
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,142 @@
+"""
+Asyncio API.
+
+Encoding and rendering are CPU bound and would block the event loop, so these
+functions run them on an executor. By default the loop's default executor (a
+thread pool) is used, which keeps the event loop responsive. Pass a
+`ProcessPoolExecutor` to encode on multiple cores.
+
+Concurrency of individual calls can be limited by sharing an `asyncio.Semaphore`
+between them. Cancelling a call cancels the work if it has not started yet,
+otherwise its result is discarded.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+
+from pdf417gen.encoding import encode
+from pdf417gen.rendering import render_image
+from pdf417gen.types import Barcode
+
+T = TypeVar("T")
+
+# Default number of items processed concurrently by `encode_many_async`
+DEFAULT_CONCURRENCY = 4
+
+
+async def encode_async(
+    data: Union[str, bytes],
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    **kwargs: Any
+) -> Barcode:
+    """
+    Encode data into a PDF417 barcode without blocking the event loop.
+
+    Args:
+        data: The data to encode (string or bytes)
+        executor: Executor to encode on, defaults to the loop's default executor
+        semaphore: Semaphore limiting the number of concurrent calls
+        **kwargs: Options passed to `encode`
+
+    Returns:
+        Encoded PDF417 barcode
+    """
+    return await _run(partial(encode, data, **kwargs), executor, semaphore)
+
+
+async def render_async(
+    codes: Barcode,
+    renderer: Callable[..., T] = render_image,
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    **kwargs: Any
+) -> T:
+    """
+    Render a barcode without blocking the event loop.
+
+    Args:
+        codes: Barcode returned by `encode` or `encode_async`
+        renderer: Render function, `render_image` or `render_svg`
+        executor: Executor to render on, defaults to the loop's default executor
+        semaphore: Semaphore limiting the number of concurrent calls
+        **kwargs: Options passed to the renderer
+
+    Returns:
+        The rendered barcode
+    """
+    return await _run(partial(renderer, codes, **kwargs), executor, semaphore)
+
+
+async def encode_many_async(
+    items: Iterable[Union[str, bytes]],
+    renderer: Optional[Callable[[Barcode], Any]] = None,
+    executor: Optional[Executor] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    **kwargs: Any
+) -> List[Any]:
+    """
+    Encode, and optionally render, many items without blocking the event loop.
+
+    At most `concurrency` items are submitted to the executor at a time, and
+    items are taken from `items` only as capacity frees up, so large or lazy
+    iterables are not read into memory up front. If any item fails, or the call
+    is cancelled, the remaining items are cancelled.
+
+    Args:
+        items: Data to encode
+        renderer: Optional render function applied to each barcode in the same
+                  executor call, e.g. `partial(render_image, scale=2)`. Must be
+                  picklable when using a process pool.
+        executor: Executor to encode on, defaults to the loop's default executor
+        concurrency: Maximum number of items processed at the same time
+        **kwargs: Options passed to `encode`
+
+    Returns:
+        List of barcodes, or rendered barcodes if `renderer` is given, in the
+        order of `items`
+    """
+    if concurrency < 1:
+        raise ValueError("'concurrency' must be at least 1. Given: %r" % concurrency)
+
+    loop = asyncio.get_running_loop()
+    pending = enumerate(items)
+    results: Dict[int, Any] = {}
+
+    async def worker():
+        # Workers share the iterator, each taking the next item when done
+        for index, data in pending:
+            fn = partial(_encode_and_render, data, renderer, kwargs)
+            results[index] = await loop.run_in_executor(executor, fn)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+
+    return [results[index] for index in range(len(results))]
+
+
+def _encode_and_render(
+    data: Union[str, bytes],
+    renderer: Optional[Callable[[Barcode], Any]],
+    kwargs: Dict[str, Any],
+) -> Any:
+    codes = encode(data, **kwargs)
+    return renderer(codes) if renderer else codes
+
+
+async def _run(fn: Callable[[], T], executor: Optional[Executor], semaphore: Optional[asyncio.Semaphore]) -> T:
+    loop = asyncio.get_running_loop()
+
+    if semaphore is None:
+        return await loop.run_in_executor(executor, fn)
+
+    async with semaphore:
+        return await loop.run_in_executor(executor, fn)
@@ -0,0 +1,328 @@
+"""
+Batch processing: encode and render many bar codes from a manifest.
+
+A manifest is either a JSONL file, with one JSON object per line, or a CSV file
+with a header row. Each item must contain the `data` to encode and the `output`
+file path, and may contain any of the options listed in `OPTION_TYPES` which
+override the defaults given to `run_batch`.
+
+The output format is determined by the file extension: `.svg` files are
+rendered using `render_svg`, anything else using `render_image`.
+
+Large batches can be split between machines using `shard_items`, and resumed
+after an interruption using a checkpoint file which records completed items.
+An item is skipped if the checkpoint holds an entry with the same data,
+output and options, and the output file still has the recorded digest.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import ElementTree
+
+from PIL import Image
+
+from pdf417gen.encoding import encode
+from pdf417gen.rendering import render_image, render_svg
+from pdf417gen.types import Barcode, BatchItem, BatchResult
+
+# Options which can be given per item, and their types
+OPTION_TYPES = {
+    "columns": int,
+    "security_level": int,
+    "encoding": str,
+    "force_binary": bool,
+    "compact": bool,
+    "scale": int,
+    "ratio": int,
+    "padding": int,
+    "fg_color": str,
+    "bg_color": str,
+}
+
+ENCODE_OPTIONS = ["columns", "security_level", "encoding", "force_binary", "compact"]
+
+TRUE_VALUES = ["1", "true", "yes", "y"]
+FALSE_VALUES = ["0", "false", "no", "n"]
+
+
+def read_manifest(path: str) -> List[BatchItem]:
+    """Reads batch items from a JSONL or CSV manifest, based on the extension."""
+    _, ext = os.path.splitext(path)
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext.lower() == ".csv":
+            return list(parse_csv_manifest(f))
+        return list(parse_jsonl_manifest(f))
+
+
+def parse_jsonl_manifest(lines: Iterable[str]) -> Iterator[BatchItem]:
+    index = 0
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError("Invalid JSON on line %d: %s" % (line_no, e))
+
+        if not isinstance(record, dict):
+            raise ValueError("Expected an object on line %d" % line_no)
+
+        yield parse_item(index, record)
+        index += 1
+
+
+def parse_csv_manifest(lines: Iterable[str]) -> Iterator[BatchItem]:
+    for index, record in enumerate(csv.DictReader(lines)):
+        # Empty cells are treated as not given
+        record = {k: v for k, v in record.items() if v not in (None, "")}
+        yield parse_item(index, record)
+
+
+def parse_item(index: int, record: Dict[str, Any]) -> BatchItem:
+    record = dict(record)
+    data = record.pop("data", None)
+    output = record.pop("output", None)
+
+    if not isinstance(data, str) or not data:
+        raise ValueError("Item %d: 'data' is required" % index)
+
+    if not isinstance(output, str) or not output:
+        raise ValueError("Item %d: 'output' is required" % index)
+
+    try:
+        options = parse_options(record)
+    except ValueError as e:
+        raise ValueError("Item %d: %s" % (index, e))
+
+    return BatchItem(index, data, output, options)
+
+
+def parse_options(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates options given in `record` and converts them to their types."""
+    options: Dict[str, Any] = {}
+    for name, value in record.items():
+        if name not in OPTION_TYPES:
+            raise ValueError("unknown option %r" % name)
+        options[name] = parse_option(name, value)
+
+    return options
+
+
+def parse_option(name: str, value: Any) -> Any:
+    option_type = OPTION_TYPES[name]
+
+    # CSV values are always strings, JSON values are already typed
+    if isinstance(value, str) and option_type is bool:
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+    elif isinstance(value, str) and option_type is int:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    elif isinstance(value, option_type) and not (option_type is int and isinstance(value, bool)):
+        return value
+
+    raise ValueError("invalid value for %r: %r" % (name, value))
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parses a shard given as "i/n" where i is between 0 and n - 1."""
+    try:
+        shard, num_shards = [int(x) for x in value.split("/")]
+    except ValueError:
+        raise ValueError("Invalid shard %r, expected i/n, e.g. 0/4" % value)
+
+    if num_shards < 1 or not 0 <= shard < num_shards:
+        raise ValueError("Invalid shard %r, i must be between 0 and n - 1" % value)
+
+    return shard, num_shards
+
+
+def shard_items(items: List[BatchItem], shard: int, num_shards: int) -> List[BatchItem]:
+    """Returns the items belonging to the given shard.
+
+    Items are assigned by their position in the manifest, so each shard gets
+    the same items on every run, and every item belongs to exactly one shard.
+    """
+    return [item for item in items if item.index % num_shards == shard]
+
+
+def item_key(item: BatchItem, defaults: Optional[Dict[str, Any]] = None) -> str:
+    """Returns a key identifying the item's data, output and effective options."""
+    options = dict(defaults or {})
+    options.update(item.options)
+
+    payload = json.dumps([item.data, item.output, options], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(partial(f.read, 65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: str) -> Dict[str, str]:
+    """Loads a checkpoint file, mapping item keys to output digests."""
+    checkpoint: Dict[str, str] = {}
+
+    if not os.path.exists(path):
+        return checkpoint
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                checkpoint[record["key"]] = record["digest"]
+            except (ValueError, KeyError, TypeError):
+                # The last line may be incomplete if the job was killed
+                continue
+
+    return checkpoint
+
+
+def is_completed(item: BatchItem, key: str, checkpoint: Dict[str, str]) -> bool:
+    """Checks whether the item's output exists and matches the checkpoint."""
+    digest = checkpoint.get(key)
+    if digest is None or not os.path.exists(item.output):
+        return False
+
+    return file_digest(item.output) == digest
+
+
+def process_item(item: BatchItem, defaults: Optional[Dict[str, Any]] = None) -> BatchResult:
+    """Encodes, renders and saves a single item, capturing any errors."""
+    options = dict(defaults or {})
+    options.update(item.options)
+
+    start = time.perf_counter()
+    try:
+        save(item.data, item.output, options)
+        digest = file_digest(item.output)
+        error = None
+    except Exception as e:
+        digest = None
+        error = str(e)
+
+    return BatchResult(item.index, item.output, error, time.perf_counter() - start, digest)
+
+
+def save(data: str, output: str, options: Dict[str, Any]):
+    """Generates a bar code and saves it in the format given by the extension."""
+    _, ext = os.path.splitext(output)
+
+    if ext.lower() == ".svg":
+        create_svg(data, options).write(output)
+    else:
+        create_image(data, options).save(output)
+
+
+def encode_item(data: str, options: Dict[str, Any]) -> Barcode:
+    encode_options = {k: v for k, v in options.items() if k in ENCODE_OPTIONS}
+    return encode(data, **encode_options)
+
+
+def create_image(data: str, options: Dict[str, Any]) -> Image.Image:
+    """Encodes data and renders it to an image using the given options."""
+    return render_image(
+        encode_item(data, options),
+        scale=options.get("scale", 3),
+        ratio=options.get("ratio", 3),
+        padding=options.get("padding", 20),
+        fg_color=options.get("fg_color", "#000"),
+        bg_color=options.get("bg_color", "#FFF"),
+    )
+
+
+def create_svg(data: str, options: Dict[str, Any]) -> ElementTree:
+    """Encodes data and renders it to an SVG document using the given options."""
+    return render_svg(
+        encode_item(data, options),
+        scale=options.get("scale", 3),
+        ratio=options.get("ratio", 3),
+        color=options.get("fg_color", "#000"),
+    )
+
+
+def run_batch(
+    items: List[BatchItem],
+    jobs: int = 1,
+    defaults: Optional[Dict[str, Any]] = None,
+    checkpoint: Optional[str] = None,
+) -> Iterator[BatchResult]:
+    """
+    Process batch items, yielding results in manifest order.
+
+    Args:
+        items: Items to process, see `read_manifest`
+        jobs: Number of worker processes, items are processed in the current
+              process if 1
+        defaults: Options used for items which do not specify them
+        checkpoint: Path to a checkpoint file. Items recorded as completed in
+                    the checkpoint are skipped if their output still matches,
+                    and newly completed items are appended to it.
+
+    Returns:
+        Iterator of results, one for each item. Failed items have the `error`
+        set instead of raising, skipped items have `skipped` set.
+    """
+    if checkpoint is None:
+        yield from _process_items(items, jobs, defaults)
+        return
+
+    completed = load_checkpoint(checkpoint)
+    keys = {item.index: item_key(item, defaults) for item in items}
+
+    pending: List[BatchItem] = []
+    skipped: Dict[int, BatchResult] = {}
+    for item in items:
+        if is_completed(item, keys[item.index], completed):
+            skipped[item.index] = BatchResult(
+                item.index, item.output, None, 0.0, completed[keys[item.index]], True)
+        else:
+            pending.append(item)
+
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        results = _process_items(pending, jobs, defaults)
+
+        # Merge skipped items back in to keep results in manifest order
+        for item in items:
+            if item.index in skipped:
+                yield skipped[item.index]
+                continue
+
+            result = next(results)
+            if not result.error:
+                f.write(json.dumps({"key": keys[item.index], "digest": result.digest}) + "\n")
+                f.flush()
+
+            yield result
+
+
+def _process_items(
+    items: List[BatchItem],
+    jobs: int,
+    defaults: Optional[Dict[str, Any]],
+) -> Iterator[BatchResult]:
+    process = partial(process_item, defaults=defaults)
+
+    if jobs > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # Send items in chunks to reduce inter-process overhead
+            chunksize = max(1, len(items) // (jobs * 4))
+            yield from pool.map(process, items, chunksize=chunksize)
+    else:
+        yield from map(process, items)
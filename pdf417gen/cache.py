@@ -0,0 +1,247 @@
+"""
+Cache for encoded and rendered bar codes.
+
+Encoding and rendering are deterministic, so results can be cached by a hash of
+the input and all options. `Cache` keeps results in an in-memory LRU store
+bounded by the total size of the cached values, and optionally in a directory
+on disk, which can be shared between processes and survives restarts.
+
+Usage:
+
+    cache = Cache(max_size=64 * 1024 * 1024, directory="/var/cache/pdf417gen")
+    codes = cache.encode(data, columns=6)
+    barcodes = cache.encode_macro(data, segment_size=800)
+    image = cache.render_image(codes, scale=2)
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Union
+from xml.etree.ElementTree import Element, ElementTree, fromstring, tostring
+
+from PIL import Image
+
+from pdf417gen.encoding import encode, encode_macro
+from pdf417gen.rendering import render_image, render_svg
+from pdf417gen.types import Barcode
+
+# Included in cache keys, increment when output for the same input changes to
+# invalidate results stored on disk by older versions
+CACHE_VERSION = 1
+
+# Default maximum size of the in-memory store in bytes
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+def cache_key(kind: str, data: Union[str, bytes, Barcode], **options: Any) -> str:
+    """Returns a hash of the input data and options, used as the cache key."""
+    if isinstance(data, bytes):
+        payload: Any = {"bytes": data.hex()}
+    else:
+        payload = data
+
+    serialized = json.dumps([CACHE_VERSION, kind, payload, options], sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def parse_svg(value: bytes) -> Element:
+    """Parses an SVG document produced by `render_svg`, into the same tree."""
+    root = fromstring(value)
+
+    # Parsing moves the namespace from the xmlns attribute to the tags
+    namespace, _, _ = root.tag[1:].partition("}")
+    for element in root.iter():
+        element.tag = element.tag.rpartition("}")[2]
+
+    attributes = dict(root.attrib)
+    root.attrib.clear()
+    root.set("version", attributes.pop("version"))
+    root.set("xmlns", namespace)
+    root.attrib.update(attributes)
+
+    return root
+
+
+class MemoryStore:
+    """Thread safe LRU store which evicts the least recently used values when
+    their total size exceeds `max_size` bytes."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes):
+        # Values larger than the whole store would evict everything else
+        if len(value) > self.max_size:
+            return
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+
+            self.entries[key] = value
+            self.size += len(value)
+
+            while self.size > self.max_size:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class DiskStore:
+    """Stores values as files in a directory, named by their key."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        # Spread files over subdirectories to keep directories small
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, value: bytes):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file and rename it, so concurrent readers never
+        # see a partially written file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class Cache:
+    """Two level cache of encoded and rendered bar codes.
+
+    Values are looked up in memory first, then on disk if a `directory` is
+    given. Values found on disk are kept in memory for subsequent lookups.
+
+    Safe to use from multiple threads, `hits` and `misses` are updated under
+    a lock.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, directory: Optional[str] = None):
+        self.memory = MemoryStore(max_size)
+        self.disk = DiskStore(directory) if directory else None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.memory.get(key)
+
+        if value is None and self.disk:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+
+        # Incrementing is not atomic, updates would be lost on free-threaded
+        # Python without the lock
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value
+
+    def put(self, key: str, value: bytes):
+        self.memory.put(key, value)
+        if self.disk:
+            self.disk.put(key, value)
+
+    def encode(self, data: Union[str, bytes], **kwargs: Any) -> Barcode:
+        """Cached version of `encode`, takes the same arguments."""
+        key = cache_key("encode", data, **kwargs)
+
+        value = self.get(key)
+        if value is not None:
+            return json.loads(value)
+
+        codes = encode(data, **kwargs)
+        self.put(key, json.dumps(codes, separators=(",", ":")).encode("ascii"))
+        return codes
+
+    def encode_macro(self, data: Union[str, bytes], **kwargs: Any) -> List[Barcode]:
+        """Cached version of `encode_macro`, takes the same arguments except
+        `renderer`.
+
+        Unless a `file_id` is given, it is derived from the content so that the
+        result is deterministic, see `content_file_id`."""
+        if kwargs.get("renderer"):
+            raise ValueError("'renderer' is not supported, render the cached bar codes instead")
+
+        if kwargs.get("file_id") is None:
+            kwargs["content_file_id"] = True
+
+        # Options which do not affect the result are not part of the key
+        key_options = {k: v for k, v in kwargs.items() if k not in ("workers", "executor")}
+        key = cache_key("encode_macro", data, **key_options)
+
+        value = self.get(key)
+        if value is not None:
+            return json.loads(value)
+
+        barcodes = encode_macro(data, **kwargs)
+        self.put(key, json.dumps(barcodes, separators=(",", ":")).encode("ascii"))
+        return barcodes
+
+    def render_image(self, codes: Barcode, **kwargs: Any) -> Image.Image:
+        """Cached version of `render_image`, takes the same arguments.
+
+        Images are stored PNG encoded."""
+        key = cache_key("image", codes, **kwargs)
+
+        value = self.get(key)
+        if value is not None:
+            image = Image.open(io.BytesIO(value))
+            image.load()
+            return image
+
+        image = render_image(codes, **kwargs)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        self.put(key, buffer.getvalue())
+        return image
+
+    def render_svg(self, codes: Barcode, **kwargs: Any) -> ElementTree:
+        """Cached version of `render_svg`, takes the same arguments."""
+        key = cache_key("svg", codes, **kwargs)
+
+        value = self.get(key)
+        if value is not None:
+            return ElementTree(parse_svg(value))
+
+        tree = render_svg(codes, **kwargs)
+        self.put(key, tostring(tree.getroot()))
+        return tree
@@ -1,11 +1,11 @@
 from itertools import chain, groupby
-from typing import Generator, Iterable, List
+from typing import Callable, Dict, Generator, Iterable, List
 
 from pdf417gen.compaction import optimizations
-from pdf417gen.compaction.byte import compact_bytes
-from pdf417gen.compaction.numeric import compact_numbers
-from pdf417gen.compaction.text import compact_text
-from pdf417gen.data import CHARACTERS_LOOKUP
+from pdf417gen.compaction.byte import compact_bytes, count_bytes
+from pdf417gen.compaction.numeric import compact_numbers, count_numbers
+from pdf417gen.compaction.text import compact_text, count_text
+from pdf417gen.data import NO_VALUE, PACKED_PREFERRED_SUBMODES
 from pdf417gen.types import Codeword, Chunk, CompactionFn
 
 
@@ -16,6 +16,20 @@ BYTE_LATCH_ALT = 924
 BYTE_SWITCH = 913
 NUMERIC_LATCH = 902
 
+# Functions which count the code words produced by each compaction function
+COUNT_FNS: Dict[CompactionFn, Callable[[bytes], int]] = {
+    compact_bytes: count_bytes,
+    compact_numbers: count_numbers,
+    compact_text: count_text,
+}
+
+# Names of the compaction modes, as reported by `count_chunks_by_mode`
+MODE_NAMES: Dict[CompactionFn, str] = {
+    compact_text: "text",
+    compact_numbers: "numeric",
+    compact_bytes: "byte",
+}
+
 
 def compact(data: bytes, force_binary: bool = False) -> Iterable[Codeword]:
     """
@@ -26,30 +40,70 @@ def compact(data: bytes, force_binary: bool = False) -> Iterable[Codeword]:
         force_binary: If True, forces byte compaction mode for all data,
                      bypassing optimizations (useful for pre-compressed data)
     """
+    return compact_chunks(split_to_chunks(data, force_binary))
+
+
+def count(data: bytes, force_binary: bool = False) -> int:
+    """
+    Returns the number of code words `compact` produces for given data, without
+    compacting it.
+    """
+    return count_chunks(split_to_chunks(data, force_binary))
+
+
+def split_to_chunks(data: bytes, force_binary: bool = False) -> Iterable[Chunk]:
+    """
+    Splits data into chunks, each compacted using the optimal compaction mode.
+    """
     if force_binary:
         # Skip optimizations and directly use byte compaction
-        return _compact_chunks([Chunk(data, compact_bytes)])
-    
+        return [Chunk(data, compact_bytes)]
+
     # Normal path with optimizations
     chunks = _split_to_chunks(data)
     chunks = optimizations.replace_short_numeric_chunks(chunks)
     chunks = optimizations.merge_chunks_with_same_compact_fn(chunks)
-    return _compact_chunks(chunks)
+    return chunks
 
 
-def _compact_chunks(chunks: Iterable[Chunk]) -> Iterable[Codeword]:
+def compact_chunks(chunks: Iterable[Chunk]) -> Iterable[Codeword]:
     compacted_chunks = (
         _compact_chunk(ordinal, chunk) for ordinal, chunk in enumerate(chunks))
 
     return chain(*compacted_chunks)
 
 
+def count_chunks(chunks: Iterable[Chunk]) -> int:
+    """Returns the number of code words `compact_chunks` produces."""
+    total = 0
+
+    for ordinal, chunk in enumerate(chunks):
+        if _needs_switch_code(ordinal, chunk):
+            total += 1
+        total += COUNT_FNS[chunk.compact_fn](chunk.data)
+
+    return total
+
+
+def count_chunks_by_mode(chunks: Iterable[Chunk]) -> Dict[str, int]:
+    """Returns the number of code words `compact_chunks` produces in each
+    compaction mode, including the codes switching to the mode."""
+    totals = {name: 0 for name in MODE_NAMES.values()}
+
+    for ordinal, chunk in enumerate(chunks):
+        name = MODE_NAMES[chunk.compact_fn]
+        if _needs_switch_code(ordinal, chunk):
+            totals[name] += 1
+        totals[name] += COUNT_FNS[chunk.compact_fn](chunk.data)
+
+    return totals
+
+
 def _compact_chunk(ordinal: int, chunk: Chunk):
     code_words: List[Codeword] = []
 
     # Add the switch code if required
-    add_switch_code = ordinal > 0 or chunk.compact_fn != compact_text
-    if add_switch_code:
+    if _needs_switch_code(ordinal, chunk):
         code_words.append(get_switch_code(chunk))
 
     code_words.extend(chunk.compact_fn(chunk.data))
@@ -57,6 +111,11 @@ def _compact_chunk(ordinal: int, chunk: Chunk):
     return code_words
 
 
+def _needs_switch_code(ordinal: int, chunk: Chunk) -> bool:
+    # Text compaction is the default mode at the start of the barcode
+    return ordinal > 0 or chunk.compact_fn != compact_text
+
+
 def _split_to_chunks(data: bytes) -> Generator[Chunk, None, None]:
     """
     Splits a string into chunks which can be compacted with the same compacting
@@ -70,7 +129,7 @@ def get_optimal_compactor_fn(char: int) -> CompactionFn:
     if 48 <= char <= 57:
         return compact_numbers
 
-    if char in CHARACTERS_LOOKUP:
+    if PACKED_PREFERRED_SUBMODES[char] != NO_VALUE:
         return compact_text
 
     return compact_bytes
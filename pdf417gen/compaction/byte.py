@@ -10,13 +10,22 @@ from typing import Iterable, List, Tuple
 from pdf417gen.types import Codeword
 from pdf417gen.util import switch_base, chunks
 
+# Number of bytes packed into 5 code words
+BYTE_GROUP_SIZE = 6
+
 
 def compact_bytes(data: bytes) -> Iterable[Codeword]:
     """Encodes data into code words using the Byte compaction mode."""
-    compacted_chunks = (_compact_chunk(chunk) for chunk in chunks(data, size=6))
+    compacted_chunks = (_compact_chunk(chunk) for chunk in chunks(data, size=BYTE_GROUP_SIZE))
     return chain(*compacted_chunks)
 
 
+def count_bytes(data: bytes) -> int:
+    """Returns the number of code words produced by `compact_bytes`."""
+    full, remainder = divmod(len(data), BYTE_GROUP_SIZE)
+    return full * 5 + remainder
+
+
 def _compact_chunk(chunk: Tuple[int, ...]) -> List[Codeword]:
     """
     Chunks of exactly 6 bytes are encoded into 5 codewords by using a base 256
@@ -24,7 +33,7 @@ def _compact_chunk(chunk: Tuple[int, ...]) -> List[Codeword]:
     """
     digits = [i for i in chunk]
 
-    if len(chunk) == 6:
+    if len(chunk) == BYTE_GROUP_SIZE:
         base900 = switch_base(digits, 256, 900)
         return [0] * (5 - len(base900)) + base900
 
@@ -10,6 +10,9 @@ from typing import Iterable, List, Tuple
 from pdf417gen.types import Codeword
 from pdf417gen.util import to_base, chunks
 
+# Maximum number of digits packed into a single group of code words
+NUMERIC_GROUP_SIZE = 44
+
 
 def _compact_chunk(chunk: Tuple[int, ...]) -> List[Codeword]:
     number = "".join(chr(x) for x in chunk)
@@ -19,5 +22,19 @@ def _compact_chunk(chunk: Tuple[int, ...]) -> List[Codeword]:
 
 def compact_numbers(data: bytes) -> Iterable[Codeword]:
     """Encodes data into code words using the Numeric compaction mode."""
-    compacted_chunks = (_compact_chunk(chunk) for chunk in chunks(data, size=44))
+    compacted_chunks = (_compact_chunk(chunk) for chunk in chunks(data, size=NUMERIC_GROUP_SIZE))
     return chain(*compacted_chunks)
+
+
+def count_numbers(data: bytes) -> int:
+    """
+    Returns the number of code words produced by `compact_numbers`.
+
+    A group of n digits, prefixed by "1", is a number between 10^n and 2*10^n
+    which always has n // 3 + 1 digits in base 900.
+    """
+    full, remainder = divmod(len(data), NUMERIC_GROUP_SIZE)
+    count = full * (NUMERIC_GROUP_SIZE // 3 + 1)
+    if remainder:
+        count += remainder // 3 + 1
+    return count
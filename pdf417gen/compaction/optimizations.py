@@ -5,6 +5,9 @@ from pdf417gen.compaction.text import compact_text
 from pdf417gen.types import Chunk
 from pdf417gen.util import iterate_prev_next
 
+# Minimal number of consecutive digits worth switching to Numeric compaction
+MIN_NUMERIC_LENGTH = 13
+
 
 def replace_short_numeric_chunks(chunks: Iterable[Chunk]) -> Generator[Chunk, None, None]:
     """
@@ -16,7 +19,7 @@ def replace_short_numeric_chunks(chunks: Iterable[Chunk]) -> Generator[Chunk, No
     for prev, chunk, next in iterate_prev_next(chunks):
         is_short_numeric_chunk = (
             chunk.compact_fn == compact_numbers
-            and len(chunk.data) < 13
+            and len(chunk.data) < MIN_NUMERIC_LENGTH
         )
 
         borders_text_chunk = (
@@ -6,50 +6,75 @@ Rate compaction: 2 bytes per code word
 """
 
 from typing import Iterable, Tuple
-from pdf417gen.data import CHARACTERS_LOOKUP, SWITCH_CODES
+from pdf417gen.data import NO_VALUE, PACKED_CHARACTER_VALUES, PACKED_PREFERRED_SUBMODES
+from pdf417gen.data import PACKED_SWITCH_CODES, TEXT_SUBMODES
 from pdf417gen.types import Codeword, Submode
 from pdf417gen.util import chunks
 
+# Submodes are numbered by their position in TEXT_SUBMODES, see `data`
+SUBMODE_COUNT = len(TEXT_SUBMODES)
 
-def _exists_in_submode(char: int, submode: Submode) -> bool:
-    return char in CHARACTERS_LOOKUP and submode in CHARACTERS_LOOKUP[char]
+# By default, encoding starts in uppercase submode
+INITIAL_SUBMODE = TEXT_SUBMODES.index(Submode.UPPER)
 
 
-def _get_submode(char: int) -> Submode:
-    if char not in CHARACTERS_LOOKUP:
-        raise ValueError("Cannot encode char: {}".format(char))
+def _get_value(char: int, submode: int) -> int:
+    """Returns the value of the character in the submode, or NO_VALUE."""
+    return PACKED_CHARACTER_VALUES[submode * 256 + char]
+
 
-    submodes = CHARACTERS_LOOKUP[char].keys()
+def _get_submode(char: int) -> int:
+    submode = PACKED_PREFERRED_SUBMODES[char]
 
-    preference = [Submode.LOWER, Submode.UPPER, Submode.MIXED, Submode.PUNCT]
+    if submode == NO_VALUE:
+        raise ValueError("Cannot encode char: {}".format(char))
 
-    for submode in preference:
-        if submode in submodes:
-            return submode
+    return submode
 
-    raise ValueError("Cannot encode char: {}".format(char))
+
+def _get_switch_codes(source: int, target: int) -> bytes:
+    offset = (source * SUBMODE_COUNT + target) * 2
+    codes = PACKED_SWITCH_CODES[offset:offset + 2]
+    return codes if codes[1] != NO_VALUE else codes[:1]
 
 
 def compact_text_interim(data: bytes):
     """Encodes text data to interim code words."""
 
     def _interim_text_generator(chars: bytes):
-        # By default, encoding starts in uppercase submode
-        submode = Submode.UPPER
+        submode = INITIAL_SUBMODE
 
         for char in chars:
+            value = _get_value(char, submode)
+
             # Switch submode if needed
-            if not _exists_in_submode(char, submode):
+            if value == NO_VALUE:
                 prev_submode = submode
                 submode = _get_submode(char)
-                for code in SWITCH_CODES[prev_submode][submode]:
-                    yield code
+                yield from _get_switch_codes(prev_submode, submode)
+                value = _get_value(char, submode)
 
-            yield CHARACTERS_LOOKUP[char][submode]
+            yield value
 
     return _interim_text_generator(data)
 
 
+def count_text(data: bytes) -> int:
+    """Returns the number of code words produced by `compact_text`."""
+    submode = INITIAL_SUBMODE
+    count = 0
+
+    for char in data:
+        if _get_value(char, submode) == NO_VALUE:
+            prev_submode = submode
+            submode = _get_submode(char)
+            count += len(_get_switch_codes(prev_submode, submode))
+        count += 1
+
+    # Two interim codes per code word
+    return (count + 1) // 2
+
+
 # Since each code word consists of 2 characters, a padding value is
 # needed when encoding a single character. 29 is used as padding because
 # it's a switch in all 4 submodes, and doesn't add any data.
@@ -0,0 +1,131 @@
+"""
+Compression of data before encoding.
+
+Compressed data looks random, so it is encoded using byte compaction, which
+packs 6 bytes into 5 code words. Text and numeric compaction pack 2 and almost
+3 characters into each code word, so compressing short or numeric data often
+produces more code words than encoding it as is.
+
+With `compression="auto"`, the data is compressed using each codec, and the
+code words each result compacts into are counted without encoding it. The
+option which produces the fewest code words, or the fewest segments in Macro
+PDF417, is chosen, including not compressing the data at all.
+
+Readers must decompress the data, so they need to know which codec was used.
+`estimate` and `auto_layout` return the codec chosen by "auto" in `Plan.codec`,
+which can be passed on to `encode` to compress the data the same way. Magic
+bytes are not enough to tell, uncompressed data may start with the same bytes.
+"""
+
+from typing import Any, Callable, List
+
+from pdf417gen.compaction import count
+from pdf417gen.types import Compressed
+
+# Codecs which can be chosen explicitly, in order of preference when several
+# produce the same number of code words
+CODECS = ["zlib", "bz2", "lzma"]
+
+# Supported values of the `compression` option
+COMPRESSION_OPTIONS = ["none", "auto"] + CODECS
+
+# Smallest output of each codec, its headers and checksums, in bytes
+MIN_SIZES = {"zlib": 6, "bz2": 14, "lzma": 32}
+
+# Smallest dictionary size allowed by lzma
+LZMA_MIN_DICT_SIZE = 4096
+
+# Bytes in a bz2 block for each compression level
+BZ2_LEVEL_SIZE = 100_000
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compresses data using the codec with the highest compression level.
+
+    Dictionaries and block sizes are reduced to the size of the data, which
+    compresses data that fits in a bar code just as well, without allocating
+    tens of megabytes for each call.
+    """
+    # Imported when used, so that encoding without compression does not load
+    # the compression libraries
+    if codec == "zlib":
+        import zlib
+        return zlib.compress(data, 9)
+
+    if codec == "bz2":
+        import bz2
+        level = min(9, max(1, -(-len(data) // BZ2_LEVEL_SIZE)))
+        return bz2.compress(data, level)
+
+    if codec == "lzma":
+        import lzma
+        dict_size = max(LZMA_MIN_DICT_SIZE, len(data))
+        filters = [{"id": lzma.FILTER_LZMA2, "preset": 9, "dict_size": dict_size}]
+        return lzma.compress(data, format=lzma.FORMAT_XZ, filters=filters)
+
+    raise ValueError("Unknown codec: %r" % codec)
+
+
+def can_win(codec: str, uncompressed_count: int) -> bool:
+    """Whether compressing with the codec can produce fewer code words than
+    `uncompressed_count`. Byte compaction needs at least 5 code words for 6
+    bytes, so the codec's headers alone may take more space."""
+    return MIN_SIZES[codec] * 5 // 6 < uncompressed_count
+
+
+def validate_compression(compression: str):
+    if compression not in COMPRESSION_OPTIONS:
+        raise ValueError("'compression' must be one of %s. Given: %r" % (
+            ", ".join(COMPRESSION_OPTIONS), compression))
+
+
+def candidates(data: bytes, compression: str, force_binary: bool) -> List[Compressed]:
+    """Returns the ways to encode the data allowed by the `compression` option."""
+    validate_compression(compression)
+
+    if compression == "none":
+        return [Compressed("none", data, force_binary)]
+
+    if compression == "auto":
+        # Skip codecs which can not produce fewer code words on short data
+        uncompressed_count = count(data, force_binary)
+        codecs = [codec for codec in CODECS if can_win(codec, uncompressed_count)]
+        uncompressed = [Compressed("none", data, force_binary)]
+    else:
+        codecs = [compression]
+        uncompressed = []
+
+    return uncompressed + [Compressed(codec, compress(data, codec), True) for codec in codecs]
+
+
+def count_code_words(candidate: Compressed) -> int:
+    return count(candidate.data, candidate.force_binary)
+
+
+def apply_compression(
+    data: bytes,
+    compression: str,
+    force_binary: bool,
+    cost: Callable[[Compressed], Any] = count_code_words,
+) -> Compressed:
+    """Compresses the data as given by the `compression` option.
+
+    Args:
+        data: Data to encode
+        compression: "none", "auto" or the name of a codec
+        force_binary: Whether uncompressed data is encoded using byte compaction
+        cost: Estimates the cost of encoding a candidate, the cheapest one is
+              chosen, by default the number of code words
+
+    Returns:
+        The chosen codec, the data to encode and whether to force byte
+        compaction.
+    """
+    options = candidates(data, compression, force_binary)
+    if len(options) == 1:
+        return options[0]
+
+    # min() keeps the first of equally good candidates, so data is only
+    # compressed if it helps
+    return min(options, key=cost)
+
@@ -1,12 +1,41 @@
+import io
 import sys
 import os
-import zlib
+import json
+import time
 
-from argparse import ArgumentParser, RawDescriptionHelpFormatter
-from typing import List, Union
-from PIL import Image
+from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
+from contextlib import nullcontext
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
-from pdf417gen import encode, render_image
+from pdf417gen import auto_layout, encode, render_image
+from pdf417gen.compression import COMPRESSION_OPTIONS
+from pdf417gen.encoding import MAX_DATA_BYTES
+from pdf417gen.instrumentation import Metrics, hooked
+
+# Batch and server modes, and profiling, import their dependencies when used to
+# keep the CLI quick to start
+if TYPE_CHECKING:
+    import cProfile
+
+
+# Stages reported by --stats, in order
+STAT_STAGES = [
+    ("compact_seconds", "Compaction"),
+    ("error_correction_seconds", "Error correction"),
+    ("encode_rows_seconds", "Row encoding"),
+    ("render_image_seconds", "Rendering"),
+]
+
+# Number of functions printed by --profile
+PROFILE_LINES = 30
+
+# Keys accepted by pstats.Stats.sort_stats, for --profile-sort
+PROFILE_SORT_KEYS = [
+    "calls", "cumulative", "filename", "line", "name", "nfl", "pcalls", "stdname", "time",
+    "tottime",
+]
 
 
 def print_usage():
@@ -15,6 +44,8 @@ def print_usage():
     print("Commands:")
     print("  help    show this help message and exit")
     print("  encode  generate a bar code from given input")
+    print("  batch   generate bar codes listed in a manifest file")
+    print("  serve   generate bar codes on request in a long running process")
     print("")
     print("https://github.com/ihabunek/pdf417gen")
 
@@ -70,6 +101,19 @@ def get_parser() -> ArgumentParser:
     parser.add_argument("-o", "--output", dest="output", type=str,
                         help="Target file (if not given, will just show the barcode).")
 
+    # Create a group for automatic layout options
+    layout_group = parser.add_argument_group(
+        'Automatic Layout Options (choose columns and rows, ignores --columns)')
+
+    layout_group.add_argument("--aspect-ratio", dest="aspect_ratio", type=float,
+                        help="Preferred ratio of barcode width to height.")
+
+    layout_group.add_argument("--max-width", dest="max_width", type=int,
+                        help="Maximum barcode width in pixels, excluding padding.")
+
+    layout_group.add_argument("--max-height", dest="max_height", type=int,
+                        help="Maximum barcode height in pixels, excluding padding.")
+
     # Create a group for advanced options
     advanced_group = parser.add_argument_group('Advanced Options')
     
@@ -77,9 +121,38 @@ def get_parser() -> ArgumentParser:
     advanced_group.add_argument("--force-binary", dest="force_binary", action="store_true",
                         help="Force byte compaction mode (useful for pre-compressed data).")
                         
-    # Add compression option
-    advanced_group.add_argument("--compress", dest="compress", action="store_true",
-                        help="Precompress data using zlib before encoding (useful for text data).")
+    # Add compact PDF417 option
+    advanced_group.add_argument("--compact", dest="compact", action="store_true",
+                        help="Generate a Compact (Truncated) PDF417 barcode, which is narrower.")
+
+    # Add compression options
+    advanced_group.add_argument("--compression", dest="compression", default="none",
+                        choices=COMPRESSION_OPTIONS,
+                        help="Compress data before encoding. 'auto' tries each codec and no "
+                             "compression, and uses whichever produces the fewest code words "
+                             "(default: %(default)s).")
+    advanced_group.add_argument("--compress", dest="compression", action="store_const",
+                        const="zlib", help="Same as --compression zlib.")
+
+    # Create a group for diagnostic options
+    diagnostic_group = parser.add_argument_group('Diagnostic Options')
+
+    diagnostic_group.add_argument("--stats", dest="stats", action="store_true",
+                        help="Print code word counts by compaction mode, barcode size, "
+                             "padding and time spent in each stage.")
+
+    diagnostic_group.add_argument("--profile", dest="profile", action="store_true",
+                        help="Profile using cProfile and print the slowest functions.")
+
+    diagnostic_group.add_argument("--profile-sort", dest="profile_sort", type=str,
+                        choices=PROFILE_SORT_KEYS, default="cumulative", metavar="KEY",
+                        help="Sort profiled functions by given key, one of: %s "
+                             "(default: cumulative)." % ", ".join(PROFILE_SORT_KEYS))
+
+    diagnostic_group.add_argument("--profile-output", dest="profile_output", type=str,
+                        metavar="FILE",
+                        help="Write profile data to a file, e.g. for viewing in snakeviz, "
+                             "instead of printing it. Implies --profile.")
 
     # Create a group for macro options
     macro_group = parser.add_argument_group('Macro PDF417 Options (for large data)')
@@ -92,12 +165,248 @@ def get_parser() -> ArgumentParser:
                         help="Maximum size in bytes for each segment (default: 800).",
                         default=800)
                         
+    macro_group.add_argument("--segment-mode", dest="segment_mode", type=str,
+                        choices=["bytes", "capacity"],
+                        help="Split data into segments of --segment-size bytes, or fill each "
+                             "barcode up to its capacity (default: bytes).",
+                        default="bytes")
+
     macro_group.add_argument("--file-name", dest="file_name", type=str,
                         help="Include file name in Macro PDF417 metadata.")
 
+    macro_group.add_argument("-w", "--workers", dest="workers", type=int,
+                        help="Number of worker processes used to encode and render segments (default: 1).",
+                        default=1)
+
+    return parser
+
+
+def get_batch_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        usage="%(prog)s batch [options] manifest",
+        epilog="https://github.com/ihabunek/pdf417gen",
+        description="Generate PDF417 barcodes listed in a JSONL or CSV manifest. "
+                    "Each item must have 'data' and 'output' fields, and may override "
+                    "any of the options below, e.g. 'columns' or 'security_level'.",
+        formatter_class=RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument("manifest", type=str,
+                        help="Manifest file, CSV if it has a .csv extension, JSONL otherwise.")
+
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int,
+                        help="Number of worker processes (default: 1).",
+                        default=1)
+
+    parser.add_argument("--log", dest="log", type=str,
+                        help="File to write the result of each item to, as JSONL "
+                             "(default: manifest name with .log extension).")
+
+    parser.add_argument("--shard", dest="shard", type=str,
+                        help="Process only shard i of n, given as i/n where i is between 0 "
+                             "and n - 1. Items are assigned to shards by their position in "
+                             "the manifest.")
+
+    parser.add_argument("--checkpoint", dest="checkpoint", type=str,
+                        help="File recording completed items, used to resume the batch "
+                             "(default: manifest name with .checkpoint extension).")
+
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="Process all items, even ones completed by a previous run.")
+
+    parser.add_argument("-c", "--columns", dest="columns", type=int,
+                        help="The number of columns (default: 6).",
+                        default=6)
+
+    parser.add_argument("-l", "--security-level", dest="security_level", type=int,
+                        help="Security level (default: 2).",
+                        default=2)
+
+    parser.add_argument("-e", "--encoding", dest="encoding", type=str,
+                        help="Character encoding used to encode data (default: utf-8).",
+                        default='utf-8')
+
+    parser.add_argument("-s", "--scale", dest="scale", type=int,
+                        help="Module width in pixels (default: 3).",
+                        default=3)
+
+    parser.add_argument("-r", "--ratio", dest="ratio", type=int,
+                        help="Module height to width ratio (default: 3).",
+                        default=3)
+
+    parser.add_argument("-p", "--padding", dest="padding", type=int,
+                        help="Image padding in pixels (default: 20).",
+                        default=20)
+
+    parser.add_argument("-f", "--foreground-color", dest="fg_color", type=str,
+                        help="Foreground color in hex (default: #000000).",
+                        default="#000000")
+
+    parser.add_argument("-b", "--background-color", dest="bg_color", type=str,
+                        help="Background color in hex (default: #FFFFFF).",
+                        default="#FFFFFF")
+
+    parser.add_argument("--force-binary", dest="force_binary", action="store_true",
+                        help="Force byte compaction mode.")
+
+    parser.add_argument("--compact", dest="compact", action="store_true",
+                        help="Generate Compact (Truncated) PDF417 barcodes.")
+
+    return parser
+
+
+def do_batch(raw_args: List[str]):
+    from pdf417gen.batch import OPTION_TYPES, parse_shard, read_manifest, run_batch, shard_items
+
+    args = get_batch_parser().parse_args(raw_args)
+
+    try:
+        items = read_manifest(args.manifest)
+        shard = parse_shard(args.shard) if args.shard else None
+    except (OSError, ValueError) as e:
+        print_err(str(e))
+        return
+
+    # Shards get their own log and checkpoint so they can share a directory
+    base_name = os.path.splitext(args.manifest)[0]
+    if shard:
+        items = shard_items(items, *shard)
+        base_name += ".shard-%d-of-%d" % shard
+
+    defaults = {name: getattr(args, name) for name in OPTION_TYPES}
+    log_path = args.log or base_name + ".log"
+    checkpoint_path = args.checkpoint or base_name + ".checkpoint"
+
+    if not args.resume and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    # A resumed run appends to the log, which keeps the results of items
+    # completed by earlier runs
+    log_mode = "a" if os.path.exists(checkpoint_path) else "w"
+
+    failed = 0
+    skipped = 0
+    start = time.perf_counter()
+
+    with open(log_path, log_mode, encoding="utf-8") as log:
+        results = run_batch(items, jobs=args.jobs, defaults=defaults, checkpoint=checkpoint_path)
+        for result in results:
+            if result.skipped:
+                status = "skipped"
+            elif result.error:
+                status = "error"
+            else:
+                status = "ok"
+
+            log.write(json.dumps({
+                "index": result.index,
+                "output": result.output,
+                "status": status,
+                "error": result.error,
+                "duration": round(result.duration, 6),
+            }) + "\n")
+
+            if result.skipped:
+                skipped += 1
+            elif result.error:
+                failed += 1
+                print_err("Item %d (%s): %s" % (result.index, result.output, result.error))
+
+    elapsed = time.perf_counter() - start
+    processed = len(items) - skipped
+    rate = processed / elapsed if elapsed > 0 else 0
+    print("Processed %d items (%d failed) in %.2fs, %.1f items/s using %d jobs" % (
+        processed, failed, elapsed, rate, args.jobs))
+    if skipped:
+        print("Skipped %d items completed by a previous run" % skipped)
+    print("Log written to %s" % log_path)
+
+
+def get_serve_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        usage="%(prog)s serve (--stdio | --http) [options]",
+        epilog="https://github.com/ihabunek/pdf417gen",
+        description="Generate PDF417 barcodes on request in a long running process.",
+        formatter_class=RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument("--stdio", dest="stdio", action="store_true",
+                        help="Read newline delimited JSON requests from stdin and write "
+                             "responses to stdout. Each request is an object with 'data' "
+                             "and optionally 'format', 'output', 'options' and 'id'.")
+
+    parser.add_argument("--http", dest="http", action="store_true",
+                        help="Run a HTTP server rendering barcodes at /barcode.png and "
+                             "/barcode.svg, e.g. /barcode.png?data=foo&columns=3.")
+
+    http_group = parser.add_argument_group('HTTP Server Options')
+
+    http_group.add_argument("--host", dest="host", type=str,
+                        help="Address to listen on (default: 127.0.0.1).",
+                        default="127.0.0.1")
+
+    http_group.add_argument("--port", dest="port", type=int,
+                        help="Port to listen on (default: 8417).",
+                        default=8417)
+
+    http_group.add_argument("-w", "--workers", dest="workers", type=int,
+                        help="Number of threads handling requests (default: 4).",
+                        default=4)
+
+    http_group.add_argument("--max-data-size", dest="max_data_size", type=int,
+                        help="Maximum size of data to encode in bytes (default: %d)." % MAX_DATA_BYTES,
+                        default=MAX_DATA_BYTES)
+
+    http_group.add_argument("--cache-size", dest="cache_size", type=int,
+                        help="Number of rendered barcodes to keep in memory, 0 to disable "
+                             "(default: 1024).",
+                        default=1024)
+
+    http_group.add_argument("--max-pending", dest="max_pending", type=int,
+                        help="Maximum number of requests being handled or waiting for a "
+                             "worker, further requests get status 503 (default: 4 per worker).",
+                        default=None)
+
+    http_group.add_argument("--max-pixels", dest="max_pixels", type=int,
+                        help="Maximum size of rendered images in pixels (default: 10000000).",
+                        default=10_000_000)
+
+    http_group.add_argument("--timeout", dest="timeout", type=float,
+                        help="Seconds after which idle connections are closed (default: 30).",
+                        default=30.0)
+
+    http_group.add_argument("-q", "--quiet", dest="quiet", action="store_true",
+                        help="Do not log requests.")
+
     return parser
 
 
+def do_serve(raw_args: List[str]):
+    from pdf417gen.server import serve_http, serve_stdio
+
+    parser = get_serve_parser()
+    args = parser.parse_args(raw_args)
+
+    if args.stdio:
+        serve_stdio(sys.stdin, sys.stdout)
+    elif args.http:
+        print("Listening on http://%s:%d/" % (args.host, args.port), flush=True)
+        serve_http(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            max_data_size=args.max_data_size,
+            cache_size=args.cache_size,
+            quiet=args.quiet,
+            max_pending=args.max_pending,
+            max_pixels=args.max_pixels,
+            timeout=args.timeout,
+        )
+    else:
+        parser.print_usage()
+        print_err("Choose a server mode: --stdio or --http")
+
+
 def do_encode(raw_args: List[str]):
     args = get_parser().parse_args(raw_args)
     data: Union[str, bytes] = args.text
@@ -110,65 +419,114 @@ def do_encode(raw_args: List[str]):
         print_err("No input given")
         return
 
+    metrics = Metrics()
+    profile = None
+    if args.profile or args.profile_output:
+        import cProfile
+        profile = cProfile.Profile()
+
+    start = time.perf_counter()
+
     try:
-        # Apply compression if requested
-        if args.compress:
-            if isinstance(data, str):
-                data = data.encode(args.encoding)
-            data = zlib.compress(data)
-            args.force_binary = True  # Force binary mode for compressed data
-            
-        if args.use_macro:
-            # Use macro encoding for large data
-            from pdf417gen import encode_macro
-            
-            codes = encode_macro(
+        with hooked(metrics) if args.stats else nullcontext():
+            if profile:
+                profile.runcall(encode_data, args, data)
+            else:
+                encode_data(args, data)
+    except Exception as e:
+        print_err(str(e))
+        return
+
+    if args.stats:
+        print_stats(metrics.as_dict(), time.perf_counter() - start)
+
+    if profile:
+        write_profile(profile, args.profile_sort, args.profile_output)
+
+
+def encode_data(args: Namespace, data: Union[str, bytes]):
+    if args.use_macro:
+        # Use macro encoding for large data
+        from pdf417gen import encode_macro
+        
+        # Segments are encoded and rendered on the worker pool
+        renderer = partial(
+            render_image,
+            scale=args.scale,
+            ratio=args.ratio,
+            padding=args.padding,
+            fg_color=args.fg_color,
+            bg_color=args.bg_color,
+        )
+
+        images = encode_macro(
+            data,
+            columns=args.columns,
+            security_level=args.security_level,
+            encoding=args.encoding,
+            segment_size=args.segment_size,
+            segment_mode=args.segment_mode,
+            file_name=args.file_name,
+            force_binary=args.force_binary,
+            compact=args.compact,
+            workers=args.workers,
+            renderer=renderer,
+            compression=args.compression,
+        )
+
+        if args.output:
+            # Save multiple images with suffix
+            base_name, ext = os.path.splitext(args.output)
+            for i, image in enumerate(images):
+                output_file = f"{base_name}_{i+1:03d}{ext}"
+                image.save(output_file)
+            print(f"Saved {len(images)} barcode images with prefix {base_name}_")
+        else:
+            # Show first image if there are too many
+            if len(images) > 5:
+                print(f"Generated {len(images)} barcode images. Showing first one.")
+                images[0].show()
+            else:
+                from PIL import Image
+
+                # Concatenate images into one before showing
+                total_width = max(img.width for img in images)
+                total_height = sum(img.height for img in images)
+                combined_image = Image.new('RGB', (total_width, total_height), args.bg_color)
+                
+                y_offset = 0
+                for img in images:
+                    combined_image.paste(img, (0, y_offset))
+                    y_offset += img.height
+                
+                combined_image.show()
+    else:
+        if args.aspect_ratio or args.max_width or args.max_height:
+            # Choose columns and rows automatically
+            plan = auto_layout(
                 data,
-                columns=args.columns,
                 security_level=args.security_level,
                 encoding=args.encoding,
-                segment_size=args.segment_size,
-                file_name=args.file_name,
+                aspect_ratio=args.aspect_ratio,
+                max_width=args.max_width,
+                max_height=args.max_height,
+                scale=args.scale,
+                ratio=args.ratio,
+                force_binary=args.force_binary,
+                compact=args.compact,
+                compression=args.compression,
+            )
+
+            codes = encode(
+                data,
+                columns=plan.columns,
+                security_level=args.security_level,
+                encoding=args.encoding,
+                force_rows=plan.rows,
                 force_binary=args.force_binary,
+                compact=args.compact,
+                compression=plan.codec,
             )
-            
-            # Handle multiple barcodes
-            images = []
-            for i, barcode in enumerate(codes):
-                image = render_image(
-                    barcode,
-                    scale=args.scale,
-                    ratio=args.ratio,
-                    padding=args.padding,
-                    fg_color=args.fg_color,
-                    bg_color=args.bg_color,
-                )
-                images.append(image)
-                
-            if args.output:
-                # Save multiple images with suffix
-                base_name, ext = os.path.splitext(args.output)
-                for i, image in enumerate(images):
-                    output_file = f"{base_name}_{i+1:03d}{ext}"
-                    image.save(output_file)
-                print(f"Saved {len(images)} barcode images with prefix {base_name}_")
-            else:
-                # Show first image if there are too many
-                if len(images) > 5:
-                    print(f"Generated {len(images)} barcode images. Showing first one.")
-                    images[0].show()
-                else:
-                    # Concatenate images into one before showing
-                    total_width = max(img.width for img in images)
-                    total_height = sum(img.height for img in images)
-                    combined_image = Image.new('RGB', (total_width, total_height), args.bg_color)
-                    
-                    y_offset = 0
-                    for img in images:
-                        combined_image.paste(img, (0, y_offset))
-                        y_offset += img.height
-                    
-                    combined_image.show()
         else:
             # Standard encoding
             codes = encode(
@@ -176,26 +534,77 @@ def do_encode(raw_args: List[str]):
                 columns=args.columns,
                 security_level=args.security_level,
                 encoding=args.encoding,
-                force_binary=args.force_binary
+                force_binary=args.force_binary,
+                compact=args.compact,
+                compression=args.compression,
             )
 
-            image = render_image(
-                codes,
-                scale=args.scale,
-                ratio=args.ratio,
-                padding=args.padding,
-                fg_color=args.fg_color,
-                bg_color=args.bg_color,
-            )
-            
-            if args.output:
-                image.save(args.output)
-            else:
-                image.show()
-    except Exception as e:
-        print_err(str(e))
+        image = render_image(
+            codes,
+            scale=args.scale,
+            ratio=args.ratio,
+            padding=args.padding,
+            fg_color=args.fg_color,
+            bg_color=args.bg_color,
+        )
+        
+        if args.output:
+            image.save(args.output)
+        else:
+            image.show()
+
+
+def print_stats(metrics: Dict[str, Dict[str, Any]], elapsed: float):
+    """Prints the code word breakdown and time spent in each stage."""
+    def total(name: str) -> float:
+        return metrics.get(name, {}).get("sum", 0)
+
+    if "rows" not in metrics:
+        print("Statistics are not available when encoding on multiple workers")
         return
 
+    barcodes = metrics["rows"]["count"]
+    code_words = total("codewords_total")
+    padding = total("padding_words")
+    columns = metrics["columns"]["max"]
+    rows = metrics["rows"]
+
+    if rows["min"] == rows["max"]:
+        size = "%d columns x %d rows" % (columns, rows["max"])
+    else:
+        size = "%d columns x %d-%d rows" % (columns, rows["min"], rows["max"])
+
+    print("Statistics:")
+    print("  %-20s %d bytes" % ("Payload:", total("payload_bytes")))
+    print("  %-20s %d" % ("Bar codes:", barcodes))
+    print("  %-20s %s" % ("Size:", size))
+    print("  %-20s %d" % ("Code words:", code_words))
+    print("    %-18s %d" % ("Text:", total("codewords_text")))
+    print("    %-18s %d" % ("Numeric:", total("codewords_numeric")))
+    print("    %-18s %d" % ("Byte:", total("codewords_byte")))
+    print("    %-18s %d" % ("Error correction:", total("ec_words")))
+    print("    %-18s %d (%.1f%% wasted)" % ("Padding:", padding, 100 * padding / code_words))
+    print("  Time:")
+    for name, label in STAT_STAGES:
+        if name in metrics:
+            print("    %-18s %.3f ms" % (label + ":", 1000 * total(name)))
+    print("    %-18s %.3f ms" % ("Total:", 1000 * elapsed))
+
+
+def write_profile(profile: "cProfile.Profile", sort: str, output: Optional[str] = None):
+    """Writes profile data to a file if given, or prints the slowest functions."""
+    if output:
+        profile.dump_stats(output)
+        print("Profile written to %s" % output)
+        return
+
+    import pstats
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats(sort).print_stats(PROFILE_LINES)
+    print(stream.getvalue())
+
 
 def main():
     command = sys.argv[1] if len(sys.argv) > 1 else None
@@ -203,5 +612,9 @@ def main():
     
     if command == "encode":
         do_encode(args)
+    elif command == "batch":
+        do_batch(args)
+    elif command == "serve":
+        do_serve(args)
     else:
         print_usage()
@@ -150,6 +150,49 @@ SWITCH_CODES = {
     },
 }
 
+# Packed versions of the text compaction tables above, used when compacting.
+# Indexing bytes does not touch reference counts of shared objects, so forked
+# processes keep sharing the memory pages holding these tables. Submodes are
+# numbered by their position in TEXT_SUBMODES.
+TEXT_SUBMODES = (UPPER, LOWER, MIXED, PUNCT)
+
+# Marks a missing value in the packed tables
+NO_VALUE = 0xFF
+
+
+def _pack_character_values() -> bytes:
+    """Value of each character in each submode, at [submode * 256 + char]."""
+    table = bytearray([NO_VALUE]) * (len(TEXT_SUBMODES) * 256)
+    for char, values in CHARACTERS_LOOKUP.items():
+        for submode, value in values.items():
+            table[TEXT_SUBMODES.index(submode) * 256 + char] = value
+    return bytes(table)
+
+
+def _pack_preferred_submodes() -> bytes:
+    """Submode to switch to for each character not in the current submode."""
+    preference = [LOWER, UPPER, MIXED, PUNCT]
+    table = bytearray([NO_VALUE]) * 256
+    for char, values in CHARACTERS_LOOKUP.items():
+        submode = next(submode for submode in preference if submode in values)
+        table[char] = TEXT_SUBMODES.index(submode)
+    return bytes(table)
+
+
+def _pack_switch_codes() -> bytes:
+    """One or two codes switching between submodes, at [(from * 4 + to) * 2]."""
+    table = bytearray([NO_VALUE]) * (len(TEXT_SUBMODES) ** 2 * 2)
+    for source, targets in SWITCH_CODES.items():
+        for target, codes in targets.items():
+            index = TEXT_SUBMODES.index(source) * len(TEXT_SUBMODES) + TEXT_SUBMODES.index(target)
+            table[index * 2:index * 2 + len(codes)] = bytes(codes)
+    return bytes(table)
+
+
+PACKED_CHARACTER_VALUES = _pack_character_values()
+PACKED_PREFERRED_SUBMODES = _pack_preferred_submodes()
+PACKED_SWITCH_CODES = _pack_switch_codes()
+
 # Reed solomon error correction factors, per level 0-8
 ERROR_CORRECTION_FACTORS = [
     [27, 917],
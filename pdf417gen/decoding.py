@@ -0,0 +1,375 @@
+"""
+Decoder for bar codes produced by this library.
+
+Used to verify that a bar code contains the expected data before it is printed,
+without depending on an external decoder:
+
+    codes = encode(data)
+    assert decode(codes).data == data
+
+    image = render_image(codes)
+    assert decode_image(image).data == data
+
+`decode` takes the low level code words returned by `encode`. Each one is
+looked up in the table of its row's cluster, which also checks that it is in
+the right cluster. The row indicators must match the bar code size, and the
+error correction code words must match the data. Errors are not corrected, any
+mismatch raises a ValueError.
+
+`decode_image` reads a clean bitmap, as rendered by `render_image` with any
+scale, ratio, padding and colors, as long as the bars are darker than the
+background. It is not meant for scanned or photographed bar codes.
+
+Text, byte and numeric compaction are supported, including text compaction
+shifts which this library does not produce. Byte shift, ECI and MicroPDF417 are
+not supported.
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from pdf417gen.codes import CODES
+from pdf417gen.compaction import BYTE_LATCH, BYTE_LATCH_ALT, NUMERIC_LATCH, TEXT_LATCH
+from pdf417gen.data import CHARACTERS_LOOKUP, SINGLE_SWITCH_CODE_LOOKUP, SWITCH_CODE_LOOKUP
+from pdf417gen.encoding import COMPACT_STOP_CHARACTER, MACRO_MARKER, START_CHARACTER
+from pdf417gen.encoding import STOP_CHARACTER, get_left_code_word, get_right_code_word
+from pdf417gen.error_correction import compute_error_correction_code_words
+from pdf417gen.types import Barcode, Codeword, Decoded, Submode
+from pdf417gen.util import from_base
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+def _characters_by_value() -> Dict[Submode, Dict[int, int]]:
+    characters: Dict[Submode, Dict[int, int]] = {submode: {} for submode in Submode}
+    for char, values in CHARACTERS_LOOKUP.items():
+        for submode, value in values.items():
+            characters[submode][value] = char
+    return characters
+
+
+def _switches_by_value(
+    lookup: Dict[Submode, Dict[Submode, int]]
+) -> Dict[Submode, Dict[int, Submode]]:
+    switches: Dict[Submode, Dict[int, Submode]] = {submode: {} for submode in Submode}
+    for source, targets in lookup.items():
+        for target, value in targets.items():
+            switches[source][value] = target
+    return switches
+
+
+# Converts low level code words back to high level code words, one for each
+# cluster
+CODE_WORDS: Tuple[Dict[int, Codeword], ...] = tuple(
+    {code: word for word, code in enumerate(table)} for table in CODES)
+
+# Characters by their value in each text compaction submode
+TEXT_CHARACTERS = _characters_by_value()
+
+# Submode latched or shifted to by a value in each submode
+LATCHES = _switches_by_value(SWITCH_CODE_LOOKUP)
+SHIFTS = _switches_by_value(SINGLE_SWITCH_CODE_LOOKUP)
+
+# Number of modules in a low level code word, and in the stop patterns
+MODULES = 17
+STOP_MODULES = 18
+COMPACT_STOP_MODULES = 1
+
+# The start pattern begins with a bar 8 modules wide
+START_BAR_MODULES = 8
+
+# Numeric compaction packs up to 44 digits into a group of 15 code words
+NUMERIC_GROUP_CODE_WORDS = 15
+
+# Byte compaction packs 6 bytes into a group of 5 code words
+BYTE_GROUP_CODE_WORDS = 5
+
+# Code words from which on all values are mode latches and other control codes
+FIRST_CONTROL_CODE: Codeword = 900
+
+
+def decode(codes: Barcode) -> Decoded:
+    """
+    Decode a PDF417 bar code produced by `encode`.
+
+    Args:
+        codes: Low level code words, as returned by `encode`
+
+    Returns:
+        The decoded data and bar code parameters
+
+    Raises:
+        ValueError: If the bar code is invalid, or the error correction code
+                    words do not match the data
+    """
+    if not codes:
+        raise ValueError("Bar code has no rows")
+
+    compact = codes[0][-1] == COMPACT_STOP_CHARACTER
+    rows = [decode_row(row_no, row, compact) for row_no, row in enumerate(codes)]
+
+    num_rows, num_cols, security_level = read_row_indicators(rows)
+    validate_rows(rows, num_rows, num_cols, security_level, compact)
+
+    code_words = [word for row in rows for word in row[1:len(row) - (0 if compact else 1)]]
+    data_words = check_error_correction(code_words, security_level)
+
+    # Data ends where the Macro PDF417 control block begins
+    control_block = None
+    if MACRO_MARKER in data_words:
+        index = data_words.index(MACRO_MARKER)
+        data_words, control_block = data_words[:index], data_words[index:]
+
+    return Decoded(
+        data=decompact(data_words),
+        code_words=code_words,
+        control_block=control_block,
+        columns=num_cols,
+        rows=num_rows,
+        security_level=security_level,
+        compact=compact,
+    )
+
+
+def decode_row(row_no: int, row: List[int], compact: bool) -> List[Codeword]:
+    """Converts a row to high level code words, including row indicators."""
+    stop = COMPACT_STOP_CHARACTER if compact else STOP_CHARACTER
+    if len(row) < 3 or row[0] != START_CHARACTER or row[-1] != stop:
+        raise ValueError("Row %d does not start or end with the expected pattern" % row_no)
+
+    table = CODE_WORDS[row_no % 3]
+    try:
+        return [table[code] for code in row[1:-1]]
+    except KeyError as ex:
+        raise ValueError("Invalid code word %#x in row %d" % (ex.args[0], row_no)) from None
+
+
+def read_row_indicators(rows: List[List[Codeword]]) -> Tuple[int, int, int]:
+    """Returns the number of rows, columns and the security level encoded in
+    the left row indicators of the first three rows."""
+    if len(rows) < 3:
+        raise ValueError("Bar code has %d rows. Minimum is 3 rows." % len(rows))
+
+    # Row indicators of rows 0, 1 and 2 each contain one of the values
+    rows_value = rows[0][0] % 30
+    level_value = rows[1][0] % 30
+    columns_value = rows[2][0] % 30
+
+    num_rows = rows_value * 3 + level_value % 3 + 1
+    return num_rows, columns_value + 1, level_value // 3
+
+
+def validate_rows(
+    rows: List[List[Codeword]],
+    num_rows: int,
+    num_cols: int,
+    security_level: int,
+    compact: bool,
+):
+    if len(rows) != num_rows:
+        raise ValueError("Row indicators give %d rows, bar code has %d" % (num_rows, len(rows)))
+
+    for row_no, row in enumerate(rows):
+        if len(row) != num_cols + (1 if compact else 2):
+            raise ValueError("Row %d does not have %d columns" % (row_no, num_cols))
+
+        args = (row_no, num_rows, num_cols, security_level)
+        if row[0] != get_left_code_word(*args):
+            raise ValueError("Invalid left row indicator in row %d" % row_no)
+        if not compact and row[-1] != get_right_code_word(*args):
+            raise ValueError("Invalid right row indicator in row %d" % row_no)
+
+
+def check_error_correction(code_words: List[Codeword], security_level: int) -> List[Codeword]:
+    """Checks the error correction code words and returns the data code words,
+    without the length descriptor."""
+    length = code_words[0]
+    ec_count = 2 ** (security_level + 1)
+
+    if length < 1 or length + ec_count != len(code_words):
+        raise ValueError("Invalid length descriptor: %d" % length)
+
+    data_words = code_words[:length]
+    if compute_error_correction_code_words(data_words, security_level) != code_words[length:]:
+        raise ValueError("Error correction code words do not match the data")
+
+    return data_words[1:]
+
+
+def decompact(code_words: List[Codeword]) -> bytes:
+    """Converts data code words back to bytes, undoing compaction."""
+    data = bytearray()
+    position = 0
+
+    # Data starts in text compaction mode
+    mode = TEXT_LATCH
+
+    while position < len(code_words):
+        if mode == TEXT_LATCH:
+            position = decompact_text(code_words, position, data)
+        elif mode in (BYTE_LATCH, BYTE_LATCH_ALT):
+            position = decompact_bytes(code_words, position, data, mode == BYTE_LATCH_ALT)
+        elif mode == NUMERIC_LATCH:
+            position = decompact_numbers(code_words, position, data)
+
+        if position >= len(code_words):
+            break
+
+        code_word = code_words[position]
+        position += 1
+
+        if code_word in (TEXT_LATCH, BYTE_LATCH, BYTE_LATCH_ALT, NUMERIC_LATCH):
+            mode = code_word
+        else:
+            raise ValueError("Unsupported code word: %d" % code_word)
+
+    return bytes(data)
+
+
+def _segment_end(code_words: List[Codeword], start: int) -> int:
+    """Returns the position of the next control code, which ends a segment of
+    code words compacted using the same mode."""
+    end = start
+    while end < len(code_words) and code_words[end] < FIRST_CONTROL_CODE:
+        end += 1
+    return end
+
+
+def decompact_text(code_words: List[Codeword], start: int, data: bytearray) -> int:
+    end = _segment_end(code_words, start)
+
+    submode = Submode.UPPER
+    shift: Optional[Submode] = None
+
+    for code_word in code_words[start:end]:
+        for value in divmod(code_word, 30):
+            current = shift or submode
+            shift = None
+
+            if value in TEXT_CHARACTERS[current]:
+                data.append(TEXT_CHARACTERS[current][value])
+            elif value in LATCHES[current]:
+                submode = LATCHES[current][value]
+            elif value in SHIFTS[current]:
+                shift = SHIFTS[current][value]
+            else:
+                raise ValueError("Invalid text compaction value %d" % value)
+
+    # A trailing shift pads an odd number of values, and is ignored
+    return end
+
+
+def decompact_bytes(code_words: List[Codeword], start: int, data: bytearray, whole: bool) -> int:
+    end = _segment_end(code_words, start)
+    count = end - start
+
+    # With BYTE_LATCH the number of bytes is not a multiple of 6, and the last
+    # 1 to 5 bytes are stored one per code word
+    groups = count // BYTE_GROUP_CODE_WORDS if whole else (count - 1) // BYTE_GROUP_CODE_WORDS
+
+    position = start
+    for _ in range(groups):
+        value = from_base(code_words[position:position + BYTE_GROUP_CODE_WORDS], 900)
+        data.extend(value.to_bytes(6, "big"))
+        position += BYTE_GROUP_CODE_WORDS
+
+    data.extend(code_words[position:end])
+    return end
+
+
+def decompact_numbers(code_words: List[Codeword], start: int, data: bytearray) -> int:
+    end = _segment_end(code_words, start)
+
+    for position in range(start, end, NUMERIC_GROUP_CODE_WORDS):
+        group = code_words[position:min(position + NUMERIC_GROUP_CODE_WORDS, end)]
+
+        # Digits are prefixed by "1" to preserve leading zeros
+        digits = str(from_base(group, 900))
+        if digits[0] != "1":
+            raise ValueError("Invalid numeric compaction group")
+        data.extend(digits[1:].encode("ascii"))
+
+    return end
+
+
+def decode_image(image: "Image.Image") -> Decoded:
+    """
+    Decode a PDF417 bar code rendered by `render_image`.
+
+    Args:
+        image: A Pillow image of the bar code, with any scale, ratio, padding
+               and colors, bars must be darker than the background
+
+    Returns:
+        The decoded data and bar code parameters
+
+    Raises:
+        ValueError: If the image does not contain a valid bar code
+    """
+    return decode(read_image(image))
+
+
+def read_image(image: "Image.Image") -> Barcode:
+    """Reads the low level code words from a rendered bar code."""
+    gray = image.convert("L")
+    width = gray.width
+    low, high = gray.getextrema()
+    if low == high:
+        raise ValueError("Image does not contain a bar code")
+
+    # Bars are darker than the threshold, pixels are converted to b"1" for bars
+    # and b"0" for spaces, so that runs of modules can be parsed using int()
+    threshold = (low + high) // 2
+    digits = bytes(ord("1") if value <= threshold else ord("0") for value in range(256))
+    pixels = gray.tobytes().translate(digits)
+
+    bbox = gray.point(lambda value: 255 if value <= threshold else 0).getbbox()
+    assert bbox is not None
+    left, top, right, bottom = bbox
+
+    # The start pattern begins with a bar 8 modules wide
+    start_bar = 0
+    while left + start_bar < right and pixels[top * width + left + start_bar] == ord("1"):
+        start_bar += 1
+
+    scale, remainder = divmod(start_bar, START_BAR_MODULES)
+    modules, width_remainder = divmod(right - left, scale) if scale else (0, 1)
+    if not scale or remainder or width_remainder or (modules - 1) % MODULES:
+        raise ValueError("Bar code width does not match any number of columns")
+
+    def read_modules(y: int, first: int, count: int) -> bytes:
+        offset = y * width + left + scale // 2 + first * scale
+        return pixels[offset:offset + count * scale:scale]
+
+    # Rows are as high as the first run of pixel rows with the same left row
+    # indicator, the indicators of neighboring rows are in different clusters
+    # so they always differ
+    first_indicator = read_modules(top, MODULES, MODULES)
+    row_height = 1
+    while top + row_height < bottom:
+        if read_modules(top + row_height, MODULES, MODULES) != first_indicator:
+            break
+        row_height += 1
+
+    num_rows, height_remainder = divmod(bottom - top, row_height)
+    if height_remainder:
+        raise ValueError("Bar code height is not a multiple of the row height")
+
+    codes: Barcode = []
+    for row_no in range(num_rows):
+        y = top + row_no * row_height + row_height // 2
+        codes.append(_split_modules(read_modules(y, 0, modules)))
+
+    return codes
+
+
+def _split_modules(modules: bytes) -> List[int]:
+    """Splits a row of modules, given as b"0" and b"1" digits, into low level
+    code words."""
+    # Compact PDF417 ends with a single module bar instead of the stop pattern
+    compact = int(modules[-STOP_MODULES:], 2) != STOP_CHARACTER
+    end = len(modules) - (COMPACT_STOP_MODULES if compact else STOP_MODULES)
+
+    codes = [int(modules[start:start + MODULES], 2) for start in range(0, end, MODULES)]
+    codes.append(int(modules[end:], 2))
+    return codes
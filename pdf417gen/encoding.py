@@ -1,22 +1,42 @@
 import math
 import time
-from typing import List, Tuple, Union, Optional, Dict, Any
-
-from pdf417gen.codes import map_code_word
-from pdf417gen.compaction import compact
-from pdf417gen.compaction.numeric import compact_numbers
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, List, Optional, Tuple, Union
+
+from pdf417gen import instrumentation
+from pdf417gen.codes import CODES
+from pdf417gen.compaction import compact, compact_chunks, count, count_chunks, count_chunks_by_mode
+from pdf417gen.compaction import get_optimal_compactor_fn, split_to_chunks
+from pdf417gen.compaction.byte import BYTE_GROUP_SIZE, compact_bytes
+from pdf417gen.compaction.numeric import NUMERIC_GROUP_SIZE, compact_numbers
+from pdf417gen.compaction.optimizations import MIN_NUMERIC_LENGTH
+from pdf417gen.compression import apply_compression, count_code_words
 from pdf417gen.error_correction import compute_error_correction_code_words
-from pdf417gen.types import Barcode, Codeword
-from pdf417gen.util import chunks, to_bytes
+from pdf417gen.types import Barcode, Chunk, Codeword, CompactionFn, Compressed, Plan
+from pdf417gen.util import CRC16_INITIAL_VALUE, chunks, crc16, to_base, to_bytes, use_numpy
+
+# Only needed by encode_macro, imported when used to keep importing this module cheap
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 START_CHARACTER = 0x1fea8
 STOP_CHARACTER = 0x3fa29
+
+# Compact PDF417 replaces the stop pattern with a single module wide bar
+COMPACT_STOP_CHARACTER = 0x1
 PADDING_CODE_WORD: Codeword = 900
 
 # Maximum nubmer of code words which can be contained in a bar code, including
 # the length descriptor, data, error correction and padding
 MAX_CODE_WORDS = 928
 
+# Numeric compaction packs at most 44 digits into 15 code words, so a code word
+# never holds more than 3 bytes of data
+MAX_BYTES_PER_CODE_WORD = 3
+
+# Upper bound on the input length which can fit into a bar code
+MAX_DATA_BYTES = MAX_CODE_WORDS * MAX_BYTES_PER_CODE_WORD
+
 # Limits on the number of rows and columns which can be contained in a bar code
 MIN_ROWS = 3
 MAX_ROWS = 90
@@ -43,7 +63,10 @@ def encode(
     encoding: str = "utf-8",
     force_rows: Optional[int] = None,
     control_block: Optional[List[Codeword]] = None,
-    force_binary: bool = False
+    force_binary: bool = False,
+    compact: bool = False,
+    compression: str = "none",
+    backend: str = "python",
 ) -> Barcode:
     """
     Encode data into a PDF417 barcode.
@@ -56,10 +79,37 @@ def encode(
         force_rows: Force exact number of rows (3-90). If None, the number of rows is calculated
         control_block: Optional control block for Macro PDF417
         force_binary: Force byte compaction mode (useful for pre-compressed data)
+        compact: Produce a Compact (Truncated) PDF417 barcode which omits the
+                 right row indicator and uses a single module stop pattern
+        compression: "none", "zlib", "bz2", "lzma", or "auto" to use whichever
+                     of these produces the fewest code words, see `compression`
+        backend: "python", or "numpy" to convert code words to low level code
+                 words using NumPy, falls back to "python" if NumPy is not
+                 installed
     
     Returns:
         Encoded PDF417 barcode
     """
+    validate_options(columns, security_level, force_rows)
+    numpy = use_numpy(backend)
+
+    # Prepare input
+    compressed = apply_compression(to_bytes(data, encoding), compression, force_binary)
+
+    # Convert data to code words and split into rows
+    code_words = encode_high(compressed.data, columns, security_level, control_block, force_rows,
+                             compressed.force_binary)
+
+    with instrumentation.timer("encode_rows_seconds"):
+        if numpy:
+            from pdf417gen import vectorized
+            return vectorized.encode_rows(code_words, columns, security_level, compact)
+
+        rows = list(chunks(code_words, columns))
+        return list(encode_rows(rows, columns, security_level, compact))
+
+
+def validate_options(columns: int, security_level: int, force_rows: Optional[int] = None):
     if columns < 1 or columns > 30:
         raise ValueError("'columns' must be between 1 and 30. Given: %r" % columns)
 
@@ -67,39 +117,117 @@ def encode(
         if force_rows < MIN_ROWS or force_rows > MAX_ROWS:
             raise ValueError("'force_rows' must be between 3 and 90. Given: %r" % force_rows)
     if security_level < 0 or security_level > 8:
-        raise ValueError("'security_level' must be between 1 and 8. Given: %r" % security_level)
+        raise ValueError("'security_level' must be between 0 and 8. Given: %r" % security_level)
 
-    # Prepare input
-    data_bytes = to_bytes(data, encoding)
 
-    # Convert data to code words and split into rows
-    code_words = encode_high(data_bytes, columns, security_level, control_block, force_rows, force_binary)
-    rows = list(chunks(code_words, columns))
+def estimate(
+    data: Union[str, bytes],
+    columns: int = 6,
+    security_level: int = 2,
+    encoding: str = "utf-8",
+    force_rows: Optional[int] = None,
+    control_block: Optional[List[Codeword]] = None,
+    force_binary: bool = False,
+    compression: str = "none"
+) -> Plan:
+    """
+    Calculate the size of the barcode `encode` would produce for given data
+    and options, without encoding it.
+
+    Only classifies the data and counts the code words it compacts into, which
+    is much cheaper than compaction and error correction.
+
+    Args:
+        Same as `encode`.
+
+    Returns:
+        Plan containing the code word counts, bar code dimensions, whether the
+        data fits into a bar code and the codec chosen by `compression`.
+    """
+    validate_options(columns, security_level, force_rows)
 
-    return list(encode_rows(rows, columns, security_level))
+    compressed = apply_compression(to_bytes(data, encoding), compression, force_binary)
+    data_words = count_code_words(compressed) + (len(control_block) if control_block else 0)
 
+    plan = plan_barcode(data_words, columns, security_level, force_rows)
+    return plan._replace(codec=compressed.codec)
 
-def encode_rows(rows: List[Tuple[Codeword, ...]], num_cols: int, security_level: int):
+
+def plan_barcode(
+    data_words: int,
+    columns: int,
+    security_level: int,
+    force_rows: Optional[int] = None
+) -> Plan:
+    """
+    Calculate the size of a barcode holding given number of data code words
+    (including the control block).
+    """
+    ec_words = 2 ** (security_level + 1)
+
+    # Reserve 1 code word for the length descriptor
+    total_count = data_words + ec_words + 1
+    rows = math.ceil(total_count / columns) if force_rows is None else force_rows
+    padding_words = max(rows * columns - total_count, 0)
+    length_descriptor = data_words + padding_words + 1
+
+    fits = (
+        total_count <= rows * columns
+        and length_descriptor <= MAX_CODE_WORDS
+        and MIN_ROWS <= rows <= MAX_ROWS
+    )
+
+    return Plan(
+        data_words=data_words,
+        padding_words=padding_words,
+        ec_words=ec_words,
+        length_descriptor=length_descriptor,
+        columns=columns,
+        rows=rows,
+        fits=fits,
+    )
+
+
+def encode_rows(
+    rows: List[Tuple[Codeword, ...]],
+    num_cols: int,
+    security_level: int,
+    compact: bool = False
+):
     num_rows = len(rows)
 
     for row_no, row_data in enumerate(rows):
         left = get_left_code_word(row_no, num_rows, num_cols, security_level)
-        right = get_right_code_word(row_no, num_rows, num_cols, security_level)
 
-        yield encode_row(row_no, row_data, left, right)
+        if compact:
+            yield encode_compact_row(row_no, row_data, left)
+        else:
+            right = get_right_code_word(row_no, num_rows, num_cols, security_level)
+            yield encode_row(row_no, row_data, left, right)
 
 
 def encode_row(row_no: int, row_words: Tuple[Codeword, ...], left: Codeword, right: Codeword):
-    table_idx = row_no % 3
+    table = CODES[row_no % 3]
 
     # Convert high level code words to low level code words
-    left_low = map_code_word(table_idx, left)
-    right_low = map_code_word(table_idx, right)
-    row_words_low = [map_code_word(table_idx, word) for word in row_words]
+    left_low = table[left]
+    right_low = table[right]
+    row_words_low = [table[word] for word in row_words]
 
     return [START_CHARACTER, left_low] + row_words_low + [right_low, STOP_CHARACTER]
 
 
+def encode_compact_row(row_no: int, row_words: Tuple[Codeword, ...], left: Codeword):
+    """Encodes a Compact PDF417 row, without the right row indicator."""
+    table = CODES[row_no % 3]
+
+    # Convert high level code words to low level code words
+    left_low = table[left]
+    row_words_low = [table[word] for word in row_words]
+
+    return [START_CHARACTER, left_low] + row_words_low + [COMPACT_STOP_CHARACTER]
+
+
 def encode_high(
     data: bytes, 
     columns: int, 
@@ -114,11 +242,16 @@ def encode_high(
     """
     if not control_block:
         control_block = []
-    # Encode data to code words
-    data_words = list(compact(data, force_binary))
-    
+
+    # Reject data which can not fit into any bar code without looking at it
+    validate_data_length(len(data))
+
+    # Count the code words before compacting, so data which does not fit is
+    # rejected before doing the expensive compaction and error correction
+    data_chunks = list(split_to_chunks(data, force_binary))
+
     # Calculate total payload length including control block if present
-    payload_length = len(data_words) + len(control_block)
+    payload_length = count_chunks(data_chunks) + len(control_block)
     
     # Get the padding to align data to column count
     ec_count = 2 ** (security_level + 1)
@@ -135,15 +268,51 @@ def encode_high(
     # Check the generated bar code's size is within specification parameters
     validate_barcode_size(length_descriptor, row_count)
 
+    # Encode data to code words
+    with instrumentation.timer("compact_seconds"):
+        data_words = list(compact_chunks(data_chunks))
+
     # Join encoded data with the length specifier, data and padding
     extended_words = [length_descriptor] + data_words + padding_words + control_block
 
     # Calculate error correction words
-    ec_words = compute_error_correction_code_words(extended_words, security_level)
+    with instrumentation.timer("error_correction_seconds"):
+        ec_words = compute_error_correction_code_words(extended_words, security_level)
+
+    if instrumentation.enabled():
+        emit_code_word_metrics(len(data), data_chunks, cw_count, ec_count, padding_count, row_count, columns)
 
     return extended_words + ec_words
 
 
+def emit_code_word_metrics(
+    payload_bytes: int,
+    data_chunks: List[Chunk],
+    cw_count: int,
+    ec_count: int,
+    padding_count: int,
+    row_count: int,
+    columns: int
+):
+    instrumentation.emit("payload_bytes", payload_bytes)
+
+    for mode, mode_count in count_chunks_by_mode(data_chunks).items():
+        instrumentation.emit("codewords_" + mode, mode_count)
+
+    instrumentation.emit("codewords_total", cw_count)
+    instrumentation.emit("ec_words", ec_count)
+    instrumentation.emit("padding_words", padding_count)
+    instrumentation.emit("rows", row_count)
+    instrumentation.emit("columns", columns)
+
+
+def validate_data_length(data_length: int):
+    if data_length > MAX_DATA_BYTES:
+        raise ValueError(
+            "Data too long. Input has %d bytes which can not fit in a bar code. "
+            "Maximum is %d bytes." % (data_length, MAX_DATA_BYTES))
+
+
 def validate_barcode_size(length_descriptor: int, row_count: int):
     if length_descriptor > MAX_CODE_WORDS:
         raise ValueError(
@@ -212,6 +381,7 @@ def encode_macro(
     encoding: str = "utf-8",
     segment_size: int = 800,
     force_rows: Optional[int] = None,
+    segment_mode: str = "bytes",
     file_id: Optional[List[Codeword]] = None,
     file_name: Optional[str] = None,
     segment_count: bool = True,
@@ -219,8 +389,14 @@ def encode_macro(
     addressee: Optional[str] = None,
     file_size: bool = False,
     checksum: Optional[Union[bool, int]] = None,
-    force_binary: bool = False
-) -> List[Barcode]:
+    force_binary: bool = False,
+    compact: bool = False,
+    workers: Optional[int] = None,
+    executor: Optional["Executor"] = None,
+    renderer: Optional[Callable[[Barcode], Any]] = None,
+    content_file_id: bool = False,
+    compression: str = "none"
+) -> List[Any]:
     """
     Encode data using Macro PDF417 for large data that needs to be split across
     multiple barcodes.
@@ -230,20 +406,45 @@ def encode_macro(
         columns: Number of columns in each symbol (1-30)
         security_level: Error correction level (0-8)
         encoding: Character encoding for the data
-        segment_size: Maximum size in bytes for each segment
-        file_id: Custom file ID codewords or None for auto-generated
+        segment_size: Maximum size in bytes for each segment, used when
+                      `segment_mode` is "bytes"
+        force_rows: Force exact number of rows (3-90) in each symbol
+        segment_mode: How to split data into segments. "bytes" cuts the data
+                      into `segment_size` byte slices, "capacity" fills each
+                      symbol up to its codeword capacity, given by `force_rows`
+                      (or the maximum row count) times `columns`.
+        file_id: Custom file ID codewords or None for auto-generated, see
+                 `content_file_id`
         file_name: Name of the file to include in the barcode
         segment_count: Whether to include the segment count in the barcode (default, to allow multi page outputs)
         sender: Name of the sender to include
         addressee: Name of the recipient to include
         file_size: Whether to include the file size in the barcode
-        checksum: True to auto-generate, or an integer value (0-65535)
+        checksum: True to auto-generate a CRC-16 CCITT checksum of the data, or
+                  an integer value (0-65535)
         force_binary: Force byte compaction mode (useful for pre-compressed data)
+        compact: Produce Compact (Truncated) PDF417 barcodes
+        workers: Number of worker processes used to encode segments in parallel.
+                 None or 1 encodes segments serially in the calling thread.
+        executor: An existing executor (thread or process pool) to encode the
+                  segments on, takes precedence over `workers`
+        renderer: Optional function applied to each encoded segment in the
+                  worker, e.g. `functools.partial(render_image, scale=2)`. Must
+                  be picklable when encoding on a process pool.
+        content_file_id: Derive the auto-generated file ID from a hash of the
+                         data and options instead of the current time, so the
+                         same input always produces the same bar codes
+        compression: "none", "zlib", "bz2", "lzma", or "auto" to use whichever
+                     of these produces the fewest segments, and then the fewest
+                     code words, see `compression`. The file size and checksum
+                     fields describe the compressed data. To know which codec
+                     is used, choose it using `estimate` and pass it here.
 
     Timestamps are not supported because the max timestamp is in 1991.
     
     Returns:
-        List of PDF417 barcodes, each represented as a list of rows
+        List of PDF417 barcodes, each represented as a list of rows, in segment
+        order. If `renderer` is given, the list contains the rendered segments.
     """
     if columns < 1 or columns > 30:
         raise ValueError("'columns' must be between 1 and 30. Given: %r" % columns)
@@ -251,21 +452,31 @@ def encode_macro(
     if security_level < 0 or security_level > 8:
         raise ValueError("'security_level' must be between 0 and 8. Given: %r" % security_level)
     
+    if segment_mode not in ("bytes", "capacity"):
+        raise ValueError("'segment_mode' must be 'bytes' or 'capacity'. Given: %r" % segment_mode)
+
+    def count_segments(candidate: Compressed) -> Tuple[int, int]:
+        # Estimated without control blocks, which are the same for all candidates
+        code_words = count_code_words(candidate)
+        if segment_mode == "capacity":
+            capacity = get_data_capacity(columns, security_level, force_rows)
+            return math.ceil(code_words / capacity), code_words
+        return math.ceil(len(candidate.data) / segment_size), code_words
+
     # Prepare input data as bytes
-    data_bytes = to_bytes(data, encoding)
+    compressed = apply_compression(to_bytes(data, encoding), compression, force_binary,
+                                   count_segments)
+    data_bytes = compressed.data
+    force_binary = compressed.force_binary
     data_size = len(data_bytes)
     
     # Auto-generate file ID if not provided
-    if file_id is None:
+    if file_id is None and content_file_id:
+        file_id = derive_file_id(data_bytes, columns, security_level, segment_size, force_rows,
+                                 segment_mode, file_name, sender, addressee, force_binary)
+    elif file_id is None:
         file_id = [int(time.time()) % 900]
-    
-    # Calculate how many segments we need
-    segments: List[bytes] = []
-    for i in range(0, data_size, segment_size):
-        segments.append(data_bytes[i:i+segment_size])
-    
-    segment_count_value = len(segments)
-    
+
     # Build optional fields dictionary
     optional_fields: Dict[int, Any] = {}
     
@@ -273,7 +484,9 @@ def encode_macro(
         optional_fields[MACRO_FILE_NAME] = file_name
     
     if segment_count:
-        optional_fields[MACRO_SEGMENT_COUNT] = segment_count_value
+        # Set once the data is split into segments, the value does not affect
+        # the length of the control block
+        optional_fields[MACRO_SEGMENT_COUNT] = 0
     
     if sender is not None:
         optional_fields[MACRO_SENDER] = sender
@@ -285,45 +498,224 @@ def encode_macro(
         optional_fields[MACRO_FILE_SIZE] = data_size
     
     if checksum is not None:
-        if checksum is True:
-            # TODO compute checksum of the data
-            raise ValueError("Auto-generated checksum is not supported")
-        else:
-            optional_fields[MACRO_CHECKSUM] = checksum
+        # Auto-generated checksum is computed while splitting data into
+        # segments, the value does not affect the length of the control block
+        optional_fields[MACRO_CHECKSUM] = 0 if checksum is True else checksum
     
-    # Generate barcodes for each segment
-    barcodes: List[List[List[int]]] = []
-    for i, segment_data in enumerate(segments):
-        # Determine if this is the last segment
-        is_last = (i == segment_count_value - 1)
-        
-        # Create control block for this segment
-        control_block = create_macro_control_block(
-            segment_index=i,
+    # Calculate how many segments we need
+    if segment_mode == "capacity":
+        # The longest control block is the one for the last segment
+        control_block_length = len(create_macro_control_block(
+            segment_index=0,
             file_id=file_id,
             optional_fields=optional_fields,
-            is_last=is_last
-        )
-        
-        # Encode segment with control block
-        barcode = encode(
-            segment_data, 
-            columns,
-            security_level, 
-            encoding=encoding,
-            force_rows=force_rows,
-            control_block=control_block,
-            force_binary=force_binary
-        )
-        
-        barcodes.append(barcode)
+            is_last=True
+        ))
+        capacity = get_data_capacity(columns, security_level, force_rows) - control_block_length
+        segment_iter = split_to_segments(data_bytes, capacity, force_binary)
+    else:
+        segment_iter = (data_bytes[i:i+segment_size] for i in range(0, data_size, segment_size))
+
+    segments: List[bytes] = []
+    crc = CRC16_INITIAL_VALUE
+    for segment in segment_iter:
+        if checksum is True:
+            crc = crc16(segment, crc)
+        segments.append(segment)
+
+    if checksum is True:
+        optional_fields[MACRO_CHECKSUM] = crc
+
+    segment_count_value = len(segments)
+
+    if segment_count:
+        optional_fields[MACRO_SEGMENT_COUNT] = segment_count_value
     
-    return barcodes
+    # Create control blocks for all segments
+    # Only the segment index and terminator differ between control blocks, so
+    # file ID and optional fields are compacted only once
+    template = compile_macro_control_block(file_id, optional_fields)
+    control_blocks = [
+        create_segment_control_block(
+            segment_index=i,
+            template=template,
+            is_last=(i == segment_count_value - 1)
+        )
+        for i in range(segment_count_value)
+    ]
+
+    # Segments are independent of each other so they can be encoded in any
+    # order, map() returns the results in segment order
+    encode_segment = partial(
+        _encode_segment,
+        columns=columns,
+        security_level=security_level,
+        encoding=encoding,
+        force_rows=force_rows,
+        force_binary=force_binary,
+        compact=compact,
+        renderer=renderer,
+    )
+
+    if executor is not None:
+        return list(executor.map(encode_segment, segments, control_blocks))
+
+    if workers is not None and workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Encoding is CPU bound so a thread pool would be serialized by the
+        # GIL, use processes instead
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, segment_count_value // (workers * 4))
+            return list(pool.map(encode_segment, segments, control_blocks, chunksize=chunksize))
+
+    return list(map(encode_segment, segments, control_blocks))
+
+
+def _encode_segment(
+    segment_data: bytes,
+    control_block: List[Codeword],
+    columns: int,
+    security_level: int,
+    encoding: str,
+    force_rows: Optional[int],
+    force_binary: bool,
+    compact: bool,
+    renderer: Optional[Callable[[Barcode], Any]]
+) -> Any:
+    """Encodes (and optionally renders) a single Macro PDF417 segment."""
+    barcode = encode(
+        segment_data,
+        columns,
+        security_level,
+        encoding=encoding,
+        force_rows=force_rows,
+        control_block=control_block,
+        force_binary=force_binary,
+        compact=compact
+    )
+
+    return renderer(barcode) if renderer else barcode
+
+
+def derive_file_id(data: bytes, *options: Any) -> List[Codeword]:
+    """Derives a Macro PDF417 file ID from a hash of the data and options."""
+    import hashlib
+
+    digest = hashlib.sha256(repr(options).encode("utf-8") + b"\0" + data).digest()
+
+    # Three code words, each holding 3 decimal digits of the file ID
+    return [int.from_bytes(digest[i:i + 2], "big") % 900 for i in range(0, 6, 2)]
+
+
+def get_data_capacity(columns: int, security_level: int, force_rows: Optional[int] = None) -> int:
+    """
+    Returns the number of data code words (excluding the length descriptor)
+    which fit into a bar code of given dimensions. Defaults to maximum rows.
+    """
+    rows = MAX_ROWS if force_rows is None else force_rows
+    ec_count = 2 ** (security_level + 1)
+
+    # The length descriptor counts itself and the padding which fills the last
+    # row, and is limited to MAX_CODE_WORDS, so the symbol must end on a whole
+    # row within that limit
+    max_rows = (MAX_CODE_WORDS + ec_count) // columns
+    total = min(rows, max_rows) * columns
+
+    return total - ec_count - 1
+
+
+def split_to_segments(
+    data: bytes,
+    capacity: int,
+    force_binary: bool = False
+) -> Generator[bytes, None, None]:
+    """
+    Splits data into segments, each of which compacts into at most `capacity`
+    code words.
+
+    Cuts falling inside a run of characters compacted in the same mode are
+    moved back to the run's packing boundary (whole numeric groups, character
+    pairs in text mode, 6 byte groups in byte mode) so no code words are wasted
+    on partially filled groups.
+    """
+    if capacity < 1:
+        raise ValueError(
+            "Not enough space in the barcode to fit the data. "
+            "Try increasing column count or decreasing security level.")
+
+    start = 0
+
+    while start < len(data):
+        end = _find_segment_end(data, start, capacity, force_binary)
+        if end == start:
+            raise ValueError(
+                "Not enough space in the barcode to fit the data. "
+                "Try increasing column count or decreasing security level.")
+
+        aligned = _align_segment_end(data, start, end, force_binary)
+        if aligned < end and count(data[start:aligned], force_binary) <= capacity:
+            end = aligned
+
+        yield data[start:end]
+        start = end
+
+
+def _find_segment_end(data: bytes, start: int, capacity: int, force_binary: bool) -> int:
+    """Binary search for the longest slice starting at `start` which fits."""
+    lo = start
+    hi = min(len(data), start + capacity * MAX_BYTES_PER_CODE_WORD)
+
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count(data[start:mid], force_binary) <= capacity:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    return lo
+
+
+def _align_segment_end(data: bytes, start: int, end: int, force_binary: bool) -> int:
+    """Moves the segment end back to the packing boundary of the run it cuts."""
+    if end >= len(data):
+        return end
+
+    def compactor(char: int) -> CompactionFn:
+        return compact_bytes if force_binary else get_optimal_compactor_fn(char)
+
+    fn = compactor(data[end - 1])
+    if fn != compactor(data[end]):
+        return end
+
+    # Find the start of the run within this segment
+    run_start = end - 1
+    while run_start > start and compactor(data[run_start - 1]) == fn:
+        run_start -= 1
+
+    run_length = end - run_start
+
+    if fn == compact_numbers:
+        # Short numeric runs are compacted as text, move them to the next
+        # segment where they can join the rest of the run
+        if run_length < MIN_NUMERIC_LENGTH:
+            aligned = run_start
+        elif run_length >= NUMERIC_GROUP_SIZE:
+            aligned = run_start + run_length - run_length % NUMERIC_GROUP_SIZE
+        else:
+            aligned = end
+    elif fn == compact_bytes:
+        aligned = run_start + run_length - run_length % BYTE_GROUP_SIZE
+    else:
+        aligned = run_start + run_length - run_length % 2
+
+    return aligned if aligned > start else end
+
 
 def create_macro_control_block(
     segment_index: int,
     file_id: List[Codeword],
-    optional_fields: Dict[int, Any] = {},
+    optional_fields: Optional[Dict[int, Any]] = None,
     is_last: bool = False
 ) -> List[Codeword]:
     """
@@ -338,33 +730,68 @@ def create_macro_control_block(
     Returns:
         List of codewords for the control block
     """
-    if segment_index < 0 or segment_index > 99998:
-        raise ValueError(f"Segment index must be between 0 and 99998. Given: {segment_index}")
-    
-    control_block = [MACRO_MARKER]
-    
-    # Add segment index (padded to 5 digits and numeric-compacted)
-    segment_index_str = f"{segment_index:05d}"
-    numeric_compacted = compact_numbers(to_bytes(segment_index_str))
-    control_block.extend(numeric_compacted)
-    
-    # Add file ID
-    control_block.extend(file_id)
-    
+    template = compile_macro_control_block(file_id, optional_fields)
+    return create_segment_control_block(segment_index, template, is_last)
+
+
+def compile_macro_control_block(
+    file_id: List[Codeword],
+    optional_fields: Optional[Dict[int, Any]] = None
+) -> List[Codeword]:
+    """
+    Compile the part of a Macro PDF417 control block which is shared by all
+    segments: the file ID and the optional fields.
+
+    Args:
+        file_id: List of codewords for file ID
+        optional_fields: Optional fields to include
+
+    Returns:
+        List of codewords to be passed to `create_segment_control_block`
+    """
+    template = list(file_id)
+
     # Add optional fields if provided
     if optional_fields:
         for field_id, value in optional_fields.items():
             if field_id not in range(7):  # Valid field designators are 0-6
                 raise ValueError(f"Invalid field ID: {field_id}. Must be between 0 and 6.")
-                
+
             field_codewords = encode_optional_field(field_id, value)
             if field_codewords:
-                control_block.extend(field_codewords)
-    
+                template.extend(field_codewords)
+
+    return template
+
+
+def create_segment_control_block(
+    segment_index: int,
+    template: List[Codeword],
+    is_last: bool = False
+) -> List[Codeword]:
+    """
+    Create a Macro PDF417 control block for a segment from a template created
+    by `compile_macro_control_block`.
+
+    Args:
+        segment_index: Index of this segment (0-99998)
+        template: Compiled file ID and optional fields
+        is_last: Whether this is the last segment
+
+    Returns:
+        List of codewords for the control block
+    """
+    if segment_index < 0 or segment_index > 99998:
+        raise ValueError(f"Segment index must be between 0 and 99998. Given: {segment_index}")
+
+    # Segment index is padded to 5 digits and numeric-compacted, which always
+    # produces two code words. Numeric compaction prepends a "1" to the digits.
+    control_block = [MACRO_MARKER] + to_base(100000 + segment_index, 900) + template
+
     # Add terminator for last segment
     if is_last:
         control_block.append(MACRO_TERMINATOR)
-    
+
     return control_block
 
 def encode_optional_field(field_id: int, value: Any) -> List[Codeword]:
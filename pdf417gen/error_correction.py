@@ -1,5 +1,6 @@
 from builtins import range
-from typing import List
+from functools import lru_cache
+from typing import List, Sequence, Tuple
 
 from pdf417gen.types import Codeword
 
@@ -12,8 +13,45 @@ def compute_error_correction_code_words(data_words: List[Codeword], level: int):
     # Correction factors for the given level
     factors = ERROR_CORRECTION_FACTORS[level]
 
+    return _compute_code_words(data_words, factors)
+
+
+def compute_error_correction_code_words_by_count(data_words: List[Codeword], count: int):
+    """Computes `count` error correction code words.
+
+    Used by MicroPDF417 where the number of error correction words is not a
+    power of two and depends on the symbol size.
+    """
+    assert count > 0
+
+    return _compute_code_words(data_words, compute_error_correction_factors(count))
+
+
+@lru_cache(maxsize=None)
+def compute_error_correction_factors(count: int) -> Tuple[int, ...]:
+    """Computes the coefficients of the Reed-Solomon generator polynomial.
+
+    The generator is the product of (x - 3^j) for j = 1..count over GF(929).
+    Returns all coefficients except the leading one, lowest order first, which
+    matches the layout of `ERROR_CORRECTION_FACTORS`.
+    """
+    coefficients = [1]
+    root = 1
+
+    for _ in range(count):
+        root = root * 3 % 929
+        product = [0] * (len(coefficients) + 1)
+        for x, coefficient in enumerate(coefficients):
+            product[x + 1] = (product[x + 1] + coefficient) % 929
+            product[x] = (product[x] - coefficient * root) % 929
+        coefficients = product
+
+    return tuple(coefficients[:-1])
+
+
+def _compute_code_words(data_words: List[Codeword], factors: Sequence[int]):
     # Number of EC words
-    count = 2 ** (level + 1)
+    count = len(factors)
 
     # Correction code words list, prepopulated with zeros
     ec_words = [0] * count
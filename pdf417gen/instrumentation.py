@@ -0,0 +1,167 @@
+"""
+Instrumentation hooks.
+
+Encoding and rendering report measurements to registered hooks. A hook is a
+callable taking the name of the measurement and its value. When no hooks are
+registered, measurements are not taken.
+
+Measurements reported for each encoded bar code:
+
+    payload_bytes                   size of the data
+    codewords_text                  data code words in text compaction mode
+    codewords_numeric               data code words in numeric compaction mode
+    codewords_byte                  data code words in byte compaction mode
+    codewords_total                 all code words, including error correction
+    ec_words                        error correction code words
+    padding_words                   padding code words
+    rows, columns                   bar code dimensions
+    compact_seconds                 time spent compacting data
+    error_correction_seconds        time spent computing error correction
+    encode_rows_seconds             time spent converting rows to low level code words
+
+And for each rendered bar code:
+
+    render_image_seconds            time spent in `render_image`
+    render_svg_seconds              time spent in `render_svg`
+
+`Metrics` is a hook which aggregates the measurements, for example:
+
+    metrics = Metrics()
+    add_hook(metrics)
+    ...
+    metrics.as_dict()
+
+Hooks are global to the process. Work done in worker processes, e.g. by
+`encode_macro` with `workers`, is not reported to hooks in the parent process.
+Hooks are called from the thread doing the work, so when encoding from multiple
+threads they must be thread safe, as `Metrics` is. Hooks can be added and
+removed while other threads are encoding.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterator, Sequence, Tuple
+
+Hook = Callable[[str, float], None]
+
+# Replaced rather than modified when hooks are added or removed, so that threads
+# iterating over the hooks are not affected
+_hooks: Tuple[Hook, ...] = ()
+_hooks_lock = threading.Lock()
+
+# Upper bounds of timing histogram buckets in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_NULL_TIMER = nullcontext()
+
+
+def add_hook(hook: Hook):
+    """Registers a hook which will receive measurements."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: Hook):
+    global _hooks
+    with _hooks_lock:
+        hooks = list(_hooks)
+        hooks.remove(hook)
+        _hooks = tuple(hooks)
+
+
+def enabled() -> bool:
+    """Whether any hooks are registered.
+
+    Use to skip computing measurements which are expensive to take."""
+    return bool(_hooks)
+
+
+def emit(name: str, value: float):
+    """Reports a measurement to all registered hooks."""
+    for hook in _hooks:
+        hook(name, value)
+
+
+def timer(name: str) -> ContextManager[Any]:
+    """Returns a context manager which reports the time spent in it, in seconds.
+
+    When no hooks are registered, returns a shared no-op context manager."""
+    return _timer(name) if _hooks else _NULL_TIMER
+
+
+@contextmanager
+def _timer(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit(name, time.perf_counter() - start)
+
+
+@contextmanager
+def hooked(hook: Hook) -> Iterator[Hook]:
+    """Registers a hook for the duration of the with block."""
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+
+class Metrics:
+    """A hook which aggregates measurements into summaries.
+
+    Each measurement is summarized by its count, sum, minimum and maximum.
+    Timings (measurements ending with "_seconds") are also counted in histogram
+    buckets. Safe to use from multiple threads.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = sorted(buckets)
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, name: str, value: float):
+        with self.lock:
+            summary = self.summaries.get(name)
+            if summary is None:
+                summary = self.summaries[name] = {"count": 0, "sum": 0, "min": value, "max": value}
+                if name.endswith("_seconds"):
+                    summary["buckets"] = [0] * (len(self.buckets) + 1)
+
+            summary["count"] += 1
+            summary["sum"] += value
+            summary["min"] = min(summary["min"], value)
+            summary["max"] = max(summary["max"], value)
+
+            if "buckets" in summary:
+                summary["buckets"][bisect_left(self.buckets, value)] += 1
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Exports the metrics as a dict.
+
+        Histogram buckets are cumulative and keyed by their upper bound, like
+        Prometheus histograms."""
+        with self.lock:
+            result: Dict[str, Dict[str, Any]] = {}
+            for name, summary in sorted(self.summaries.items()):
+                exported = {k: v for k, v in summary.items() if k != "buckets"}
+
+                if "buckets" in summary:
+                    bounds = [str(b) for b in self.buckets] + ["+Inf"]
+                    total = 0
+                    exported["buckets"] = {}
+                    for bound, count in zip(bounds, summary["buckets"]):
+                        total += count
+                        exported["buckets"][bound] = total
+
+                result[name] = exported
+
+            return result
+
+    def reset(self):
+        with self.lock:
+            self.summaries.clear()
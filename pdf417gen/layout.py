@@ -0,0 +1,135 @@
+"""
+Automatic selection of bar code geometry.
+
+Picks the number of columns and rows analytically from the number of code
+words the data compacts into, without encoding it.
+"""
+
+from typing import List, Optional, Tuple, Union
+
+from pdf417gen.compression import apply_compression, count_code_words
+from pdf417gen.encoding import MIN_ROWS, plan_barcode
+from pdf417gen.types import Codeword, Plan
+from pdf417gen.util import to_bytes
+
+MIN_COLUMNS = 1
+MAX_COLUMNS = 30
+
+# Width of the start pattern, left and right row indicators and the stop
+# pattern which are added to each row, in modules
+ROW_OVERHEAD_MODULES = 17 + 17 + 17 + 18
+
+# Compact PDF417 has no right row indicator and a single module stop pattern
+COMPACT_ROW_OVERHEAD_MODULES = 17 + 17 + 1
+
+
+def symbol_size(columns: int, rows: int, compact: bool = False) -> Tuple[int, int]:
+    """Returns the size of a bar code in modules, same as `barcode_size`."""
+    overhead = COMPACT_ROW_OVERHEAD_MODULES if compact else ROW_OVERHEAD_MODULES
+    return columns * 17 + overhead, rows
+
+
+def auto_layout(
+    data: Union[str, bytes],
+    security_level: int = 2,
+    encoding: str = "utf-8",
+    aspect_ratio: Optional[float] = None,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    scale: int = 1,
+    ratio: int = 3,
+    control_block: Optional[List[Codeword]] = None,
+    force_binary: bool = False,
+    compact: bool = False,
+    compression: str = "none"
+) -> Plan:
+    """
+    Choose the number of columns and rows which minimize the bar code area and
+    padding.
+
+    Sizes are measured in pixels as rendered by `render_image` with given
+    `scale` and `ratio`, excluding padding. With the default scale of 1,
+    widths are in modules.
+
+    Args:
+        data: The data to encode (string or bytes)
+        security_level: Error correction level (0-8)
+        encoding: Character encoding for string data
+        aspect_ratio: Preferred ratio of width to height, e.g. 2.0 for a bar
+                      code twice as wide as it is high
+        max_width: Maximum bar code width
+        max_height: Maximum bar code height
+        scale: Module width in pixels
+        ratio: Module height to width ratio
+        control_block: Optional control block for Macro PDF417
+        force_binary: Force byte compaction mode
+        compact: Lay out a Compact PDF417 bar code
+        compression: Compress the data as `encode` would, see `compression`
+
+    Returns:
+        Plan for the chosen geometry, pass `plan.columns`, `plan.rows` (as
+        `force_rows`) and `plan.codec` (as `compression`) to `encode`.
+    """
+    if security_level < 0 or security_level > 8:
+        raise ValueError("'security_level' must be between 0 and 8. Given: %r" % security_level)
+
+    if aspect_ratio is not None and aspect_ratio <= 0:
+        raise ValueError("'aspect_ratio' must be positive. Given: %r" % aspect_ratio)
+
+    compressed = apply_compression(to_bytes(data, encoding), compression, force_binary)
+    data_words = count_code_words(compressed) + (len(control_block) if control_block else 0)
+
+    plan = choose_layout(
+        data_words, security_level, aspect_ratio, max_width, max_height, scale, ratio, compact)
+    return plan._replace(codec=compressed.codec)
+
+
+def choose_layout(
+    data_words: int,
+    security_level: int,
+    aspect_ratio: Optional[float] = None,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    scale: int = 1,
+    ratio: int = 3,
+    compact: bool = False
+) -> Plan:
+    """
+    Choose the geometry for given number of data code words, see `auto_layout`.
+    """
+    candidates: List[Tuple[float, int, Plan]] = []
+
+    for columns in range(MIN_COLUMNS, MAX_COLUMNS + 1):
+        plan = plan_barcode(data_words, columns, security_level)
+
+        # Small data in few columns can produce too few rows, pad them up
+        if plan.rows < MIN_ROWS:
+            plan = plan_barcode(data_words, columns, security_level, force_rows=MIN_ROWS)
+
+        if not plan.fits:
+            continue
+
+        width, height = symbol_size(plan.columns, plan.rows, compact)
+        width *= scale
+        height *= scale * ratio
+
+        if max_width is not None and width > max_width:
+            continue
+
+        if max_height is not None and height > max_height:
+            continue
+
+        area: float = width * height
+        if aspect_ratio is not None:
+            # Penalize deviation from the preferred aspect ratio
+            actual = width / height
+            area *= max(actual / aspect_ratio, aspect_ratio / actual)
+
+        candidates.append((area, plan.padding_words, plan))
+
+    if not candidates:
+        raise ValueError(
+            "Data does not fit into a bar code within given limits. "
+            "Try increasing the maximum size or decreasing security level.")
+
+    return min(candidates, key=lambda c: (c[0], c[1]))[2]
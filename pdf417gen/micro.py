@@ -0,0 +1,194 @@
+"""
+MicroPDF417 encoder.
+
+MicroPDF417 is a compact variant of PDF417 intended for small payloads. It has
+1 to 4 columns and a fixed set of symbol sizes, each with a fixed number of
+error correction code words. Instead of the start and stop patterns and row
+indicators, each row is delimited by row address patterns (RAPs) which also
+identify the row. Rows end with a single module stop bar.
+
+Data is compacted in the same way as PDF417 but there is no length descriptor.
+"""
+
+from typing import List, Optional, Union
+
+from pdf417gen.codes import map_code_word
+from pdf417gen.compaction import compact_chunks, count_chunks, split_to_chunks
+from pdf417gen.error_correction import compute_error_correction_code_words_by_count
+from pdf417gen.types import Barcode, Codeword, MicroSize
+from pdf417gen.util import to_bytes
+
+PADDING_CODE_WORD: Codeword = 900
+
+# A single module wide bar terminating each row
+STOP_CHARACTER = 0x1
+
+MIN_COLUMNS = 1
+MAX_COLUMNS = 4
+
+# Supported symbol sizes, ordered by column count and row count
+SIZES: List[MicroSize] = [
+    MicroSize(1, 11, 7, 1, 0, 9),
+    MicroSize(1, 14, 7, 8, 0, 8),
+    MicroSize(1, 17, 7, 36, 0, 36),
+    MicroSize(1, 20, 8, 19, 0, 19),
+    MicroSize(1, 24, 8, 9, 0, 17),
+    MicroSize(1, 28, 8, 25, 0, 33),
+    MicroSize(2, 8, 8, 1, 0, 1),
+    MicroSize(2, 11, 9, 1, 0, 9),
+    MicroSize(2, 14, 9, 8, 0, 8),
+    MicroSize(2, 17, 10, 36, 0, 36),
+    MicroSize(2, 20, 11, 19, 0, 19),
+    MicroSize(2, 23, 13, 9, 0, 17),
+    MicroSize(2, 26, 15, 27, 0, 35),
+    MicroSize(3, 6, 12, 1, 1, 1),
+    MicroSize(3, 8, 14, 7, 7, 7),
+    MicroSize(3, 10, 16, 15, 15, 15),
+    MicroSize(3, 12, 18, 25, 25, 25),
+    MicroSize(3, 15, 21, 37, 37, 37),
+    MicroSize(3, 20, 26, 1, 17, 33),
+    MicroSize(3, 26, 32, 1, 9, 17),
+    MicroSize(3, 32, 38, 21, 29, 37),
+    MicroSize(3, 38, 44, 15, 31, 47),
+    MicroSize(3, 44, 50, 1, 25, 49),
+    MicroSize(4, 4, 8, 47, 19, 43),
+    MicroSize(4, 6, 12, 1, 1, 1),
+    MicroSize(4, 8, 14, 7, 7, 7),
+    MicroSize(4, 10, 16, 15, 15, 15),
+    MicroSize(4, 12, 18, 25, 25, 25),
+    MicroSize(4, 15, 21, 37, 37, 37),
+    MicroSize(4, 20, 26, 1, 17, 33),
+    MicroSize(4, 26, 32, 1, 9, 17),
+    MicroSize(4, 32, 38, 21, 29, 37),
+    MicroSize(4, 38, 44, 15, 31, 47),
+    MicroSize(4, 44, 50, 1, 25, 49),
+]
+
+# Largest number of data code words which fit in a symbol
+MAX_DATA_WORDS = max(size.columns * size.rows - size.ec_words for size in SIZES)
+
+# Row address patterns, 10 modules wide. There are 52 patterns which are used
+# cyclically, the starting pattern being defined by the symbol size.
+LEFT_RIGHT_RAPS = [
+    0x322, 0x3a2, 0x3b2, 0x332, 0x372, 0x37a, 0x33a, 0x3ba, 0x39a, 0x3da,
+    0x3ca, 0x38a, 0x30a, 0x31a, 0x312, 0x392, 0x3d2, 0x3d6, 0x3d4, 0x394,
+    0x3b4, 0x3a4, 0x3a6, 0x3ae, 0x3ac, 0x3a8, 0x328, 0x32c, 0x32e, 0x326,
+    0x336, 0x3b6, 0x396, 0x316, 0x314, 0x334, 0x374, 0x364, 0x366, 0x36e,
+    0x36c, 0x368, 0x348, 0x358, 0x35c, 0x35e, 0x34e, 0x34c, 0x344, 0x346,
+    0x342, 0x362,
+]
+
+CENTER_RAPS = [
+    0x2ce, 0x24e, 0x26e, 0x22e, 0x226, 0x236, 0x216, 0x212, 0x21a, 0x23a,
+    0x232, 0x222, 0x262, 0x272, 0x27a, 0x2fa, 0x2f2, 0x2f6, 0x276, 0x274,
+    0x264, 0x266, 0x246, 0x242, 0x2c2, 0x2e2, 0x2e6, 0x2e4, 0x2ec, 0x26c,
+    0x22c, 0x228, 0x268, 0x2e8, 0x2c8, 0x2cc, 0x2c4, 0x2c6, 0x286, 0x28e,
+    0x28c, 0x29c, 0x298, 0x2b8, 0x2b0, 0x290, 0x2d0, 0x250, 0x258, 0x25c,
+    0x2dc, 0x2de,
+]
+
+
+def encode_micro(
+    data: Union[str, bytes],
+    columns: Optional[int] = None,
+    rows: Optional[int] = None,
+    encoding: str = "utf-8",
+    force_binary: bool = False,
+) -> Barcode:
+    """
+    Encode data into a MicroPDF417 barcode.
+
+    Args:
+        data: The data to encode (string or bytes)
+        columns: Number of columns (1-4). If None, the column count giving the
+                 smallest symbol is used
+        rows: Force the number of rows, must be one of the sizes defined for
+              the column count. If None, the smallest fitting size is used
+        encoding: Character encoding for string data
+        force_binary: Force byte compaction mode (useful for pre-compressed data)
+
+    Returns:
+        Encoded MicroPDF417 barcode which can be passed to the renderers
+    """
+    validate_micro_options(columns, rows)
+
+    data_bytes = to_bytes(data, encoding)
+    data_chunks = list(split_to_chunks(data_bytes, force_binary))
+
+    size = get_micro_size(count_chunks(data_chunks), columns, rows)
+
+    data_words = list(compact_chunks(data_chunks))
+    padding_count = size.columns * size.rows - size.ec_words - len(data_words)
+    data_words += [PADDING_CODE_WORD] * padding_count
+
+    ec_words = compute_error_correction_code_words_by_count(data_words, size.ec_words)
+
+    return list(encode_micro_rows(data_words + ec_words, size))
+
+
+def validate_micro_options(columns: Optional[int], rows: Optional[int]):
+    if columns is not None and not MIN_COLUMNS <= columns <= MAX_COLUMNS:
+        raise ValueError("'columns' must be between %d and %d. Given: %r" % (
+            MIN_COLUMNS, MAX_COLUMNS, columns))
+
+    if rows is not None:
+        valid_rows = sorted({size.rows for size in SIZES
+                             if columns is None or size.columns == columns})
+        if rows not in valid_rows:
+            raise ValueError("'rows' must be one of %s. Given: %r" % (
+                ", ".join(str(r) for r in valid_rows), rows))
+
+
+def get_micro_size(
+    data_count: int,
+    columns: Optional[int] = None,
+    rows: Optional[int] = None,
+) -> MicroSize:
+    """Returns the smallest symbol size which can hold `data_count` data words."""
+    candidates = [
+        size for size in SIZES
+        if (columns is None or size.columns == columns)
+        and (rows is None or size.rows == rows)
+        and data_count <= size.columns * size.rows - size.ec_words
+    ]
+
+    if not candidates:
+        raise ValueError(
+            "Data too long. Generated %d data code words which do not fit in a "
+            "MicroPDF417 symbol of the given size. Maximum is %d." % (
+                data_count, MAX_DATA_WORDS))
+
+    # Sort by area in modules, picking the narrower symbol on ties
+    return min(candidates, key=lambda size: (micro_width(size.columns) * size.rows, size.columns))
+
+
+def micro_width(columns: int) -> int:
+    """Returns the width of a MicroPDF417 symbol in modules."""
+    # Each column is 17 modules and each RAP is 10 modules, symbols with 3 or
+    # 4 columns have an additional center RAP, rows end with a stop bar
+    raps = 3 if columns >= 3 else 2
+    return columns * 17 + raps * 10 + 1
+
+
+def encode_micro_rows(code_words: List[Codeword], size: MicroSize):
+    for row_no in range(size.rows):
+        row_words = code_words[row_no * size.columns:(row_no + 1) * size.columns]
+        yield encode_micro_row(row_no, row_words, size)
+
+
+def encode_micro_row(row_no: int, row_words: List[Codeword], size: MicroSize) -> List[int]:
+    # Rows cycle through the three clusters, starting from the cluster of the
+    # symbol's first left RAP
+    table_id = (row_no + size.left_rap - 1) % 3
+
+    left = LEFT_RIGHT_RAPS[(row_no + size.left_rap - 1) % 52]
+    right = LEFT_RIGHT_RAPS[(row_no + size.right_rap - 1) % 52]
+    words = [map_code_word(table_id, word) for word in row_words]
+
+    # Wider symbols have a center RAP in the middle of the data
+    if size.columns >= 3:
+        center = CENTER_RAPS[(row_no + size.center_rap - 1) % 52]
+        split = size.columns - 2
+        words = words[:split] + [center] + words[split:]
+
+    return [left] + words + [right, STOP_CHARACTER]
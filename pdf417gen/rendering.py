@@ -1,7 +1,13 @@
-from typing import List, Optional, Tuple, Union
-from PIL import Image, ImageColor, ImageOps
-from PIL.Image import Resampling
-from xml.etree.ElementTree import ElementTree, Element, SubElement
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+from pdf417gen import instrumentation
+from pdf417gen.util import use_numpy
+
+# Pillow and ElementTree are imported when rendering, so that they are not
+# loaded by code which only encodes
+if TYPE_CHECKING:
+    from PIL import Image
+    from xml.etree.ElementTree import ElementTree
 
 ColorTuple = Union[Tuple[int, int, int], Tuple[int, int, int, int]]
 Color = Union[ColorTuple, str]
@@ -10,10 +16,10 @@ Color = Union[ColorTuple, str]
 def barcode_size(codes: List[List[int]]) -> Tuple[int, int]:
     """Returns the barcode size in modules."""
     num_rows = len(codes)
-    num_cols = len(codes[0])
 
-    # 17 modules per column, last column has an additional module
-    width = num_cols * 17 + 1
+    # Each bit of a low level code word is one module. Most code words have 17
+    # modules, but the stop pattern has 18, and 1 in Compact PDF417.
+    width = sum(value.bit_length() for value in codes[0])
     height = num_rows
 
     return width, height
@@ -32,6 +38,8 @@ def modules(codes: List[List[int]]):
 
 
 def parse_color(color: str) -> ColorTuple:
+    from PIL import ImageColor
+
     return ImageColor.getrgb(color)
 
 
@@ -45,30 +53,42 @@ def render_image(
     ratio: int = 3,
     padding: int = 20,
     fg_color: str = "#000",
-    bg_color: str = "#FFF"
-) -> Image.Image:
-    width, height = barcode_size(codes)
+    bg_color: str = "#FFF",
+    backend: str = "python",
+) -> "Image.Image":
+    from PIL import Image, ImageOps
+    from PIL.Image import Resampling
+
+    numpy = use_numpy(backend)
 
-    # Translate hex code colors to RGB tuples
-    bg_color_tuple = parse_color(bg_color)
-    fg_color_tuple = parse_color(fg_color)
+    with instrumentation.timer("render_image_seconds"):
+        width, height = barcode_size(codes)
 
-    # Construct the image
-    image = Image.new("RGB", (width, height), bg_color_tuple)
+        # Translate hex code colors to RGB tuples
+        bg_color_tuple = parse_color(bg_color)
+        fg_color_tuple = parse_color(fg_color)
 
-    # Draw the pixle grid
-    px = image.load()
-    if px is None:
-        raise ValueError("Failed loading image")
+        if numpy:
+            from pdf417gen import vectorized
+            return vectorized.render_image(
+                codes, scale, ratio, padding, fg_color_tuple, bg_color_tuple)
 
-    for x, y in modules(codes):
-        px[x, y] = fg_color_tuple
+        # Construct the image
+        image = Image.new("RGB", (width, height), bg_color_tuple)
 
-    # Scale and add padding
-    image = image.resize((scale * width, scale * height * ratio), resample=Resampling.NEAREST)
-    image = ImageOps.expand(image, padding, bg_color_tuple)
+        # Draw the pixle grid
+        px = image.load()
+        if px is None:
+            raise ValueError("Failed loading image")
 
-    return image
+        for x, y in modules(codes):
+            px[x, y] = fg_color_tuple
+
+        # Scale and add padding
+        image = image.resize((scale * width, scale * height * ratio), resample=Resampling.NEAREST)
+        image = ImageOps.expand(image, padding, bg_color_tuple)
+
+        return image
 
 
 def render_svg(
@@ -77,40 +97,43 @@ def render_svg(
     ratio: int = 3,
     color: str = "#000",
     description: Optional[str] = None
-):
-    # Barcode size in modules
-    width, height = barcode_size(codes)
-
-    # Size of each module
-    scale_x = scale
-    scale_y = scale * ratio
-
-    color = rgb_to_hex(parse_color(color))
-
-    root = Element('svg', {
-        "version": "1.1",
-        "xmlns": "http://www.w3.org/2000/svg",
-        "width": str(width * scale_x),
-        "height": str(height * scale_y),
-    })
-
-    if description:
-        description_element = SubElement(root, 'description')
-        description_element.text = description
-
-    group = SubElement(root, 'g', {
-        "id": "barcode",
-        "fill": color,
-        "stroke": "none"
-    })
-
-    # Generate the barcode modules
-    for col_id, row_id in modules(codes):
-        SubElement(group, 'rect', {
-            "x": str(col_id * scale_x),
-            "y": str(row_id * scale_y),
-            "width": str(scale_x),
-            "height": str(scale_y),
+) -> "ElementTree":
+    from xml.etree.ElementTree import ElementTree, Element, SubElement
+
+    with instrumentation.timer("render_svg_seconds"):
+        # Barcode size in modules
+        width, height = barcode_size(codes)
+
+        # Size of each module
+        scale_x = scale
+        scale_y = scale * ratio
+
+        color = rgb_to_hex(parse_color(color))
+
+        root = Element('svg', {
+            "version": "1.1",
+            "xmlns": "http://www.w3.org/2000/svg",
+            "width": str(width * scale_x),
+            "height": str(height * scale_y),
         })
 
-    return ElementTree(element=root)
+        if description:
+            description_element = SubElement(root, 'description')
+            description_element.text = description
+
+        group = SubElement(root, 'g', {
+            "id": "barcode",
+            "fill": color,
+            "stroke": "none"
+        })
+
+        # Generate the barcode modules
+        for col_id, row_id in modules(codes):
+            SubElement(group, 'rect', {
+                "x": str(col_id * scale_x),
+                "y": str(row_id * scale_y),
+                "width": str(scale_x),
+                "height": str(scale_y),
+            })
+
+        return ElementTree(element=root)
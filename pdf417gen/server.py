@@ -0,0 +1,404 @@
+"""
+Long running server modes which generate bar codes on request, avoiding the cost
+of starting the interpreter and loading the code tables for each bar code.
+
+The stdio server reads requests from stdin as newline delimited JSON, and writes
+one response line to stdout for each request, in the same order.
+
+A request is an object with the following fields:
+
+    data     the text to encode (required)
+    format   output format, "svg" or an image format supported by Pillow, such
+             as "png" (default) or "jpeg"
+    output   file path to save the bar code to, if not given the bar code is
+             returned in the response as base64
+    options  encoding and rendering options, see `batch.OPTION_TYPES`
+    id       optional request identifier, echoed in the response
+
+A successful response contains either the `path` to the saved file, or the
+base64 encoded `image`. A failed response has `error` set to the error message.
+
+The HTTP server renders bar codes at `/barcode.png` and `/barcode.svg`. The data
+is given either in the `data` query parameter of a GET request or as the body of
+a POST request, and options as query parameters, e.g.:
+
+    GET /barcode.png?data=Hello&columns=3&scale=2
+
+Rendered bar codes are cached in memory, keyed by a hash of the format, data
+and options which is also used as the ETag.
+
+Requests come from untrusted clients, so the HTTP server limits the data size,
+the size of rendered images in pixels, the number of requests waiting for a
+worker, answering 503 when there are too many, and the time a connection may
+stay idle.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Optional, TextIO, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from pdf417gen.batch import ENCODE_OPTIONS, create_image, create_svg, parse_options
+from pdf417gen.encoding import MAX_DATA_BYTES, MIN_ROWS, estimate
+from pdf417gen.layout import symbol_size
+
+REQUEST_FIELDS = ["id", "data", "format", "output", "options"]
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+# Default limits of the HTTP server
+MAX_PIXELS = 10_000_000
+REQUEST_TIMEOUT = 30.0
+
+# Response to requests rejected when all workers are busy, written directly to
+# the socket since there is no thread to handle the request
+SERVICE_UNAVAILABLE = (
+    b"HTTP/1.0 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    b"Content-Length: 20\r\n"
+    b"Retry-After: 1\r\n"
+    b"\r\n"
+    b"Too many requests.\r\n"
+)
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Generates a bar code for a request and returns the response."""
+    unknown = [name for name in request if name not in REQUEST_FIELDS]
+    if unknown:
+        raise ValueError("Unknown request field %r" % unknown[0])
+
+    data = request.get("data")
+    if not isinstance(data, str) or not data:
+        raise ValueError("'data' is required")
+
+    fmt = request.get("format", "png")
+    if not isinstance(fmt, str):
+        raise ValueError("Invalid format: %r" % fmt)
+
+    options = request.get("options", {})
+    if not isinstance(options, dict):
+        raise ValueError("'options' must be an object")
+    options = parse_options(options)
+
+    output = request.get("output")
+    content = generate(data, fmt.lower(), options)
+
+    if output:
+        with open(output, "wb") as f:
+            f.write(content)
+        return {"path": output}
+
+    return {"format": fmt.lower(), "image": base64.b64encode(content).decode("ascii")}
+
+
+def generate(data: str, fmt: str, options: Dict[str, Any]) -> bytes:
+    """Generates a bar code and returns the contents of the output file."""
+    buffer = io.BytesIO()
+
+    if fmt == "svg":
+        create_svg(data, options).write(buffer, encoding="utf-8", xml_declaration=True)
+    else:
+        image = create_image(data, options)
+        try:
+            image.save(buffer, format=fmt)
+        except KeyError:
+            raise ValueError("Unsupported format: %r" % fmt)
+
+    return buffer.getvalue()
+
+
+def serve_stdio(input: TextIO, output: TextIO):
+    """Handles requests read from `input` until end of file."""
+    for line in iter(input.readline, ""):
+        if not line.strip():
+            continue
+
+        response: Dict[str, Any] = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be an object")
+
+            if "id" in request:
+                response["id"] = request["id"]
+
+            response.update(handle_request(request))
+        except Exception as e:
+            response["error"] = str(e)
+
+        output.write(json.dumps(response) + "\n")
+        output.flush()
+
+
+class ResponseCache:
+    """Thread safe LRU cache of rendered bar codes."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            content = self.entries.get(key)
+            if content is not None:
+                self.entries.move_to_end(key)
+            return content
+
+    def put(self, key: str, content: bytes):
+        if self.max_entries < 1:
+            return
+
+        with self.lock:
+            self.entries[key] = content
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class BarcodeHTTPServer(HTTPServer):
+    """HTTP server which handles requests on a bounded pool of threads.
+
+    Args:
+        address: Host and port to listen on
+        workers: Number of threads handling requests
+        max_data_size: Maximum size of data to encode in bytes
+        cache_size: Number of rendered bar codes to keep in memory
+        quiet: Do not log requests
+        max_pending: Maximum number of requests being handled or waiting for
+                     a worker, further requests are answered with 503. Default
+                     is 4 per worker.
+        max_pixels: Maximum size of rendered images in pixels, including
+                    padding
+        timeout: Seconds a connection may stay idle before it is closed
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        workers: int = 4,
+        max_data_size: int = MAX_DATA_BYTES,
+        cache_size: int = 1024,
+        quiet: bool = False,
+        max_pending: Optional[int] = None,
+        max_pixels: int = MAX_PIXELS,
+        timeout: float = REQUEST_TIMEOUT,
+    ):
+        super().__init__(address, BarcodeRequestHandler)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = threading.BoundedSemaphore(
+            workers * 4 if max_pending is None else max_pending)
+        self.max_data_size = max_data_size
+        self.max_pixels = max_pixels
+        self.request_timeout = timeout
+        self.cache = ResponseCache(cache_size)
+        self.quiet = quiet
+
+    def process_request(self, request: Any, client_address: Any):
+        # Reject requests instead of queueing them without limit
+        if not self.pending.acquire(blocking=False):
+            self.reject_request(request)
+            return
+
+        try:
+            self.pool.submit(self.process_request_thread, request, client_address)
+        except RuntimeError:
+            # The pool is shut down
+            self.pending.release()
+            self.shutdown_request(request)
+
+    def process_request_thread(self, request: Any, client_address: Any):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.pending.release()
+
+    def reject_request(self, request: Any):
+        try:
+            request.settimeout(self.request_timeout)
+            request.sendall(SERVICE_UNAVAILABLE)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class BarcodeRequestHandler(BaseHTTPRequestHandler):
+    server: BarcodeHTTPServer
+
+    def setup(self):
+        # Close idle connections so they do not tie up a worker
+        self.timeout = self.server.request_timeout
+        super().setup()
+
+    def do_GET(self):
+        self.handle_barcode(post=False)
+
+    def do_POST(self):
+        self.handle_barcode(post=True)
+
+    def handle_barcode(self, post: bool):
+        try:
+            url = urlsplit(self.path)
+            fmt = self.parse_format(url.path)
+            params = dict(parse_qsl(url.query))
+            data = self.read_body() if post else params.pop("data", "")
+
+            if not data:
+                raise HTTPError(400, "No data given")
+
+            if len(data.encode("utf-8")) > self.server.max_data_size:
+                raise HTTPError(413, "Data too long. Maximum is %d bytes." % self.server.max_data_size)
+
+            try:
+                options = parse_options(params)
+                validate_render_options(options)
+            except ValueError as e:
+                raise HTTPError(400, str(e))
+
+            etag = '"%s"' % content_hash(fmt, data, options)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            content = self.server.cache.get(etag)
+            if content is None:
+                content = self.render(fmt, data, options)
+                self.server.cache.put(etag, content)
+
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES[fmt])
+            self.send_header("Content-Length", str(len(content)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "public, max-age=86400")
+            self.end_headers()
+            self.wfile.write(content)
+        except HTTPError as e:
+            self.send_text(e.status, str(e))
+
+    def parse_format(self, path: str) -> str:
+        for fmt in CONTENT_TYPES:
+            if path == "/barcode.%s" % fmt:
+                return fmt
+        raise HTTPError(404, "Not found")
+
+    def read_body(self) -> str:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+
+        # Reject large requests before reading them
+        if length > self.server.max_data_size:
+            raise HTTPError(413, "Data too long. Maximum is %d bytes." % self.server.max_data_size)
+
+        try:
+            return self.rfile.read(length).decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPError(400, "Data must be UTF-8 encoded")
+
+    def render(self, fmt: str, data: str, options: Dict[str, Any]) -> bytes:
+        encode_options = {k: v for k, v in options.items() if k in ENCODE_OPTIONS}
+        encode_options.pop("compact", None)
+
+        try:
+            # Count code words to reject data which does not fit without encoding it
+            plan = estimate(data, **encode_options)
+            if not plan.fits and plan.rows >= MIN_ROWS:
+                raise HTTPError(413, "Data too long to fit into a bar code with given options. "
+                                "Try increasing column count or decreasing security level.")
+
+            # SVG size does not depend on the scale, images are allocated in full
+            if fmt != "svg":
+                pixels = image_pixels(plan.columns, plan.rows, options)
+                if pixels > self.server.max_pixels:
+                    raise HTTPError(413, "Image too large: %d pixels. Maximum is %d pixels. "
+                                    "Try decreasing scale, ratio or padding."
+                                    % (pixels, self.server.max_pixels))
+
+            return generate(data, fmt, options)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+    def send_text(self, status: int, message: str):
+        body = (message + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def validate_render_options(options: Dict[str, Any]):
+    for name in ["scale", "ratio"]:
+        if name in options and options[name] < 1:
+            raise ValueError("'%s' must be at least 1. Given: %r" % (name, options[name]))
+
+    if options.get("padding", 0) < 0:
+        raise ValueError("'padding' must not be negative. Given: %r" % options["padding"])
+
+
+def image_pixels(columns: int, rows: int, options: Dict[str, Any]) -> int:
+    """Returns the number of pixels in the image rendered with given options."""
+    scale = options.get("scale", 3)
+    ratio = options.get("ratio", 3)
+    padding = options.get("padding", 20)
+
+    width, height = symbol_size(columns, rows, options.get("compact", False))
+    return (width * scale + 2 * padding) * (height * scale * ratio + 2 * padding)
+
+
+def content_hash(fmt: str, data: str, options: Dict[str, Any]) -> str:
+    payload = json.dumps([fmt, data, options], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def serve_http(
+    host: str = "127.0.0.1",
+    port: int = 8417,
+    workers: int = 4,
+    max_data_size: int = MAX_DATA_BYTES,
+    cache_size: int = 1024,
+    quiet: bool = False,
+    max_pending: Optional[int] = None,
+    max_pixels: int = MAX_PIXELS,
+    timeout: float = REQUEST_TIMEOUT,
+):
+    """Runs the HTTP server until interrupted, see `BarcodeHTTPServer`."""
+    server = BarcodeHTTPServer((host, port), workers, max_data_size, cache_size, quiet,
+                               max_pending, max_pixels, timeout)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,5 +1,5 @@
 from enum import Enum, auto
-from typing import Callable, Iterable, List, NamedTuple
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
 
 
 Codeword = int
@@ -23,6 +23,115 @@ class Chunk(NamedTuple):
     compact_fn: CompactionFn
 
 
+class Plan(NamedTuple):
+    """Size of a barcode calculated without encoding the data."""
+
+    data_words: int
+    """Number of data code words, including the control block"""
+
+    padding_words: int
+    """Number of padding code words needed to fill the last row"""
+
+    ec_words: int
+    """Number of error correction code words"""
+
+    length_descriptor: int
+    """Value of the length descriptor, must not exceed 928"""
+
+    columns: int
+    rows: int
+
+    fits: bool
+    """Whether the data fits within the bar code size limits"""
+
+    codec: str = "none"
+    """Codec the data is compressed with, "none" if it is not compressed, see
+    `compression`"""
+
+
+class MicroSize(NamedTuple):
+    """One of the fixed MicroPDF417 symbol sizes."""
+
+    columns: int
+    rows: int
+
+    ec_words: int
+    """Number of error correction code words"""
+
+    left_rap: int
+    """Row address pattern of the first row's left RAP, numbered from 1"""
+
+    center_rap: int
+    """Row address pattern of the first row's center RAP, 0 if not used"""
+
+    right_rap: int
+    """Row address pattern of the first row's right RAP, numbered from 1"""
+
+
+class BatchItem(NamedTuple):
+    """A single bar code to generate in a batch."""
+
+    index: int
+    """Position of the item in the manifest"""
+
+    data: str
+    output: str
+
+    options: Dict[str, Any]
+    """Encoding and rendering options overriding the batch defaults"""
+
+
+class BatchResult(NamedTuple):
+    """Outcome of processing a batch item."""
+
+    index: int
+    output: str
+
+    error: Optional[str]
+    """Error message if the item failed, None on success"""
+
+    duration: float
+    """Time spent processing the item, in seconds"""
+
+    digest: Optional[str] = None
+    """SHA-256 digest of the output file, None if the item failed"""
+
+    skipped: bool = False
+    """Whether the item was skipped because a matching output already exists"""
+
+
+class Compressed(NamedTuple):
+    """Data prepared for encoding by the compression stage."""
+
+    codec: str
+    """Name of the codec used to compress the data, "none" if not compressed"""
+
+    data: bytes
+
+    force_binary: bool
+    """Whether the data must be encoded using byte compaction"""
+
+
+class Decoded(NamedTuple):
+    """Contents of a decoded bar code."""
+
+    data: bytes
+
+    code_words: List[Codeword]
+    """All high level code words: the length descriptor, data, padding, control
+    block and error correction"""
+
+    control_block: Optional[List[Codeword]]
+    """Macro PDF417 control block, starting with the 928 marker, or None"""
+
+    columns: int
+    rows: int
+    security_level: int
+
+    compact: bool
+    """Whether it is a Compact PDF417 bar code"""
+
+
 class Submode(Enum):
     """Text compaction sub-modes"""
     UPPER = auto()
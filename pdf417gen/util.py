@@ -1,3 +1,4 @@
+from binascii import crc_hqx
 from builtins import bytes, str, zip
 from itertools import tee, islice, chain
 from typing import Any, Generator, Iterable, Iterator, List, Optional, Tuple, TypeVar
@@ -51,3 +52,35 @@ def iterate_prev_next(iterable: Iterable[T]) -> Iterator[Tuple[Optional[T], T, O
     prevs = chain([None], prevs)
     nexts = chain(islice(nexts, 1, None), [None])
     return zip(prevs, items, nexts)
+
+
+CRC16_INITIAL_VALUE = 0xFFFF
+
+
+def crc16(data: bytes, crc: int = CRC16_INITIAL_VALUE) -> int:
+    """
+    Computes the CRC-16 CCITT checksum (polynomial x^16 + x^12 + x^5 + 1) used
+    by Macro PDF417.
+
+    Can be computed incrementally by passing the previous result as `crc`.
+    Delegates to `binascii.crc_hqx` which implements the same CRC using a
+    precomputed 256-entry table.
+    """
+    return crc_hqx(data, crc)
+
+
+# Supported values of the `backend` option of `encode` and `render_image`
+BACKENDS = ["python", "numpy"]
+
+
+def use_numpy(backend: str) -> bool:
+    """Whether to use the NumPy backend. Falls back to pure Python when NumPy
+    is not installed, which is only imported if requested."""
+    if backend not in BACKENDS:
+        raise ValueError("'backend' must be one of %s. Given: %r" % (", ".join(BACKENDS), backend))
+
+    if backend == "python":
+        return False
+
+    from pdf417gen import vectorized
+    return vectorized.available()
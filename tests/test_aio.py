@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pytest
+
+from pdf417gen import encode, render_image, render_svg
+from pdf417gen.aio import encode_async, encode_many_async, render_async
+
+TEXT = "Hello, World!"
+
+
+def test_encode_async():
+    codes = asyncio.run(encode_async(TEXT, columns=3, security_level=4))
+    assert codes == encode(TEXT, columns=3, security_level=4)
+
+
+def test_render_async():
+    async def run():
+        codes = await encode_async(TEXT)
+        image = await render_async(codes, scale=2)
+        svg = await render_async(codes, renderer=render_svg, scale=2)
+        return codes, image, svg
+
+    codes, image, svg = asyncio.run(run())
+    assert image.tobytes() == render_image(codes, scale=2).tobytes()
+    assert svg.getroot().tag == "svg"
+
+
+def test_encode_async_semaphore():
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def slow_encode(data):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        threading.Event().wait(0.01)
+        with lock:
+            running -= 1
+        return data
+
+    async def run():
+        semaphore = asyncio.Semaphore(2)
+        with ThreadPoolExecutor(8) as executor:
+            calls = [render_async(i, renderer=slow_encode, executor=executor, semaphore=semaphore)
+                     for i in range(8)]
+            return await asyncio.gather(*calls)
+
+    assert asyncio.run(run()) == list(range(8))
+    assert max_running == 2
+
+
+def test_encode_many_async():
+    items = ["%s %d" % (TEXT, i) for i in range(10)]
+
+    codes = asyncio.run(encode_many_async(items, concurrency=3, columns=4))
+    assert codes == [encode(item, columns=4) for item in items]
+
+    renderer = partial(render_image, scale=1)
+    images = asyncio.run(encode_many_async(iter(items), renderer=renderer, columns=4))
+    assert [image.size for image in images] == [render_image(c, scale=1).size for c in codes]
+
+
+def test_encode_many_async_error():
+    items = [TEXT, "x" * 5000, TEXT]
+
+    with pytest.raises(ValueError, match="Data too long"):
+        asyncio.run(encode_many_async(items))
+
+    with pytest.raises(ValueError, match="'concurrency' must be at least 1"):
+        asyncio.run(encode_many_async(items, concurrency=0))
+
+
+def test_encode_many_async_cancel():
+    consumed = []
+
+    def items():
+        for i in range(1000):
+            consumed.append(i)
+            yield "%s %d" % (TEXT, i)
+
+    async def run():
+        task = asyncio.ensure_future(encode_many_async(items(), concurrency=2))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    # Items are taken lazily, so cancelling stops consuming the iterable
+    assert len(consumed) < 1000
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+from pdf417gen.batch import parse_csv_manifest, parse_jsonl_manifest, parse_shard, read_manifest
+from pdf417gen.batch import run_batch, shard_items
+from pdf417gen.types import BatchItem
+
+
+def test_parse_jsonl_manifest():
+    lines = [
+        '{"data": "foo", "output": "foo.png"}\n',
+        '\n',
+        '{"data": "bar", "output": "bar.svg", "columns": 3, "compact": true}\n',
+    ]
+
+    assert list(parse_jsonl_manifest(lines)) == [
+        BatchItem(0, "foo", "foo.png", {}),
+        BatchItem(1, "bar", "bar.svg", {"columns": 3, "compact": True}),
+    ]
+
+
+def test_parse_csv_manifest():
+    lines = [
+        "data,output,columns,compact\n",
+        "foo,foo.png,,\n",
+        "bar,bar.svg,3,yes\n",
+    ]
+
+    assert list(parse_csv_manifest(lines)) == [
+        BatchItem(0, "foo", "foo.png", {}),
+        BatchItem(1, "bar", "bar.svg", {"columns": 3, "compact": True}),
+    ]
+
+
+def test_parse_manifest_errors():
+    with pytest.raises(ValueError, match="Invalid JSON on line 1"):
+        list(parse_jsonl_manifest(["foo\n"]))
+
+    with pytest.raises(ValueError, match="Item 0: 'output' is required"):
+        list(parse_jsonl_manifest(['{"data": "foo"}']))
+
+    with pytest.raises(ValueError, match="Item 0: unknown option 'foo'"):
+        list(parse_jsonl_manifest(['{"data": "foo", "output": "foo.png", "foo": 1}']))
+
+    with pytest.raises(ValueError, match="Item 0: invalid value for 'columns': 'x'"):
+        list(parse_csv_manifest(["data,output,columns\n", "foo,foo.png,x\n"]))
+
+    with pytest.raises(ValueError, match="Item 0: invalid value for 'columns': True"):
+        list(parse_jsonl_manifest(['{"data": "foo", "output": "foo.png", "columns": true}']))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_batch(tmp_path, jobs):
+    manifest = tmp_path / "manifest.jsonl"
+    with open(manifest, "w") as f:
+        for i in range(5):
+            f.write(json.dumps({"data": "item %d" % i, "output": str(tmp_path / ("%d.png" % i))}) + "\n")
+        f.write(json.dumps({"data": "foo", "output": str(tmp_path / "foo.svg"), "columns": 2}) + "\n")
+        f.write(json.dumps({"data": "foo", "output": str(tmp_path / "bad.png"), "columns": 40}) + "\n")
+
+    items = read_manifest(str(manifest))
+    results = list(run_batch(items, jobs=jobs, defaults={"columns": 3}))
+
+    assert [r.index for r in results] == list(range(7))
+    assert [r.error for r in results[:6]] == [None] * 6
+    assert "'columns' must be between 1 and 30" in results[6].error
+
+    for i in range(5):
+        assert (tmp_path / ("%d.png" % i)).exists()
+    assert (tmp_path / "foo.svg").read_text().startswith("<svg")
+    assert not (tmp_path / "bad.png").exists()
+
+
+def test_shard_items():
+    items = [BatchItem(i, "foo", "%d.png" % i, {}) for i in range(10)]
+    shards = [shard_items(items, shard, 3) for shard in range(3)]
+
+    assert [item.index for item in shards[0]] == [0, 3, 6, 9]
+    assert [item.index for item in shards[1]] == [1, 4, 7]
+    assert sorted(item.index for shard in shards for item in shard) == list(range(10))
+
+
+def test_parse_shard():
+    assert parse_shard("0/4") == (0, 4)
+    assert parse_shard("3/4") == (3, 4)
+
+    with pytest.raises(ValueError, match="i must be between 0 and n - 1"):
+        parse_shard("4/4")
+
+    with pytest.raises(ValueError, match="expected i/n"):
+        parse_shard("foo")
+
+
+def test_run_batch_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "batch.checkpoint")
+    items = [BatchItem(i, "item %d" % i, str(tmp_path / ("%d.png" % i)), {}) for i in range(4)]
+
+    results = list(run_batch(items, checkpoint=checkpoint))
+    assert [r.skipped for r in results] == [False] * 4
+
+    results = list(run_batch(items, checkpoint=checkpoint))
+    assert [r.skipped for r in results] == [True] * 4
+
+    # Missing or modified outputs are generated again
+    (tmp_path / "1.png").unlink()
+    (tmp_path / "2.png").write_bytes(b"foo")
+    results = list(run_batch(items, checkpoint=checkpoint))
+    assert [r.skipped for r in results] == [True, False, False, True]
+    assert [r.index for r in results] == [0, 1, 2, 3]
+
+    # Changed options invalidate the checkpoint
+    results = list(run_batch(items, defaults={"columns": 3}, checkpoint=checkpoint))
+    assert [r.skipped for r in results] == [False] * 4
+
+
+def test_run_batch_checkpoint_incomplete_line(tmp_path):
+    checkpoint = tmp_path / "batch.checkpoint"
+    items = [BatchItem(0, "Hello, World!", str(tmp_path / "0.png"), {})]
+
+    list(run_batch(items, checkpoint=str(checkpoint)))
+    with open(checkpoint, "a") as f:
+        f.write('{"key": "abc", "dig')
+
+    results = list(run_batch(items, checkpoint=str(checkpoint)))
+    assert results[0].skipped
@@ -0,0 +1,156 @@
+import pytest
+
+from benchmarks import corpus, memory, runner, suite, threads
+from benchmarks.runner import Benchmark, Settings
+
+SETTINGS = Settings(warmup=0, samples=3, sample_time=0.001)
+
+
+def results(**medians):
+    return {
+        "version": runner.RESULTS_VERSION,
+        "kind": "timing",
+        "benchmarks": {name: {"median": median} for name, median in medians.items()},
+    }
+
+
+def test_measure():
+    calls = []
+    result = runner.measure(lambda: calls.append(1), SETTINGS)
+
+    assert result["samples"] == 3
+    assert result["loops"] >= 1
+    assert result["min"] <= result["median"] <= result["max"]
+    assert len(calls) > 3 * result["loops"]
+
+
+def test_run():
+    benchmark = Benchmark("encode/text/10B", lambda: suite.setup_encode("text", 10))
+    data = runner.run([benchmark], SETTINGS)
+
+    assert data["version"] == runner.RESULTS_VERSION
+    assert list(data["benchmarks"]) == ["encode/text/10B"]
+    assert data["benchmarks"]["encode/text/10B"]["median"] > 0
+
+
+def test_select():
+    benchmarks = list(suite.benchmarks())
+    names = [b.name for b in runner.select(benchmarks, ["encode/*/10B", "render_svg/*"])]
+
+    assert names == [
+        "encode/text/10B",
+        "encode/numeric/10B",
+        "encode/byte/10B",
+        "render_svg/scale-1",
+        "render_svg/scale-3",
+    ]
+    assert runner.select(benchmarks, []) == benchmarks
+
+
+def test_payload():
+    assert len(suite.payload("text", 100)) == 100
+    assert suite.payload("numeric", 20).isdigit()
+    assert suite.payload("byte", 100) == suite.payload("byte", 100)
+
+
+def test_compare():
+    baseline = results(a=1.0, b=1.0, c=1.0, d=1.0)
+    current = results(a=1.05, b=1.2, c=0.5, e=1.0)
+
+    comparisons = {c.name: c for c in runner.compare(baseline, current, threshold=10)}
+
+    assert comparisons["a"].change == pytest.approx(5.0)
+    assert not comparisons["a"].regressed
+    assert comparisons["b"].regressed
+    assert comparisons["c"].change == pytest.approx(-50.0)
+    assert not comparisons["c"].regressed
+    assert comparisons["d"].current is None
+    assert not comparisons["d"].regressed
+    assert comparisons["e"].baseline is None
+    assert not comparisons["e"].regressed
+
+
+def test_compare_different_kinds():
+    density = dict(results(a=1), kind="density")
+
+    with pytest.raises(ValueError):
+        runner.compare(results(a=1), density)
+
+
+def test_measure_density():
+    item = corpus.CorpusItem("numeric", b"1234567890123456789012345678901234567890")
+    result = corpus.measure_density(item, columns=2, security_level=0)
+
+    # Numeric latch and 14 numeric code words, with length descriptor and 2 EC
+    # words fits into 9 rows
+    assert result["code_words"] == 15
+    assert result["numeric"] == 15
+    assert result["text"] == 0
+    assert result["rows"] == 9
+    assert result["area"] == (2 * 17 + 69) * 9 * 3
+    assert result["fits"]
+
+
+def test_measure_corpus():
+    data = corpus.measure_corpus(corpus.CORPUS)
+
+    assert data["kind"] == "density"
+    assert list(data["benchmarks"]) == [item.name for item in corpus.CORPUS]
+
+    comparisons = runner.compare(data, data, threshold=0, metric="code_words")
+    assert not any(c.regressed for c in comparisons)
+
+
+def test_compare_min_difference():
+    baseline = results(a=1000, b=1000, c=0, d=0)
+    current = results(a=1500, b=3000, c=0, d=100)
+
+    comparisons = {c.name: c for c in runner.compare(baseline, current, 10, min_difference=1000)}
+
+    assert not comparisons["a"].regressed
+    assert comparisons["b"].regressed
+    assert comparisons["c"].change == 0
+    assert not comparisons["c"].regressed
+    assert comparisons["d"].change == float("inf")
+    assert not comparisons["d"].regressed
+
+
+def test_measure_traced():
+    result = memory.measure_traced(lambda: bytearray(100000))
+
+    assert result["peak_traced"] >= 100000
+    assert result["retained"] < 1000
+
+
+def test_memory_run():
+    benchmarks = [b for b in memory.benchmarks() if b.name == "encode/text/10B"]
+    data = memory.run(benchmarks)
+
+    assert data["kind"] == "memory"
+    result = data["benchmarks"]["encode/text/10B"]
+    assert result["peak_traced"] > 0
+    assert result["input_size"] == 10
+
+    if memory.max_rss() is not None:
+        assert result["peak_rss"] > 0
+        assert result["rss_increase"] >= 0
+
+
+def test_measure_scaling():
+    calls = []
+    result = threads.measure_scaling(lambda: calls.append(1), [1, 2], call_time=0.001)
+
+    assert result["calls"] >= 2
+    assert set(result["threads"]) == {"1", "2"}
+    assert result["threads"]["1"]["speedup"] == 1
+    assert result["threads"]["2"]["efficiency"] == pytest.approx(
+        result["threads"]["2"]["speedup"] / 2)
+
+
+def test_threads_run():
+    benchmarks = runner.select(threads.benchmarks(), ["encode/text/1KB"])
+    data = threads.run(benchmarks, [1, 2], call_time=0.001)
+
+    assert data["kind"] == "threads"
+    assert data["thread_counts"] == [1, 2]
+    assert data["benchmarks"]["encode/text/1KB"]["threads"]["2"]["calls_per_second"] > 0
@@ -0,0 +1,93 @@
+from xml.etree.ElementTree import tostring
+
+import pytest
+
+from pdf417gen import encode, encode_macro, render_image, render_svg
+from pdf417gen.cache import Cache, MemoryStore, cache_key
+
+TEXT = "Hello, World!"
+
+
+def test_cache_key():
+    assert cache_key("encode", TEXT, columns=3) == cache_key("encode", TEXT, columns=3)
+    assert cache_key("encode", TEXT, columns=3) != cache_key("encode", TEXT, columns=4)
+    assert cache_key("encode", TEXT) != cache_key("encode", TEXT.encode())
+    assert cache_key("encode", TEXT) != cache_key("svg", TEXT)
+
+
+def test_memory_store_eviction():
+    store = MemoryStore(max_size=10)
+    store.put("a", b"1234")
+    store.put("b", b"1234")
+
+    # Using "a" makes "b" the least recently used
+    assert store.get("a") == b"1234"
+    store.put("c", b"1234")
+
+    assert store.get("b") is None
+    assert store.get("a") == b"1234"
+    assert store.get("c") == b"1234"
+    assert store.size == 8
+
+    # Replacing a value updates the size
+    store.put("a", b"12")
+    assert store.size == 6
+
+    # Values larger than the store are not stored
+    store.put("d", b"x" * 11)
+    assert store.get("d") is None
+    assert store.size == 6
+
+
+def test_cache_encode():
+    cache = Cache()
+
+    assert cache.encode(TEXT, columns=3) == encode(TEXT, columns=3)
+    assert cache.encode(TEXT, columns=3) == encode(TEXT, columns=3)
+    assert cache.encode(TEXT, columns=4) == encode(TEXT, columns=4)
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_cache_render():
+    cache = Cache()
+    codes = encode(TEXT)
+
+    expected = render_image(codes, scale=2).tobytes()
+    assert cache.render_image(codes, scale=2).tobytes() == expected
+    assert cache.render_image(codes, scale=2).tobytes() == expected
+
+    expected_svg = tostring(render_svg(codes).getroot())
+    assert tostring(cache.render_svg(codes).getroot()) == expected_svg
+    assert tostring(cache.render_svg(codes).getroot()) == expected_svg
+
+    assert cache.hits == 2
+    assert cache.misses == 2
+
+
+def test_cache_disk(tmp_path):
+    cache = Cache(directory=str(tmp_path))
+    codes = cache.encode(TEXT)
+
+    # A new cache, e.g. in another process, finds the value on disk
+    cache = Cache(directory=str(tmp_path))
+    assert cache.encode(TEXT) == codes
+    assert cache.hits == 1
+    assert cache.misses == 0
+
+    # And keeps it in memory
+    assert len(cache.memory.entries) == 1
+
+
+def test_cache_encode_macro():
+    cache = Cache()
+    data = TEXT * 100
+
+    barcodes = cache.encode_macro(data, segment_size=200)
+    assert barcodes == encode_macro(data, segment_size=200, content_file_id=True)
+    assert cache.encode_macro(data, segment_size=200, workers=2) == barcodes
+    assert cache.hits == 1
+
+    with pytest.raises(ValueError, match="'renderer' is not supported"):
+        cache.encode_macro(data, renderer=render_image)
@@ -0,0 +1,47 @@
+import pytest
+
+from pdf417gen.codes import CODES, PACKED_CODES, TABLE_SIZE, map_code_word
+from pdf417gen.data import CHARACTERS_LOOKUP, NO_VALUE, PACKED_CHARACTER_VALUES
+from pdf417gen.data import PACKED_PREFERRED_SUBMODES, PACKED_SWITCH_CODES, SWITCH_CODES
+from pdf417gen.data import TEXT_SUBMODES
+
+
+def test_code_tables():
+    assert len(PACKED_CODES) == 3 * TABLE_SIZE * 4
+    assert len(CODES) == 3
+
+    for table in CODES:
+        assert len(table) == TABLE_SIZE
+        assert len(set(table)) == TABLE_SIZE
+        # Each code word is 17 modules wide, starting with a bar and ending with a space
+        assert all(0x10000 <= code < 0x20000 and code & 1 == 0 for code in table)
+
+    assert CODES[0][0] == 0x1d5c0
+    assert CODES[1][0] == 0x1f560
+    assert CODES[2][928] == 0x1c7ea
+    assert map_code_word(2, 928) == 0x1c7ea
+
+
+def test_code_tables_are_read_only():
+    with pytest.raises(TypeError):
+        CODES[0][0] = 0
+
+
+def test_packed_text_tables():
+    for char in range(256):
+        values = CHARACTERS_LOOKUP.get(char, {})
+        for index, submode in enumerate(TEXT_SUBMODES):
+            expected = values.get(submode, NO_VALUE)
+            assert PACKED_CHARACTER_VALUES[index * 256 + char] == expected
+
+        if values:
+            assert TEXT_SUBMODES[PACKED_PREFERRED_SUBMODES[char]] in values
+        else:
+            assert PACKED_PREFERRED_SUBMODES[char] == NO_VALUE
+
+    count = len(TEXT_SUBMODES)
+    for source, targets in SWITCH_CODES.items():
+        for target, codes in targets.items():
+            index = TEXT_SUBMODES.index(source) * count + TEXT_SUBMODES.index(target)
+            packed = PACKED_SWITCH_CODES[index * 2:index * 2 + 2]
+            assert [code for code in packed if code != NO_VALUE] == codes
@@ -1,6 +1,6 @@
 import pytest
 
-from pdf417gen.compaction import compact, compact_bytes, compact_numbers, compact_text
+from pdf417gen.compaction import compact, compact_bytes, compact_numbers, compact_text, count
 from pdf417gen.compaction import optimizations, _split_to_chunks, Chunk
 from pdf417gen.compaction.text import compact_text_interim
 from pdf417gen.encoding import to_bytes
@@ -217,3 +217,17 @@ def test_optimizations(data, expected):
     actual = optimizations.merge_chunks_with_same_compact_fn(actual)
 
     assert list(actual) == expected
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"alcoolique",
+    b"Ff#!fF!f!#",
+    b"1234567890123",
+    b"1" * 100,
+    b"ABC123def\n\t456789012345678\x00\xffxyz",
+    bytes(range(256)),
+])
+@pytest.mark.parametrize("force_binary", [False, True])
+def test_count(data, force_binary):
+    assert count(data, force_binary) == len(list(compact(data, force_binary)))
@@ -0,0 +1,117 @@
+import bz2
+import lzma
+import zlib
+
+import pytest
+
+from pdf417gen import auto_layout, encode, encode_macro, estimate
+from pdf417gen.compaction import count
+from pdf417gen.compression import CODECS, apply_compression, candidates, compress
+from pdf417gen.types import Compressed
+
+# Compresses well, and is much shorter compressed than text compacted
+REPETITIVE = b"Beautiful is better than ugly. Explicit is better than implicit.\n" * 20
+
+# Too short to benefit from compression
+SHORT = b"M1DESMARAIS/LUC       EABC123 YULFRAAC 0834 326J001A0025 100"
+
+
+@pytest.mark.parametrize("codec, decompress", [
+    ("zlib", zlib.decompress),
+    ("bz2", bz2.decompress),
+    ("lzma", lzma.decompress),
+])
+def test_compress(codec, decompress):
+    assert decompress(compress(REPETITIVE, codec)) == REPETITIVE
+
+
+def test_compress_unknown_codec():
+    with pytest.raises(ValueError, match="Unknown codec: 'gzip'"):
+        compress(REPETITIVE, "gzip")
+
+
+def test_candidates():
+    assert candidates(SHORT, "none", False) == [Compressed("none", SHORT, False)]
+    assert candidates(SHORT, "zlib", False) == [Compressed("zlib", compress(SHORT, "zlib"), True)]
+
+    auto = candidates(SHORT, "auto", False)
+    assert [candidate.codec for candidate in auto] == ["none"] + CODECS
+    assert [candidate.force_binary for candidate in auto] == [False, True, True, True]
+
+    with pytest.raises(ValueError, match="'compression' must be one of none, auto, zlib"):
+        candidates(SHORT, "gzip", False)
+
+
+def test_candidates_skips_codecs_which_can_not_win():
+    # Compacts into fewer code words than the headers of bz2 and lzma take
+    auto = candidates(b"HELLO WORLD", "auto", False)
+    assert [candidate.codec for candidate in auto] == ["none", "zlib"]
+
+    assert [candidate.codec for candidate in candidates(b"A", "auto", False)] == ["none"]
+
+
+def test_apply_compression():
+    assert apply_compression(SHORT, "auto", False) == Compressed("none", SHORT, False)
+
+    chosen = apply_compression(REPETITIVE, "auto", False)
+    assert chosen.codec != "none"
+    assert chosen.force_binary
+    assert count(chosen.data, True) == min(
+        count(candidate.data, candidate.force_binary)
+        for candidate in candidates(REPETITIVE, "auto", False))
+
+    # Explicitly chosen codecs are used even when they do not help
+    assert apply_compression(SHORT, "lzma", False).codec == "lzma"
+
+
+def test_apply_compression_cost():
+    chosen = apply_compression(REPETITIVE, "auto", False, cost=lambda c: len(c.data))
+    assert len(chosen.data) == min(len(compress(REPETITIVE, codec)) for codec in CODECS)
+
+
+def test_encode():
+    expected = encode(zlib.compress(REPETITIVE, 9), columns=10, force_binary=True)
+    assert encode(REPETITIVE, columns=10, compression="zlib") == expected
+
+    assert encode(SHORT, compression="auto") == encode(SHORT)
+    assert len(encode(REPETITIVE, columns=10, compression="auto")) < len(
+        encode(REPETITIVE, columns=10))
+
+
+def test_estimate_and_auto_layout():
+    raw = estimate(REPETITIVE, columns=10)
+    compressed = estimate(REPETITIVE, columns=10, compression="auto")
+
+    assert compressed.data_words < raw.data_words
+    assert compressed.rows == len(encode(REPETITIVE, columns=10, compression="auto"))
+
+    plan = auto_layout(REPETITIVE, compression="auto")
+    codes = encode(REPETITIVE, columns=plan.columns, force_rows=plan.rows, compression="auto")
+    assert len(codes) == plan.rows
+
+
+def test_plan_codec():
+    assert estimate(REPETITIVE, columns=10).codec == "none"
+    assert estimate(SHORT, columns=10, compression="auto").codec == "none"
+    assert estimate(SHORT, columns=10, compression="bz2").codec == "bz2"
+
+    plan = estimate(REPETITIVE, columns=10, compression="auto")
+    assert plan.codec == apply_compression(REPETITIVE, "auto", False).codec
+    assert plan.codec in CODECS
+    assert auto_layout(REPETITIVE, compression="auto").codec == plan.codec
+
+    # Encoding with the chosen codec gives the same bar code as "auto"
+    assert encode(REPETITIVE, columns=10, compression=plan.codec) == encode(
+        REPETITIVE, columns=10, compression="auto")
+
+
+@pytest.mark.parametrize("segment_mode", ["bytes", "capacity"])
+def test_encode_macro(segment_mode):
+    data = REPETITIVE * 10
+    options = dict(columns=10, segment_mode=segment_mode, file_id=[1])
+
+    raw = encode_macro(data, **options)
+    compressed = encode_macro(data, compression="auto", **options)
+
+    assert len(compressed) < len(raw)
+    assert compressed == encode_macro(data, compression="zlib", **options)
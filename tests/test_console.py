@@ -1,3 +1,8 @@
+import json
+import os
+
+import pytest
+
 from mock import patch
 from pdf417gen import console
 
@@ -29,6 +34,8 @@ def test_encode(render_image, encode, capsys):
         encoding='utf-8',
         security_level=2,
         force_binary=False,
+        compact=False,
+        compression='none',
     )
 
     render_image.assert_called_once_with(
@@ -41,6 +48,16 @@ def test_encode(render_image, encode, capsys):
     )
 
 
+@patch('pdf417gen.console.encode', return_value="RETVAL")
+@patch('pdf417gen.console.render_image')
+def test_encode_compression(render_image, encode):
+    console.do_encode(["--compression", "auto", "foo"])
+    assert encode.call_args.kwargs["compression"] == "auto"
+
+    console.do_encode(["--compress", "foo"])
+    assert encode.call_args.kwargs["compression"] == "zlib"
+
+
 @patch('sys.stdin.read', return_value="")
 @patch('pdf417gen.console.encode', return_value="RETVAL")
 @patch('pdf417gen.console.render_image')
@@ -67,10 +84,133 @@ def test_encode_exception(render_image, encode, capsys):
         columns=6,
         encoding='utf-8',
         security_level=2,
-        force_binary=False
+        force_binary=False,
+        compact=False,
+        compression='none',
     )
     render_image.assert_not_called()
 
     out, err = capsys.readouterr()
     assert not out
     assert "FAILED" in err
+
+
+def test_batch(tmp_path, capsys):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(
+        "data,output,columns\n"
+        "foo,%s,\n"
+        "bar,%s,40\n" % (tmp_path / "foo.png", tmp_path / "bar.png"))
+
+    console.do_batch([str(manifest), "--columns", "2"])
+
+    out, err = capsys.readouterr()
+    assert "Processed 2 items (1 failed)" in out
+    assert "Item 1" in err
+
+    log = (tmp_path / "manifest.log").read_text().splitlines()
+    assert '"status": "ok"' in log[0]
+    assert '"status": "error"' in log[1]
+    assert (tmp_path / "foo.png").exists()
+
+
+def test_batch_resume(tmp_path, capsys):
+    manifest = tmp_path / "manifest.csv"
+    foo, bar = tmp_path / "foo.png", tmp_path / "bar.png"
+
+    # Interrupted after the first item
+    manifest.write_text("data,output\nfoo,%s\n" % foo)
+    console.do_batch([str(manifest), "--columns", "2"])
+
+    manifest.write_text("data,output\nfoo,%s\nbar,%s\n" % (foo, bar))
+    console.do_batch([str(manifest), "--columns", "2"])
+
+    out, _ = capsys.readouterr()
+    assert "Skipped 1 items completed by a previous run" in out
+
+    log = [json.loads(line) for line in (tmp_path / "manifest.log").read_text().splitlines()]
+    assert [(entry["output"], entry["status"]) for entry in log] == [
+        (str(foo), "ok"),
+        (str(foo), "skipped"),
+        (str(bar), "ok"),
+    ]
+
+    # Without resuming, the log is started over
+    console.do_batch([str(manifest), "--columns", "2", "--no-resume"])
+    log = (tmp_path / "manifest.log").read_text().splitlines()
+    assert len(log) == 2
+
+
+def test_encode_stats(tmp_path, capsys):
+    output = str(tmp_path / "code.png")
+    console.do_encode(["Hello, 12345678901234567890", "-o", output, "--stats"])
+
+    out, err = capsys.readouterr()
+    assert not err
+    assert "Bar codes:           1" in out
+    assert "Numeric:" in out
+    assert "Padding:" in out
+    assert "Rendering:" in out
+    assert "Total:" in out
+
+
+def test_encode_stats_macro(tmp_path, capsys):
+    output = str(tmp_path / "code.png")
+    console.do_encode(["x" * 500, "-o", output, "--macro", "--segment-size", "100", "--stats"])
+
+    out, err = capsys.readouterr()
+    assert not err
+    assert "Bar codes:           5" in out
+    assert "Payload:             500 bytes" in out
+
+
+def test_encode_profile(tmp_path, capsys):
+    output = str(tmp_path / "code.png")
+    console.do_encode(["foo", "-o", output, "-c", "1", "--profile"])
+
+    out, err = capsys.readouterr()
+    assert not err
+    assert "function calls" in out
+    assert "encode_data" in out
+
+
+@patch('pdf417gen.console.encode', return_value=[[1]])
+@patch('pdf417gen.console.render_image')
+def test_encode_profile_before_text(render_image, encode, capsys):
+    # The flag takes no value, so the text is not taken as a sort key
+    console.do_encode(["--profile", "foo"])
+
+    assert encode.call_args.args == ("foo",)
+    out, err = capsys.readouterr()
+    assert not err
+    assert "function calls" in out
+
+
+@patch('pdf417gen.console.encode')
+def test_encode_profile_invalid_sort(encode, capsys):
+    with pytest.raises(SystemExit):
+        console.do_encode(["foo", "--profile", "--profile-sort", "foo"])
+
+    encode.assert_not_called()
+    out, err = capsys.readouterr()
+    assert "argument --profile-sort: invalid choice: 'foo'" in err
+
+
+def test_encode_profile_sort(tmp_path, capsys):
+    output = str(tmp_path / "code.png")
+    console.do_encode(["foo", "-o", output, "-c", "1", "--profile", "--profile-sort", "tottime"])
+
+    out, err = capsys.readouterr()
+    assert not err
+    assert "Ordered by: internal time" in out
+
+
+def test_encode_profile_file(tmp_path, capsys):
+    output = str(tmp_path / "code.png")
+    profile = str(tmp_path / "encode.prof")
+    console.do_encode(["foo", "-o", output, "--macro", "--profile-output", profile])
+
+    out, err = capsys.readouterr()
+    assert not err
+    assert "Profile written to %s" % profile in out
+    assert os.path.getsize(profile) > 0
@@ -0,0 +1,154 @@
+import random
+
+import pytest
+
+from pdf417gen import decode, decode_image, encode, encode_macro, render_image
+from pdf417gen.codes import CODES
+from pdf417gen.decoding import decompact
+from pdf417gen.encoding import MACRO_MARKER
+
+rnd = random.Random(417)
+
+TEXT = b"Beautiful is better than ugly. Explicit is better than implicit."
+NUMERIC = b"0012345678901234567890123456789012345678901234567890"
+BINARY = bytes(rnd.getrandbits(8) for _ in range(500))
+MIXED = b"Invoice 2024-0042, total 1234567890123.45 EUR\n" + bytes(range(256))
+
+
+@pytest.mark.parametrize("data", [b"", b"A", TEXT, NUMERIC, BINARY, MIXED, BINARY[:6]])
+@pytest.mark.parametrize("columns, security_level, compact", [
+    (6, 2, False),
+    (1, 0, False),
+    (12, 5, True),
+    (30, 8, False),
+])
+def test_roundtrip(data, columns, security_level, compact):
+    try:
+        codes = encode(data, columns=columns, security_level=security_level, compact=compact)
+    except ValueError:
+        pytest.skip("Data does not fit")
+
+    decoded = decode(codes)
+    assert decoded.data == data
+    assert decoded.columns == columns
+    assert decoded.rows == len(codes)
+    assert decoded.security_level == security_level
+    assert decoded.compact == compact
+    assert decoded.control_block is None
+
+
+def test_roundtrip_random():
+    for _ in range(100):
+        length = rnd.randint(1, 60)
+        data = bytes(rnd.choice(b"abcXYZ 0123456789.,\n\x00\xff") for _ in range(length))
+        assert decode(encode(data, columns=rnd.randint(2, 4))).data == data
+
+
+def test_roundtrip_force_binary():
+    assert decode(encode(TEXT, force_binary=True)).data == TEXT
+
+
+def test_roundtrip_compressed():
+    import zlib
+
+    data = TEXT * 20
+    decoded = decode(encode(data, compression="zlib"))
+    assert zlib.decompress(decoded.data) == data
+
+
+def test_decode_macro():
+    data = TEXT * 20
+    segments = encode_macro(data, columns=10, file_id=[1, 2, 3])
+    assert len(segments) > 1
+
+    decoded = [decode(segment) for segment in segments]
+    assert b"".join(segment.data for segment in decoded) == data
+
+    for segment in decoded:
+        assert segment.control_block[0] == MACRO_MARKER
+
+
+def test_decompact_text_shifts():
+    values = [
+        0,       # A
+        27, 1,   # latch to lower, b
+        27, 2,   # shift to upper, C
+        29, 10,  # shift to punctuation, !
+        3,       # d
+        28, 1,   # latch to mixed, 1
+        25, 18,  # latch to punctuation, $
+        29, 4,   # latch to upper, E
+        29,      # padding
+    ]
+    code_words = [high * 30 + low for high, low in zip(values[::2], values[1::2])]
+    assert decompact(code_words) == b"AbC!d1$E"
+
+
+def test_decompact_unsupported():
+    with pytest.raises(ValueError, match="Unsupported code word: 913"):
+        decompact([1, 913, 65])
+
+
+def test_decode_damaged():
+    codes = encode(TEXT, columns=6)
+
+    # Replace a data code word with a valid one from the same cluster
+    index = list(CODES[1]).index(codes[1][3])
+    codes[1][3] = CODES[1][(index + 1) % 929]
+
+    with pytest.raises(ValueError, match="Error correction code words do not match the data"):
+        decode(codes)
+
+
+def test_decode_wrong_cluster():
+    codes = encode(TEXT, columns=6)
+    codes[1][3] = CODES[0][10]
+
+    with pytest.raises(ValueError, match="Invalid code word 0x[0-9a-f]+ in row 1"):
+        decode(codes)
+
+
+def test_decode_invalid():
+    codes = encode(TEXT, columns=6)
+
+    with pytest.raises(ValueError, match="Bar code has no rows"):
+        decode([])
+
+    with pytest.raises(ValueError, match="Row 0 does not start or end with the expected pattern"):
+        decode([row[1:] for row in codes])
+
+    with pytest.raises(ValueError, match="Row indicators give"):
+        decode(codes[:-3])
+
+    with pytest.raises(ValueError, match="Row 2 does not have 6 columns"):
+        decode(codes[:2] + [codes[2][:3] + codes[2][4:]] + codes[3:])
+
+    # Rows in a different order have the wrong row indicators
+    with pytest.raises(ValueError, match="Invalid left row indicator in row 0"):
+        decode(codes[3:6] + codes[:3] + codes[6:])
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"scale": 1, "ratio": 1, "padding": 0},
+    {"scale": 4, "ratio": 2, "padding": 7},
+    {"fg_color": "navy", "bg_color": "#ffd700"},
+    {"fg_color": "#404040", "bg_color": "#c0c0c0"},
+])
+def test_decode_image(options):
+    codes = encode(MIXED, columns=8, security_level=3)
+    decoded = decode_image(render_image(codes, **options))
+    assert decoded.data == MIXED
+    assert decoded.columns == 8
+
+
+def test_decode_image_compact():
+    codes = encode(TEXT, columns=5, compact=True)
+    assert decode_image(render_image(codes, scale=2)).data == TEXT
+
+
+def test_decode_image_blank():
+    from PIL import Image
+
+    with pytest.raises(ValueError, match="Image does not contain a bar code"):
+        decode_image(Image.new("RGB", (100, 50), "white"))
@@ -1,7 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 
 from pdf417gen.compaction import TEXT_LATCH, NUMERIC_LATCH
-from pdf417gen.encoding import encode, encode_high, to_bytes, encode_macro
+from pdf417gen.encoding import encode, encode_high, to_bytes, encode_macro, estimate
+from pdf417gen.encoding import get_data_capacity, split_to_segments
+from pdf417gen.encoding import compile_macro_control_block, create_macro_control_block
+from pdf417gen.encoding import create_segment_control_block
+from pdf417gen.encoding import MACRO_FILE_NAME, MACRO_FILE_SIZE, MACRO_MARKER
+from pdf417gen.encoding import MACRO_SEGMENT_COUNT, MACRO_TERMINATOR
+from pdf417gen.encoding import COMPACT_STOP_CHARACTER
+from pdf417gen.decoding import decode
+from pdf417gen.util import crc16
 
 TEST_DATA = '\n'.join([
     'HRVHUB30',
@@ -179,3 +188,173 @@ def test_max_barcode_size():
     with pytest.raises(ValueError) as ex:
         encode("x" * 1853, columns=8, security_level=6)
     assert str(ex.value) == "Generated bar code has 132 rows. Maximum is 90 rows. Try increasing column count."
+
+
+def test_encode_macro_workers():
+    data = b"Parallel segments " * 100
+    expected = encode_macro(data, segment_size=100, file_id=[42])
+    assert len(expected) == 18
+
+    # Process pool, results are returned in segment order
+    assert encode_macro(data, segment_size=100, file_id=[42], workers=2) == expected
+
+    # Custom executor
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert encode_macro(data, segment_size=100, file_id=[42], executor=executor) == expected
+
+
+def test_encode_macro_renderer():
+    data = b"Rendered segments " * 20
+    barcodes = encode_macro(data, segment_size=100, file_id=[42])
+    rendered = encode_macro(data, segment_size=100, file_id=[42], renderer=len)
+    assert rendered == [len(barcode) for barcode in barcodes]
+
+
+def test_get_data_capacity():
+    # 90 rows * 6 columns - 8 error correction words - length descriptor
+    assert get_data_capacity(6, 2) == 531
+    assert get_data_capacity(6, 2, force_rows=10) == 51
+
+    # Limited by the maximum length descriptor, including padding of the last
+    # row: 31 rows * 30 columns - 8 error correction words - length descriptor
+    assert get_data_capacity(30, 2) == 921
+    assert get_data_capacity(27, 0) == 915
+
+
+@pytest.mark.parametrize("columns, security_level", [(11, 0), (15, 1), (20, 3), (27, 0), (30, 2)])
+def test_encode_macro_capacity_wide(columns, security_level):
+    data = b"A" * 5000
+    segments = encode_macro(data, columns=columns, security_level=security_level,
+                            segment_mode="capacity", file_id=[1])
+    assert b"".join(decode(segment).data for segment in segments) == data
+
+
+def test_split_to_segments():
+    data = b"ABCDEFGHIJ" * 10
+    segments = list(split_to_segments(data, 20))
+    assert b"".join(segments) == data
+    assert [len(s) for s in segments] == [40, 40, 20]
+
+    # Byte compaction cuts at 6 byte boundaries
+    data = bytes(range(256)) * 2
+    segments = list(split_to_segments(data, 50, force_binary=True))
+    assert b"".join(segments) == data
+    assert all(len(s) % 6 == 0 for s in segments[:-1])
+
+    # Short numeric runs are not cut
+    data = b"A" * 70 + b"1234567890" + b"B" * 10
+    segments = list(split_to_segments(data, 38))
+    assert segments[0] == b"A" * 70
+
+    with pytest.raises(ValueError):
+        list(split_to_segments(data, 0))
+
+
+def test_encode_macro_capacity():
+    data = b"Capacity based segments 1234567890123456. " * 100
+
+    by_size = encode_macro(data, columns=10, force_rows=20, segment_size=100, file_id=[1])
+    by_capacity = encode_macro(data, columns=10, force_rows=20, segment_mode="capacity",
+                               file_id=[1])
+
+    assert len(by_capacity) < len(by_size)
+    assert all(len(barcode) == 20 for barcode in by_capacity)
+
+    with pytest.raises(ValueError) as ex:
+        encode_macro(data, segment_mode="foo")
+    assert str(ex.value) == "'segment_mode' must be 'bytes' or 'capacity'. Given: 'foo'"
+
+
+def test_crc16():
+    assert crc16(b"123456789") == 0x29B1
+    assert crc16(b"") == 0xFFFF
+
+    # Incremental computation
+    assert crc16(b"6789", crc16(b"12345")) == 0x29B1
+
+
+def test_encode_macro_auto_checksum():
+    data = b"Checksummed data " * 100
+    expected = encode_macro(data, segment_size=300, file_id=[1], checksum=crc16(data))
+
+    assert encode_macro(data, segment_size=300, file_id=[1], checksum=True) == expected
+    assert encode_macro(data, segment_mode="capacity", force_rows=10, file_id=[1],
+                        checksum=True) == \
+        encode_macro(data, segment_mode="capacity", force_rows=10, file_id=[1],
+                     checksum=crc16(data))
+
+
+def test_macro_control_block_template():
+    optional_fields = {MACRO_FILE_NAME: "file.txt", MACRO_SEGMENT_COUNT: 3, MACRO_FILE_SIZE: 1234}
+    template = compile_macro_control_block([1, 2], optional_fields)
+
+    for index in range(3):
+        is_last = index == 2
+        expected = create_macro_control_block(index, [1, 2], optional_fields, is_last)
+        assert create_segment_control_block(index, template, is_last) == expected
+
+    assert create_segment_control_block(12345, [7], is_last=True) == \
+        [MACRO_MARKER, 124, 745, 7, MACRO_TERMINATOR]
+
+
+@pytest.mark.parametrize("data, columns, security_level, force_rows", [
+    (TEST_DATA, 6, 2, None),
+    (TEST_DATA, 3, 5, None),
+    (TEST_DATA, 6, 2, 40),
+    ("x" * 1853, 16, 6, None),
+    ("1234567890" * 100, 10, 1, None),
+    ("love 💔", 2, 0, None),
+])
+def test_estimate(data, columns, security_level, force_rows):
+    plan = estimate(data, columns, security_level, force_rows=force_rows)
+    assert plan.fits
+
+    code_words = encode_high(to_bytes(data), columns, security_level, force_rows=force_rows)
+    assert plan.length_descriptor == code_words[0]
+    assert plan.rows * plan.columns == len(code_words)
+    assert plan.data_words + plan.padding_words + plan.ec_words + 1 == len(code_words)
+    assert len(encode(data, columns, security_level, force_rows=force_rows)) == plan.rows
+
+
+def test_estimate_does_not_fit():
+    assert not estimate("x" * 1854, columns=16, security_level=6).fits
+    assert not estimate("x", columns=16, security_level=1).fits
+    assert not estimate("x" * 1853, columns=8, security_level=6).fits
+    assert not estimate("x" * 100, columns=6, force_rows=3).fits
+
+    plan = estimate("x" * 1854, columns=16, security_level=6)
+    assert plan.length_descriptor == 944
+
+
+def test_data_too_long_fails_fast():
+    with pytest.raises(ValueError) as ex:
+        encode("x" * 1000000)
+    assert str(ex.value) == (
+        "Data too long. Input has 1000000 bytes which can not fit in a bar code. "
+        "Maximum is 2784 bytes.")
+
+
+def test_encode_compact():
+    full = encode(TEST_DATA, 6, 2)
+    compact = encode(TEST_DATA, 6, 2, compact=True)
+
+    assert len(compact) == len(full)
+    for full_row, compact_row in zip(full, compact):
+        # Right row indicator and stop pattern are replaced by a single bar
+        assert compact_row == full_row[:-2] + [COMPACT_STOP_CHARACTER]
+
+
+def test_encode_macro_content_file_id():
+    data = "Hello, World! " * 100
+
+    first = encode_macro(data, segment_size=200, content_file_id=True)
+    second = encode_macro(data, segment_size=200, content_file_id=True)
+    assert first == second
+
+    # Different data or options give a different file ID
+    assert encode_macro(data + "!", segment_size=200, content_file_id=True)[0] != first[0]
+    assert encode_macro(data, segment_size=300, content_file_id=True)[0] != first[0]
+
+    # An explicit file ID takes precedence
+    assert encode_macro(data, segment_size=200, content_file_id=True, file_id=[1]) == \
+        encode_macro(data, segment_size=200, file_id=[1])
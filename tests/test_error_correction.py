@@ -1,4 +1,9 @@
-from pdf417gen.error_correction import compute_error_correction_code_words
+from pdf417gen.data import ERROR_CORRECTION_FACTORS
+from pdf417gen.error_correction import (
+    compute_error_correction_code_words,
+    compute_error_correction_code_words_by_count,
+    compute_error_correction_factors,
+)
 
 
 def test_error_correction():
@@ -23,3 +28,18 @@ def test_error_correction():
     assert compute_error_correction_code_words(data, 6) == expected_level_6
     assert compute_error_correction_code_words(data, 7) == expected_level_7
     assert compute_error_correction_code_words(data, 8) == expected_level_8
+
+
+def test_error_correction_factors():
+    for level in range(9):
+        count = 2 ** (level + 1)
+        assert compute_error_correction_factors(count) == tuple(ERROR_CORRECTION_FACTORS[level])
+
+
+def test_error_correction_by_count():
+    data = [16, 902, 1, 278, 827, 900, 295, 902, 2, 326, 823, 544, 900, 149, 900, 900]
+
+    assert compute_error_correction_code_words_by_count(data, 8) == \
+        compute_error_correction_code_words(data, 2)
+
+    assert len(compute_error_correction_code_words_by_count(data, 7)) == 7
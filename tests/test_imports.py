@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pdf417gen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(pdf417gen.__file__)))
+
+# Modules which should not be loaded unless needed
+HEAVY_MODULES = ["PIL", "xml.etree.ElementTree", "concurrent.futures", "hashlib", "numpy"]
+
+
+def loaded_modules(statement):
+    """Runs the statement in a new interpreter and returns which of the heavy
+    modules it loaded."""
+    script = "%s\nimport sys\nprint(' '.join(m for m in %r if m in sys.modules))" % (
+        statement, HEAVY_MODULES)
+
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.check_output([sys.executable, "-c", script], env=env)
+    return output.decode().split()
+
+
+def test_import_is_lazy():
+    assert loaded_modules("import pdf417gen") == []
+
+
+def test_encode_does_not_load_renderers():
+    assert loaded_modules("from pdf417gen import encode; encode('hello world')") == []
+
+
+def test_render_loads_pillow():
+    statement = "from pdf417gen import encode, render_image; render_image(encode('hello world'))"
+    assert "PIL" in loaded_modules(statement)
+
+
+def test_lazy_attributes():
+    from pdf417gen.encoding import encode
+
+    assert pdf417gen.encode is encode
+    assert set(pdf417gen.__all__) <= set(dir(pdf417gen))
+
+    with pytest.raises(AttributeError):
+        pdf417gen.foo
+
+
+def test_preload():
+    assert loaded_modules("import pdf417gen; pdf417gen.preload(render=False)") == []
+
+    loaded = loaded_modules("import pdf417gen; pdf417gen.preload()")
+    assert "PIL" in loaded
+    assert "xml.etree.ElementTree" in loaded
+
+
+def test_preload_computes_error_correction_factors():
+    from pdf417gen.error_correction import compute_error_correction_factors
+    from pdf417gen.micro import SIZES
+
+    pdf417gen.preload(render=False)
+
+    misses = compute_error_correction_factors.cache_info().misses
+    for size in SIZES:
+        compute_error_correction_factors(size.ec_words)
+    assert compute_error_correction_factors.cache_info().misses == misses
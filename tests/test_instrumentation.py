@@ -0,0 +1,82 @@
+from pdf417gen import encode, render_image, render_svg
+from pdf417gen import instrumentation
+from pdf417gen.compaction import count, count_chunks_by_mode, split_to_chunks
+from pdf417gen.instrumentation import Metrics, hooked
+
+
+def test_disabled():
+    assert not instrumentation.enabled()
+    assert instrumentation.timer("foo") is instrumentation.timer("bar")
+
+
+def test_hooks():
+    events = []
+
+    with hooked(lambda name, value: events.append((name, value))):
+        assert instrumentation.enabled()
+        codes = encode("Hello 1234567890123 \x00", columns=4, security_level=1)
+        render_image(codes)
+        render_svg(codes)
+
+    assert not instrumentation.enabled()
+
+    values = dict(events)
+    assert values["payload_bytes"] == 21
+    assert values["codewords_text"] == 6
+    assert values["codewords_numeric"] == 6
+    assert values["codewords_byte"] == 2
+    assert values["ec_words"] == 4
+    assert values["padding_words"] == 1
+    assert values["codewords_total"] == 20
+    assert values["rows"] == 5
+    assert values["columns"] == 4
+
+    timings = [name for name, _ in events if name.endswith("_seconds")]
+    assert timings == [
+        "compact_seconds",
+        "error_correction_seconds",
+        "encode_rows_seconds",
+        "render_image_seconds",
+        "render_svg_seconds",
+    ]
+
+
+def test_count_chunks_by_mode():
+    data = b"Hello 1234567890123 \x00 world"
+    by_mode = count_chunks_by_mode(list(split_to_chunks(data)))
+    assert sum(by_mode.values()) == count(data)
+
+
+def test_metrics():
+    metrics = Metrics(buckets=[0.1, 1])
+    metrics("rows", 3)
+    metrics("rows", 5)
+    metrics("compact_seconds", 0.05)
+    metrics("compact_seconds", 0.5)
+    metrics("compact_seconds", 5)
+
+    assert metrics.as_dict() == {
+        "compact_seconds": {
+            "count": 3,
+            "sum": 5.55,
+            "min": 0.05,
+            "max": 5,
+            "buckets": {"0.1": 1, "1": 2, "+Inf": 3},
+        },
+        "rows": {"count": 2, "sum": 8, "min": 3, "max": 5},
+    }
+
+    metrics.reset()
+    assert metrics.as_dict() == {}
+
+
+def test_metrics_encode():
+    metrics = Metrics()
+
+    with hooked(metrics):
+        for _ in range(3):
+            encode("Hello, World!")
+
+    exported = metrics.as_dict()
+    assert exported["payload_bytes"]["count"] == 3
+    assert exported["compact_seconds"]["buckets"]["+Inf"] == 3
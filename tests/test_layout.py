@@ -0,0 +1,66 @@
+import pytest
+
+from pdf417gen import encode
+from pdf417gen.encoding import plan_barcode
+from pdf417gen.layout import auto_layout, symbol_size
+from pdf417gen.rendering import barcode_size
+
+TEXT = "Beautiful is better than ugly. " * 20
+
+
+def test_symbol_size():
+    codes = encode(TEXT, columns=7)
+    assert symbol_size(7, len(codes)) == barcode_size(codes)
+
+
+def test_auto_layout_minimizes_area():
+    plan = auto_layout(TEXT)
+    assert plan.fits
+
+    def area(plan):
+        width, height = symbol_size(plan.columns, plan.rows)
+        return width * height
+
+    for columns in range(1, 31):
+        other = plan_barcode(plan.data_words, columns, 2)
+        if other.fits:
+            assert area(plan) <= area(other)
+
+    codes = encode(TEXT, plan.columns, force_rows=plan.rows)
+    assert len(codes) == plan.rows
+
+
+@pytest.mark.parametrize("aspect_ratio", [0.5, 1, 2, 4])
+def test_auto_layout_aspect_ratio(aspect_ratio):
+    plan = auto_layout(TEXT, aspect_ratio=aspect_ratio, ratio=3)
+    width, height = symbol_size(plan.columns, plan.rows)
+    assert abs(width / (height * 3) - aspect_ratio) / aspect_ratio < 0.25
+
+
+def test_auto_layout_max_size():
+    plan = auto_layout(TEXT, max_width=600, max_height=400, scale=2, ratio=3)
+    width, height = symbol_size(plan.columns, plan.rows)
+    assert width * 2 <= 600
+    assert height * 6 <= 400
+
+
+def test_auto_layout_small_data():
+    plan = auto_layout("x")
+    assert plan.rows == 3
+    assert len(encode("x", plan.columns, force_rows=plan.rows)) == 3
+
+
+def test_auto_layout_does_not_fit():
+    with pytest.raises(ValueError) as ex:
+        auto_layout(TEXT, max_width=100)
+    assert str(ex.value) == (
+        "Data does not fit into a bar code within given limits. "
+        "Try increasing the maximum size or decreasing security level.")
+
+    with pytest.raises(ValueError):
+        auto_layout("x" * 2000, security_level=8)
+
+
+def test_symbol_size_compact():
+    codes = encode(TEXT, columns=7, compact=True)
+    assert symbol_size(7, len(codes), compact=True) == barcode_size(codes)
@@ -0,0 +1,65 @@
+import pytest
+
+from pdf417gen import encode_micro
+from pdf417gen.micro import SIZES, get_micro_size, micro_width
+from pdf417gen.rendering import barcode_size
+
+
+def test_encode_micro():
+    # Verified to decode using zxing-cpp
+    assert encode_micro("Hello", columns=1) == [
+        [802, 126108, 922, 1],
+        [930, 125144, 986, 1],
+        [946, 79678, 970, 1],
+        [818, 68708, 906, 1],
+        [882, 82884, 778, 1],
+        [890, 73234, 794, 1],
+        [826, 120902, 786, 1],
+        [954, 120624, 914, 1],
+        [922, 69554, 978, 1],
+        [986, 82050, 982, 1],
+        [970, 126152, 980, 1],
+    ]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_encode_micro_sizes(size):
+    codes = encode_micro("A", columns=size.columns, rows=size.rows)
+
+    assert len(codes) == size.rows
+    assert barcode_size(codes) == (micro_width(size.columns), size.rows)
+
+    # Rows with 3 and 4 columns have a center RAP
+    raps = 3 if size.columns >= 3 else 2
+    for row in codes:
+        assert len(row) == size.columns + raps + 1
+        assert row[-1] == 1
+
+
+def test_encode_micro_chooses_smallest_size():
+    # Chooses the smallest area, not the narrowest symbol
+    size = get_micro_size(20)
+    assert (size.columns, size.rows) == (2, 17)
+
+    size = get_micro_size(20, columns=1)
+    assert (size.columns, size.rows) == (1, 28)
+
+    size = get_micro_size(1, columns=3)
+    assert (size.columns, size.rows) == (3, 6)
+
+    codes = encode_micro("1Z999AA10123456784")
+    assert barcode_size(codes) == (99, 6)
+
+
+def test_encode_micro_validation():
+    with pytest.raises(ValueError, match="'columns' must be between 1 and 4. Given: 5"):
+        encode_micro("A", columns=5)
+
+    with pytest.raises(ValueError, match="'rows' must be one of 8, 11, 14, 17, 20, 23, 26. Given: 10"):
+        encode_micro("A", columns=2, rows=10)
+
+    with pytest.raises(ValueError, match="Data too long. Generated 7 data code words"):
+        encode_micro("ABCDEFGHIJKLM", columns=1, rows=11)
+
+    with pytest.raises(ValueError, match="Maximum is 126"):
+        encode_micro("x" * 1000)
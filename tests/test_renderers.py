@@ -90,3 +90,13 @@ def test_render_image():
     for column, row, visible in modules(codes):
         expected = fg_parsed if visible else bg_parsed
         assert px[column, row] == expected
+
+
+def test_barcode_size():
+    assert barcode_size(codes) == (6 * 17 + 69, len(codes))
+
+    compact_codes = encode("hello world!", compact=True)
+    assert barcode_size(compact_codes) == (6 * 17 + 35, len(compact_codes))
+
+    image = render_image(compact_codes, scale=1, ratio=1, padding=0)
+    assert image.size == barcode_size(compact_codes)
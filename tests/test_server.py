@@ -0,0 +1,206 @@
+import base64
+import io
+import json
+import socket
+import threading
+import time
+from contextlib import ExitStack
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+from PIL import Image
+
+from pdf417gen.server import BarcodeHTTPServer, serve_stdio
+
+TEXT = "Hello, World!"
+
+
+def serve(*requests):
+    input = io.StringIO("".join(json.dumps(r) + "\n" for r in requests))
+    output = io.StringIO()
+    serve_stdio(input, output)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_serve_stdio_image():
+    [response] = serve({"id": 1, "data": TEXT, "options": {"columns": 3, "scale": 2}})
+
+    assert response["id"] == 1
+    assert response["format"] == "png"
+
+    image = Image.open(io.BytesIO(base64.b64decode(response["image"])))
+    assert image.format == "PNG"
+
+
+def test_serve_stdio_output(tmp_path):
+    path = str(tmp_path / "barcode.svg")
+    [response] = serve({"data": TEXT, "format": "svg", "output": path})
+
+    assert response == {"path": path}
+    assert "<svg" in (tmp_path / "barcode.svg").read_text()
+
+
+def test_serve_stdio_errors():
+    input = io.StringIO(
+        "foo\n"
+        "\n"
+        '{"id": 1, "data": "%s", "options": {"columns": 99}}\n'
+        '{"id": 2, "data": "%s", "foo": "bar"}\n'
+        '{"id": 3, "data": "%s", "format": "foo"}\n'
+        '{"id": 4, "data": "%s"}\n' % (TEXT, TEXT, TEXT, TEXT))
+    output = io.StringIO()
+    serve_stdio(input, output)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    # Errors do not stop the server, blank lines are ignored
+    assert len(responses) == 5
+    assert "Expecting value" in responses[0]["error"]
+    assert responses[1] == {"id": 1, "error": "'columns' must be between 1 and 30. Given: 99"}
+    assert responses[2] == {"id": 2, "error": "Unknown request field 'foo'"}
+    assert responses[3] == {"id": 3, "error": "Unsupported format: 'foo'"}
+    assert "image" in responses[4]
+
+
+def start_server(**options):
+    server = BarcodeHTTPServer(("127.0.0.1", 0), quiet=True, **options)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    return server, thread
+
+
+def stop_server(server, thread):
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def http_server():
+    server, thread = start_server(workers=2, max_data_size=100)
+    yield server
+    stop_server(server, thread)
+
+
+def request(server, path, data=None, headers={}):
+    host, port = server.server_address
+    url = "http://%s:%d%s" % (host, port, path)
+    try:
+        with urlopen(Request(url, data=data, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def test_http_png(http_server):
+    status, headers, body = request(http_server, "/barcode.png?data=Hello%2C+World!&columns=3")
+
+    assert status == 200
+    assert headers["Content-Type"] == "image/png"
+    assert Image.open(io.BytesIO(body)).format == "PNG"
+
+    # Same request is served from the cache, with the same ETag
+    etag = headers["ETag"]
+    assert len(http_server.cache.entries) == 1
+    status, headers, cached = request(http_server, "/barcode.png?data=Hello%2C+World!&columns=3")
+    assert status == 200
+    assert headers["ETag"] == etag
+    assert cached == body
+
+    status, headers, body = request(http_server, "/barcode.png?data=Hello%2C+World!&columns=3",
+                                    headers={"If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+
+
+def test_http_svg_post(http_server):
+    status, headers, body = request(http_server, "/barcode.svg?columns=3", data=TEXT.encode())
+
+    assert status == 200
+    assert headers["Content-Type"] == "image/svg+xml"
+    assert b"<svg" in body
+
+
+def test_http_errors(http_server):
+    status, _, _ = request(http_server, "/foo.png?data=foo")
+    assert status == 404
+
+    status, _, body = request(http_server, "/barcode.png")
+    assert status == 400
+    assert body == b"No data given\n"
+
+    status, _, body = request(http_server, "/barcode.png?data=foo&columns=99")
+    assert status == 400
+    assert body == b"'columns' must be between 1 and 30. Given: 99\n"
+
+    status, _, body = request(http_server, "/barcode.png?data=foo&foo=bar")
+    assert status == 400
+    assert body == b"unknown option 'foo'\n"
+
+    status, _, body = request(http_server, "/barcode.png", data=b"x" * 101)
+    assert status == 413
+    assert body == b"Data too long. Maximum is 100 bytes.\n"
+
+    # Rejected by counting the code words, before encoding
+    status, _, body = request(http_server, "/barcode.png?security_level=8", data=b"x" * 100)
+    assert status == 413
+    assert body.startswith(b"Data too long to fit into a bar code with given options.")
+
+
+def test_http_render_limits(http_server):
+    status, _, body = request(http_server, "/barcode.png?data=a&scale=300")
+    assert status == 413
+    assert body.startswith(b"Image too large: ")
+    assert b"Maximum is 10000000 pixels." in body
+
+    status, _, body = request(http_server, "/barcode.png?data=a&padding=100000")
+    assert status == 413
+
+    status, _, body = request(http_server, "/barcode.png?data=a&scale=0")
+    assert status == 400
+    assert body == b"'scale' must be at least 1. Given: 0\n"
+
+    status, _, body = request(http_server, "/barcode.png?data=a&padding=-1")
+    assert status == 400
+    assert body == b"'padding' must not be negative. Given: -1\n"
+
+    # SVG does not allocate pixels
+    status, _, _ = request(http_server, "/barcode.svg?data=foo&columns=3&scale=300")
+    assert status == 200
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_http_idle_timeout():
+    server, thread = start_server(workers=1, timeout=0.2)
+    try:
+        with socket.create_connection(server.server_address, timeout=5) as idle:
+            # Closed by the server without sending anything
+            assert idle.recv(1024) == b""
+    finally:
+        stop_server(server, thread)
+
+
+def test_http_too_many_requests():
+    server, thread = start_server(workers=1, max_pending=2, timeout=5)
+    try:
+        with ExitStack() as stack:
+            # Connections which have not sent their request yet block in the
+            # handler, connections are accepted in order
+            for _ in range(2):
+                stack.enter_context(socket.create_connection(server.server_address, timeout=5))
+
+            status, headers, body = request(server, "/barcode.png?data=foo&columns=3")
+            assert status == 503
+            assert headers["Retry-After"] == "1"
+            assert body == b"Too many requests.\r\n"
+
+        # Closing the connections frees their slots
+        wait_for(lambda: request(server, "/barcode.png?data=foo&columns=3")[0] == 200)
+    finally:
+        stop_server(server, thread)
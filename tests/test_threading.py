@@ -0,0 +1,143 @@
+"""
+Stress tests for calling pdf417gen from multiple threads.
+
+Each job is run once sequentially, then many times concurrently from a thread
+pool, and all results must match. The switch interval is lowered so that
+threads are interleaved often on CPython with the GIL as well.
+"""
+
+import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from xml.etree.ElementTree import tostring
+
+import pytest
+
+from pdf417gen import encode, encode_macro, encode_micro, instrumentation, render_image, render_svg
+from pdf417gen.cache import Cache
+from pdf417gen.instrumentation import Metrics
+
+THREADS = 8
+ROUNDS = 4
+
+rnd = random.Random(417)
+
+TEXTS = [
+    "Hello, world!",
+    "".join(rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghij0123456789 .,:-/") for _ in range(300)),
+    "".join(rnd.choice("0123456789") for _ in range(200)),
+    "Čistoća je pola zdravlja. Grüße aus München!",
+]
+
+BINARY = bytes(rnd.getrandbits(8) for _ in range(2000))
+
+
+def image_bytes(codes, **options):
+    return render_image(codes, **options).tobytes()
+
+
+def svg_bytes(codes, **options):
+    return tostring(render_svg(codes, **options).getroot())
+
+
+def jobs():
+    for text in TEXTS:
+        for security_level in [0, 2, 5]:
+            yield partial(encode, text, columns=4, security_level=security_level)
+
+        yield partial(encode, text, columns=4, compact=True)
+        yield partial(encode, text, columns=4, backend="numpy")
+        yield partial(encode_micro, text[:60])
+
+        codes = encode(text, columns=4)
+        yield partial(image_bytes, codes, scale=2, fg_color="Indigo")
+        yield partial(image_bytes, codes, backend="numpy")
+        yield partial(svg_bytes, codes, color="#123")
+
+    yield partial(encode_macro, BINARY, columns=10, file_id=[1, 2, 3], force_binary=True)
+    yield partial(encode_macro, TEXTS[1] * 10, columns=10, segment_mode="capacity",
+                  content_file_id=True, checksum=True)
+
+
+@pytest.fixture
+def switch_often():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def run_concurrently(fns):
+    """Runs all functions from a thread pool, once all threads have started."""
+    barrier = threading.Barrier(THREADS)
+
+    def wait_for_threads():
+        try:
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=THREADS, initializer=wait_for_threads) as pool:
+        return list(pool.map(lambda fn: fn(), fns))
+
+
+def test_concurrent_results_match(switch_often):
+    fns = list(jobs())
+    expected = [fn() for fn in fns]
+
+    for _ in range(ROUNDS):
+        order = list(range(len(fns)))
+        rnd.shuffle(order)
+
+        results = run_concurrently([fns[i] for i in order])
+        assert [expected[i] for i in order] == results
+
+
+def test_concurrent_hooks(switch_often):
+    fns = [partial(encode, text, columns=4) for text in TEXTS] * 10
+    metrics = Metrics()
+    stop = threading.Event()
+
+    # Keep adding and removing another hook while encoding
+    def toggle_hook():
+        other = Metrics()
+        while not stop.is_set():
+            instrumentation.add_hook(other)
+            instrumentation.remove_hook(other)
+
+    toggler = threading.Thread(target=toggle_hook)
+    toggler.start()
+    try:
+        with instrumentation.hooked(metrics):
+            run_concurrently(fns)
+    finally:
+        stop.set()
+        toggler.join()
+
+    assert not instrumentation.enabled()
+
+    summary = metrics.as_dict()
+    assert summary["payload_bytes"]["count"] == len(fns)
+    assert summary["encode_rows_seconds"]["count"] == len(fns)
+    assert summary["payload_bytes"]["sum"] == sum(len(text.encode()) for text in TEXTS) * 10
+
+
+def test_concurrent_cache_counters(switch_often):
+    cache = Cache()
+    keys = [str(i) for i in range(10)]
+    for key in keys[::2]:
+        cache.put(key, key.encode())
+
+    def lookup_all():
+        for _ in range(100):
+            for key in keys:
+                cache.get(key)
+
+    run_concurrently([lookup_all] * THREADS)
+
+    # No increments are lost
+    assert cache.hits == cache.misses == THREADS * 100 * len(keys) // 2
@@ -0,0 +1,76 @@
+import pytest
+
+from pdf417gen import encode, render_image, vectorized
+from pdf417gen.encoding import get_left_code_word, get_right_code_word
+from pdf417gen.util import use_numpy
+
+TEXT = "The quick brown fox jumps over the lazy dog. 0123456789" * 5
+
+requires_numpy = pytest.mark.skipif(not vectorized.available(), reason="NumPy is not installed")
+
+
+@requires_numpy
+@pytest.mark.parametrize("columns", [3, 6, 30])
+@pytest.mark.parametrize("security_level", [0, 5])
+@pytest.mark.parametrize("compact", [False, True])
+def test_encode(columns, security_level, compact):
+    expected = encode(TEXT, columns=columns, security_level=security_level, compact=compact)
+    actual = encode(TEXT, columns=columns, security_level=security_level, compact=compact,
+                    backend="numpy")
+
+    assert actual == expected
+    assert all(type(code) is int for row in actual for code in row)
+
+
+@requires_numpy
+def test_row_indicators():
+    num_rows, num_cols, security_level = 20, 7, 4
+    indicators = vectorized.row_indicators(num_rows, num_cols, security_level)
+
+    for row_no in range(num_rows):
+        args = (row_no, num_rows, num_cols, security_level)
+        expected = [get_left_code_word(*args), get_right_code_word(*args)]
+        assert indicators[row_no].tolist() == expected
+
+
+@requires_numpy
+def test_module_matrix():
+    codes = encode(TEXT, columns=4, compact=True)
+    matrix = vectorized.module_matrix(codes)
+
+    expected = [[digit == "1" for value in row for digit in format(value, "b")] for row in codes]
+    assert matrix.tolist() == expected
+
+
+@requires_numpy
+@pytest.mark.parametrize("options", [
+    {},
+    {"scale": 1, "ratio": 1, "padding": 0},
+    {"scale": 2, "ratio": 4, "padding": 7, "fg_color": "#f00", "bg_color": "#00ff0080"},
+])
+def test_render_image(options):
+    codes = encode(TEXT, columns=5)
+
+    expected = render_image(codes, **options)
+    actual = render_image(codes, backend="numpy", **options)
+
+    assert actual.mode == expected.mode
+    assert actual.size == expected.size
+    assert actual.tobytes() == expected.tobytes()
+
+
+def test_falls_back_without_numpy(monkeypatch):
+    monkeypatch.setattr(vectorized, "np", None)
+
+    assert not use_numpy("numpy")
+    assert encode(TEXT, backend="numpy") == encode(TEXT)
+    codes = encode(TEXT)
+    assert render_image(codes, backend="numpy").tobytes() == render_image(codes).tobytes()
+
+
+def test_invalid_backend():
+    with pytest.raises(ValueError, match="'backend' must be one of python, numpy. Given: 'cuda'"):
+        encode(TEXT, backend="cuda")
+
+    with pytest.raises(ValueError, match="'backend' must be one of"):
+        render_image(encode(TEXT), backend="cuda")